@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""
+Zipping and enumerating NumPy arrays as columns, in batches of rows.
+
+gencomp1.my_zip, gencomp1.zip_two, gencomp1.my_enumerate, and
+gencomp1.my_enumerate_alt make a tuple for each element, and when given NumPy
+arrays, a Python object for each element of each array. The functions here
+treat 1-D arrays as the columns of a table, and yield its rows in batches of up
+to batch_size rows. Each batch is either:
+
+  A NumPy structured array, whose fields are the columns. Its data are copied
+  from the columns, with one assignment per column per batch. This is the
+  default.
+
+  A record batch, which is a dict mapping each column name to a slice of that
+  column. The slices are views, so nothing is copied, but they share memory
+  with the columns.
+
+Either way, no Python code runs for each row. Enumerating adds an index column,
+made by np.arange for each batch.
+"""
+
+__all__ = ['zip_columns', 'zip_two_columns', 'enumerate_column']
+
+import numpy as np
+
+from palgoviz.util import validate_positive
+
+_BATCH_SIZE = 4096
+"""Default maximum number of rows in each batch."""
+
+
+class _IndexColumn:
+    """Column of consecutive integers, whose slices are made by np.arange."""
+
+    __slots__ = ('_start',)
+
+    dtype = np.dtype(np.int64)
+
+    def __init__(self, start):
+        """Create an index column whose first element is start."""
+        self._start = start
+
+    def __getitem__(self, key):
+        """Make the part of the column selected by a slice with no step."""
+        return np.arange(self._start + key.start, self._start + key.stop,
+                         dtype=self.dtype)
+
+
+def _as_columns(columns):
+    """Convert array-likes to a list of 1-D NumPy arrays."""
+    arrays = [np.asarray(column) for column in columns]
+    if any(array.ndim != 1 for array in arrays):
+        raise ValueError('columns must be one-dimensional')
+    return arrays
+
+
+def _validate_names(names, count):
+    """Check that there are count distinct column names."""
+    if len(names) != count:
+        raise ValueError(f'need {count} column names, got {len(names)}')
+    if len(set(names)) != count:
+        raise ValueError('column names must be distinct')
+
+
+def _generate_batches(names, columns, length, batch_size, structured):
+    """Yield batches of the first length rows of named columns."""
+    if structured:
+        dtype = np.dtype([(name, column.dtype)
+                          for name, column in zip(names, columns)])
+
+    for start in range(0, length, batch_size):
+        stop = min(start + batch_size, length)
+        if structured:
+            batch = np.empty(stop - start, dtype=dtype)
+            for name, column in zip(names, columns):
+                batch[name] = column[start:stop]
+            yield batch
+        else:
+            yield {name: column[start:stop]
+                   for name, column in zip(names, columns)}
+
+
+def zip_columns(*columns, names=None, batch_size=_BATCH_SIZE,
+                structured=True):
+    """
+    Zip 1-D arrays as columns, yielding batches of rows.
+
+    This is like gencomp1.my_zip, stopping at the end of the shortest column,
+    but yields batches of up to batch_size rows (see the module docstring),
+    rather than a tuple per row. Columns may be any 1-D array-likes, and are
+    converted to NumPy arrays. If names is None, columns are named 'f0', 'f1',
+    and so on, as NumPy names fields. Arguments are checked immediately.
+
+    >>> ids = np.array([10, 20, 30, 40, 50], dtype=np.int64)
+    >>> prices = np.array([1.5, 2.0, 2.5, 3.0])
+    >>> for batch in zip_columns(ids, prices, names=['id', 'price'],
+    ...                          batch_size=3):
+    ...     print(repr(batch))
+    array([(10, 1.5), (20, 2. ), (30, 2.5)],
+          dtype=[('id', '<i8'), ('price', '<f8')])
+    array([(40, 3.)], dtype=[('id', '<i8'), ('price', '<f8')])
+    >>> batches = zip_columns(ids, prices, batch_size=3, structured=False)
+    >>> batch = next(batches)
+    >>> batch['f1'], np.shares_memory(batch['f0'], ids)
+    (array([1.5, 2. , 2.5]), True)
+    >>> list(zip_columns())
+    []
+    >>> zip_columns(ids, names=['id', 'price'])
+    Traceback (most recent call last):
+      ...
+    ValueError: need 1 column names, got 2
+    """
+    validate_positive('batch_size', batch_size)
+    arrays = _as_columns(columns)
+    if names is None:
+        names = [f'f{index}' for index in range(len(arrays))]
+    else:
+        names = list(names)
+        _validate_names(names, len(arrays))
+
+    length = min(map(len, arrays), default=0)
+    return _generate_batches(names, arrays, length, batch_size, structured)
+
+
+def zip_two_columns(first, second, *, names=None, batch_size=_BATCH_SIZE,
+                    structured=True):
+    """
+    Zip exactly two 1-D arrays as columns, yielding batches of rows.
+
+    This is to gencomp1.zip_two as zip_columns is to gencomp1.my_zip.
+
+    >>> batch, = zip_two_columns(['a', 'b'], [True, False, True])
+    >>> batch['f0'], batch['f1']
+    (array(['a', 'b'], dtype='<U1'), array([ True, False]))
+    """
+    return zip_columns(first, second, names=names, batch_size=batch_size,
+                       structured=structured)
+
+
+def enumerate_column(column, start=0, *, names=('index', 'value'),
+                     batch_size=_BATCH_SIZE, structured=True):
+    """
+    Pair elements of a 1-D array with indices, yielding batches of rows.
+
+    This is like gencomp1.my_enumerate (and gencomp1.my_enumerate_alt), but
+    yields batches of up to batch_size rows (see the module docstring), each
+    with an int64 index column, counting from start, and the column's values.
+    names gives the names of the index and value columns. Arguments are
+    checked immediately.
+
+    >>> words = np.array(['ham', 'spam', 'eggs'])
+    >>> batch, = enumerate_column(words, 10)
+    >>> batch.tolist()
+    [(10, 'ham'), (11, 'spam'), (12, 'eggs')]
+    >>> [b['index'].tolist() for b in enumerate_column(words, batch_size=2,
+    ...                                                structured=False)]
+    [[0, 1], [2]]
+    """
+    validate_positive('batch_size', batch_size)
+    if not isinstance(start, int):
+        raise TypeError('start must be an int')
+    array, = _as_columns([column])
+    names = list(names)
+    _validate_names(names, 2)
+
+    return _generate_batches(names, [_IndexColumn(start), array], len(array),
+                             batch_size, structured)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
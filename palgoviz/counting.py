@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""
+Counting elements, and elements that satisfy a predicate, quickly.
+
+gencomp1.length_of, gencomp1.length_of_opt, and gencomp1.how_many count with
+a generator expression, which runs Python bytecode for each element. The
+functions here avoid that where they can:
+
+  count uses len if it is supported. Otherwise it consumes the iterable with
+  only C code, by zipping it with itertools.count into a zero-length deque.
+
+  count_if counts truthy elements of a 1-D NumPy array with count_nonzero. It
+  can also call a vectorized predicate on the whole array. Otherwise it
+  counts the output of filter, which is C code when the predicate is None or
+  a builtin.
+
+  count_lines and count_matching_lines count lines of a file in binary
+  blocks, optionally in worker processes, each given a range of the file
+  that starts and ends at line boundaries.
+"""
+
+__all__ = ['count', 'count_if', 'count_lines', 'count_matching_lines']
+
+import collections
+from concurrent.futures import ProcessPoolExecutor
+import io
+import itertools
+import os
+
+import numpy as np
+
+from palgoviz.util import validate_positive
+
+_BLOCK_SIZE = 2**20
+"""Number of bytes read at a time when counting lines."""
+
+_RANGE_SIZE = 2**23
+"""Approximate number of bytes in each range of a file counted separately."""
+
+
+def count(iterable):
+    """
+    Count the items in an iterable, using len if it is supported.
+
+    This gives the same results as gencomp1.length_of_opt.
+
+    >>> count(range(2_000_000_000))
+    2000000000
+    >>> count(x for x in range(1000) if x % 7 == 0)
+    143
+    >>> count(iter([]))
+    0
+    """
+    try:
+        return len(iterable)
+    except TypeError:
+        pass
+
+    counter = itertools.count()
+    collections.deque(zip(iterable, counter), maxlen=0)
+    return next(counter)
+
+
+def count_if(predicate, iterable, *, vectorized=False):
+    """
+    Count the items in an iterable that satisfy a predicate.
+
+    If predicate is None, count truthy items. This gives the same results as
+    gencomp1.how_many, except as described below for vectorized predicates.
+
+    If iterable is a 1-D NumPy array and predicate is None, this uses
+    np.count_nonzero. If vectorized is true, iterable must be a NumPy array,
+    and predicate is called once, on the whole array, and must return a
+    boolean array (or array of truth values) of the same length, whose
+    nonzero elements are counted.
+
+    >>> count_if(lambda n: n % 3 == 0, range(1, 13))
+    4
+    >>> count_if(None, iter([(), [], '', 'a', {}, set(), [0], None]))
+    2
+    >>> import numpy as np
+    >>> count_if(None, np.array([0, 3, 0, -1]))
+    2
+    >>> count_if(lambda a: a % 3 == 0, np.arange(1, 13), vectorized=True)
+    4
+    """
+    if vectorized:
+        array = np.asarray(iterable)
+        results = np.asarray(predicate(array))
+        if results.shape != array.shape[:1]:
+            raise ValueError('vectorized predicate gave wrong shape')
+        return int(np.count_nonzero(results))
+
+    if (predicate is None and isinstance(iterable, np.ndarray)
+            and iterable.ndim == 1):
+        return int(np.count_nonzero(iterable))
+
+    return count(filter(predicate, iterable))
+
+
+def _aligned_ranges(path, range_size):
+    """Split a file into byte ranges of about range_size, at line starts."""
+    size = os.path.getsize(path)
+    boundaries = [0]
+
+    with open(path, mode='rb') as file:
+        while boundaries[-1] + range_size < size:
+            file.seek(boundaries[-1] + range_size - 1)
+            file.readline()  # Go past the end of the line we are in.
+            position = file.tell()
+            if position >= size:
+                break
+            boundaries.append(position)
+
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _count_newlines(path, start, stop):
+    """Count b'\\n' bytes in a range of a file."""
+    total = 0
+
+    with open(path, mode='rb') as file:
+        file.seek(start)
+        remaining = stop - start
+        while remaining > 0:
+            block = file.read(min(_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            total += block.count(b'\n')
+            remaining -= len(block)
+
+    return total
+
+
+def _count_matches(predicate, path, encoding, start, stop):
+    """Count lines satisfying predicate in a range of a file."""
+    with open(path, mode='rb') as file:
+        file.seek(start)
+        data = file.read(stop - start)
+
+    with io.TextIOWrapper(io.BytesIO(data), encoding=encoding,
+                          newline='\n') as lines:
+        return count(filter(predicate, lines))
+
+
+def _map_ranges(func, ranges, processes, *args):
+    """Call func(*args, start, stop) on each range, maybe in processes."""
+    starts = [start for start, _ in ranges]
+    stops = [stop for _, stop in ranges]
+    repeated = [itertools.repeat(arg, len(ranges)) for arg in args]
+
+    if processes is None:
+        return map(func, *repeated, starts, stops)
+
+    validate_positive('processes', processes)
+    with ProcessPoolExecutor(processes) as executor:
+        return list(executor.map(func, *repeated, starts, stops))
+
+
+def count_lines(path, *, processes=None, range_size=_RANGE_SIZE):
+    """
+    Count the lines in a file, which end at '\\n' or at the end of the file.
+
+    Newline bytes are counted in binary blocks, and a final line that has no
+    newline is counted too. If processes is not None, the file is split into
+    ranges of about range_size bytes, counted in that many worker processes.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as directory:
+    ...     path = os.path.join(directory, 'lines.txt')
+    ...     with open(path, mode='w', encoding='utf-8') as file:
+    ...         _ = file.write('a\\nb\\nc')
+    ...     count_lines(path), count_lines(path, processes=2, range_size=2)
+    (3, 3)
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return 0
+
+    if processes is None:
+        ranges = [(0, size)]
+    else:
+        ranges = _aligned_ranges(path, range_size)
+
+    total = sum(_map_ranges(_count_newlines, ranges, processes, path))
+
+    with open(path, mode='rb') as file:
+        file.seek(-1, os.SEEK_END)
+        if file.read(1) != b'\n':
+            total += 1
+
+    return total
+
+
+def count_matching_lines(predicate, path, *, encoding='utf-8',
+                         processes=None, range_size=_RANGE_SIZE):
+    """
+    Count the lines in a text file that satisfy a predicate.
+
+    Lines are given to predicate with their newlines, as when the file is
+    opened with newline='\\n'. If predicate is None, count nonempty lines
+    (which is all of them). The file is split into ranges of about range_size
+    bytes, each starting at the beginning of a line. They are counted here if
+    processes is None, and otherwise in that many worker processes, in which
+    case predicate must be picklable. The encoding must represent newlines as
+    b'\\n', and never use that byte in other characters, as UTF-8 does.
+
+    >>> import operator, tempfile
+    >>> with tempfile.TemporaryDirectory() as directory:
+    ...     path = os.path.join(directory, 'numbers.txt')
+    ...     with open(path, mode='w', encoding='utf-8') as file:
+    ...         file.writelines(f'{i}\\n' for i in range(1000))
+    ...     starts_with_9 = operator.methodcaller('startswith', '9')
+    ...     count_matching_lines(starts_with_9, path, range_size=100,
+    ...                          processes=2)
+    111
+    """
+    ranges = _aligned_ranges(path, range_size)
+    return sum(_map_ranges(_count_matches, ranges, processes,
+                           predicate, path, encoding))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
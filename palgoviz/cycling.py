@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""
+Cycling through data without keeping a list of all of it.
+
+gencomp2.my_cycle, like itertools.cycle, saves each element of the first pass
+in a list, to repeat them. The functions here repeat elements in other ways:
+
+  cycle_source re-iterates a source that can be iterated more than once: a
+  re-iterable collection, a path to a text file, or a function that returns a
+  fresh iterable each time. It uses no buffer at all.
+
+  cycle_array saves the first pass in an array.array, which stores numbers in
+  a few bytes each, rather than as references to separate objects.
+
+  cycle_spilled saves the first pass to a temporary file, a batch at a time,
+  and reads it back in batches, so it keeps only one batch in memory.
+
+All are lazy, and, like my_cycle, they stop if a pass produces no elements.
+"""
+
+__all__ = ['cycle_source', 'cycle_array', 'cycle_spilled']
+
+from array import array
+from collections.abc import Iterable
+import os
+import pickle
+import tempfile
+
+from palgoviz.util import validate_positive
+
+_BATCH_SIZE = 4096
+"""Default number of elements cycle_spilled writes or reads at a time."""
+
+
+def _read_lines(path, encoding):
+    """Yield lines from the text file at path, closing it when done."""
+    with open(path, encoding=encoding) as file:
+        yield from file
+
+
+def cycle_source(source, *, encoding=None):
+    """
+    Repeat the elements of a re-iterable source indefinitely.
+
+    If source is a path (a PathLike object, such as a pathlib.Path), the text
+    file it names is reopened and its lines read on each pass, with the given
+    encoding. If source is callable, it is called, with no arguments, for each
+    pass, and must return an iterable. Otherwise, source must be an iterable
+    that is not an iterator, and it is iterated afresh for each pass.
+
+    Nothing is buffered, so changes to the source between passes take effect.
+
+    >>> import itertools
+    >>> list(itertools.islice(cycle_source([2, 4, 6]), 7))
+    [2, 4, 6, 2, 4, 6, 2]
+    >>> list(itertools.islice(cycle_source(lambda: (x * 2 for x in 'ab')), 5))
+    ['aa', 'bb', 'aa', 'bb', 'aa']
+    >>> list(cycle_source(()))
+    []
+    >>> next(cycle_source(iter([1, 2])))
+    Traceback (most recent call last):
+      ...
+    TypeError: can't replay an iterator; use cycle_array or cycle_spilled
+    """
+    if isinstance(source, os.PathLike):
+        def make_pass():
+            return _read_lines(source, encoding)
+    elif callable(source):
+        make_pass = source
+    elif isinstance(source, Iterable) and iter(source) is not source:
+        def make_pass():
+            return source
+    else:
+        raise TypeError(
+            "can't replay an iterator; use cycle_array or cycle_spilled")
+
+    while True:
+        empty = True
+        for element in make_pass():
+            empty = False
+            yield element
+        if empty:
+            return
+
+
+def cycle_array(iterable, typecode='d'):
+    """
+    Repeat a stream of numbers indefinitely, saving them in an array.array.
+
+    typecode is the array typecode, such as 'd' for double precision floats
+    (the default), or 'q' for signed 64-bit integers. Elements of the first
+    pass are yielded as they are. Later passes yield them as stored, which
+    for 'd' means converted to float.
+
+    >>> import itertools
+    >>> list(itertools.islice(cycle_array((x for x in [1, 2, 3]), 'q'), 7))
+    [1, 2, 3, 1, 2, 3, 1]
+    >>> list(itertools.islice(cycle_array(iter([0.5, 1])), 4))
+    [0.5, 1, 0.5, 1.0]
+    >>> list(cycle_array(iter([])))
+    []
+    >>> next(cycle_array(['a']))
+    Traceback (most recent call last):
+      ...
+    TypeError: must be real number, not str
+    """
+    pool = array(typecode)
+
+    for element in iterable:
+        pool.append(element)
+        yield element
+
+    while pool:
+        yield from pool
+
+
+def cycle_spilled(iterable, *, batch_size=_BATCH_SIZE, directory=None):
+    """
+    Repeat an iterable indefinitely, saving its elements in a temporary file.
+
+    Elements are pickled in lists of batch_size elements. The file is created
+    in directory, or the default temporary directory if it is None, and it is
+    deleted when the generator is closed or garbage collected.
+
+    Elements of the first pass are yielded as they are. Later passes yield
+    copies made by unpickling, so all elements must be picklable, and changes
+    to them after they are saved don't affect the copies.
+
+    >>> import itertools
+    >>> it = cycle_spilled((c for c in 'abcde'), batch_size=2)
+    >>> ''.join(itertools.islice(it, 12))
+    'abcdeabcdeab'
+    >>> it.close()
+    >>> list(cycle_spilled(iter([])))
+    []
+    """
+    validate_positive('batch_size', batch_size)
+    return _generate_spilled(iterable, batch_size, directory)
+
+
+def _generate_spilled(iterable, batch_size, directory):
+    """Repeat an iterable indefinitely, saving it in batches in a file."""
+    with tempfile.TemporaryFile(dir=directory) as file:
+        batch_count = 0
+        batch = []
+
+        for element in iterable:
+            batch.append(element)
+            yield element
+            if len(batch) == batch_size:
+                pickle.dump(batch, file, pickle.HIGHEST_PROTOCOL)
+                batch_count += 1
+                batch = []
+
+        if batch:
+            pickle.dump(batch, file, pickle.HIGHEST_PROTOCOL)
+            batch_count += 1
+            del batch
+
+        while batch_count:
+            file.seek(0)
+            for _ in range(batch_count):
+                yield from pickle.load(file)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
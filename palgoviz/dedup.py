@@ -0,0 +1,735 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""
+Deduplication with bounded memory.
+
+gencomp1.distinct keeps every key it has seen in a set, so its memory use
+grows with the number of distinct keys. distinct_using works the same way, but
+records keys in a "seen set" object, which may be any of:
+
+  ExactSeenSet, an ordinary set. This behaves just like gencomp1.distinct.
+
+  ShardedDiskSeenSet, an exact set whose keys are kept on disk, in SQLite
+  databases selected by hash, each with a page cache of bounded size.
+
+  BloomSeenSet, a Bloom filter. It takes a fixed amount of memory, chosen
+  from its capacity and false positive rate. A false positive causes a value
+  whose key was never seen to be wrongly skipped. Duplicates are never
+  yielded.
+
+  RecentSeenSet, which remembers only the most recently seen keys. A key
+  that is seen again after being forgotten is treated as new.
+
+Each seen set's stats method reports how many keys it holds and approximately
+how much memory and disk space it is using.
+
+parallel_distinct checks keys in worker processes, each owning a partition of
+the seen keys. distinct_dicts_columnar is a faster version of
+gencomp1.distinct_dicts_by_keys, for many dicts and subject keys, that can use
+parallel_distinct.
+"""
+
+__all__ = [
+    'MemoryStats',
+    'SeenSet',
+    'ExactSeenSet',
+    'ShardedDiskSeenSet',
+    'BloomSeenSet',
+    'RecentSeenSet',
+    'distinct_using',
+    'parallel_distinct',
+    'key_projector',
+    'distinct_dicts_columnar',
+]
+
+from abc import ABC, abstractmethod
+import collections
+import enum
+import heapq
+import math
+import multiprocessing
+import operator
+import os
+import pickle
+import sqlite3
+import sys
+import tempfile
+
+from palgoviz.util import batches, identity_function, validate_positive
+
+MemoryStats = collections.namedtuple('MemoryStats',
+                                     ['count', 'memory_bytes', 'disk_bytes'])
+MemoryStats.__doc__ = """
+Approximate resource use of a seen set.
+
+count is the number of keys recorded. For a BloomSeenSet, it is the number of
+keys that were reported new, since the filter cannot count what it contains.
+For a RecentSeenSet, it is the number of keys currently remembered.
+
+memory_bytes estimates memory used by the container and, shallowly, its keys.
+disk_bytes is the size of any files used.
+"""
+
+_MASK64 = (1 << 64) - 1
+
+_BATCH_SIZE = 4096
+"""Default number of elements taken from the input at a time."""
+
+
+def _mix64(value):
+    """Scramble the bits of a 64-bit value (the splitmix64 finalizer)."""
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def _shallow_size(keys):
+    """Estimate memory used by a set or dict, counting keys shallowly."""
+    return sys.getsizeof(keys) + sum(map(sys.getsizeof, keys))
+
+
+class SeenSet(ABC):
+    """Abstract class representing a record of keys seen while deduping."""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def add_new(self, key):
+        """Record key. Return True if it is new, False if already recorded."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def stats(self):
+        """Report approximate resource use, as a MemoryStats."""
+        raise NotImplementedError
+
+
+class ExactSeenSet(SeenSet):
+    """
+    Seen set holding all keys in memory, as gencomp1.distinct does.
+
+    >>> seen = ExactSeenSet()
+    >>> [seen.add_new(key) for key in 'abca']
+    [True, True, True, False]
+    >>> seen.stats().count
+    3
+    """
+
+    __slots__ = ('_keys',)
+
+    def __init__(self):
+        """Create an empty exact in-memory seen set."""
+        self._keys = set()
+
+    def __repr__(self):
+        """Representation for debugging."""
+        return f'<{type(self).__name__} count={len(self._keys)}>'
+
+    def add_new(self, key):
+        """Record key. Return True if it is new, False if already recorded."""
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        return True
+
+    def stats(self):
+        """Report approximate resource use. This walks all keys."""
+        return MemoryStats(count=len(self._keys),
+                           memory_bytes=_shallow_size(self._keys),
+                           disk_bytes=0)
+
+
+class ShardedDiskSeenSet(SeenSet):
+    """
+    Exact seen set that keeps keys on disk, in shards selected by hash.
+
+    Each shard is an SQLite database mapping hash codes to pickled lists of
+    the keys with that hash, so checking a key reads one entry from disk (or
+    from the page cache), and equality is decided by comparing unpickled keys
+    with ==, just as a set would. Key k goes in shard hash(k) % shard_count.
+    Each shard's page cache is limited to cache_bytes / shard_count bytes.
+    Insertions are committed every commit_interval new keys.
+
+    Keys must be picklable, and must unpickle to objects equal to them.
+    Databases are kept in a new temporary directory (inside directory, if it
+    is not None) that is deleted by close. A ShardedDiskSeenSet is a context
+    manager that closes itself.
+
+    >>> with ShardedDiskSeenSet(shard_count=4) as seen:
+    ...     print([seen.add_new(key) for key in [3, 7, 3, 1, 7, 4.0, 4, 'x']])
+    ...     print(seen.stats().count)
+    [True, True, False, True, False, True, False, True]
+    5
+    """
+
+    __slots__ = ('_tempdir', '_cache_bytes', '_commit_interval', '_shards',
+                 '_uncommitted', '_count')
+
+    def __init__(self, directory=None, *, shard_count=16,
+                 cache_bytes=64 * 2**20, commit_interval=10_000):
+        """Create an empty sharded seen set with files in a new directory."""
+        validate_positive('shard_count', shard_count)
+        if cache_bytes < 0:
+            raise ValueError("cache_bytes can't be negative")
+        validate_positive('commit_interval', commit_interval)
+
+        self._tempdir = tempfile.TemporaryDirectory(dir=directory)
+        self._cache_bytes = cache_bytes
+        self._commit_interval = commit_interval
+        self._shards = [self._open_shard(index, cache_bytes // shard_count)
+                        for index in range(shard_count)]
+        self._uncommitted = 0
+        self._count = 0
+
+    def __repr__(self):
+        """Representation for debugging."""
+        return (f'<{type(self).__name__} count={self._count}'
+                f' shard_count={len(self._shards)}>')
+
+    def __enter__(self):
+        """Just return the seen set, so it will be closed."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the seen set, deleting its files."""
+        del exc_type, exc_value, traceback
+        self.close()
+
+    @property
+    def shard_count(self):
+        """The number of shards keys are divided among."""
+        return len(self._shards)
+
+    def add_new(self, key):
+        """Record key. Return True if it is new, False if already recorded."""
+        code = hash(key)
+        shard = self._shards[code % len(self._shards)]
+        row = shard.execute('SELECT keys FROM seen WHERE code = ?',
+                            (code,)).fetchone()
+
+        if row is None:
+            keys = [key]
+        else:
+            keys = pickle.loads(row[0])
+            if key in keys:
+                return False
+            keys.append(key)
+
+        shard.execute('INSERT OR REPLACE INTO seen VALUES (?, ?)',
+                      (code, pickle.dumps(keys, pickle.HIGHEST_PROTOCOL)))
+        self._count += 1
+        self._uncommitted += 1
+        if self._uncommitted == self._commit_interval:
+            self._commit()
+        return True
+
+    def stats(self):
+        """
+        Report approximate resource use.
+
+        memory_bytes is the page cache limit, which SQLite may not reach.
+        """
+        self._commit()
+        disk_bytes = sum(os.path.getsize(entry.path)
+                         for entry in os.scandir(self._tempdir.name))
+        return MemoryStats(count=self._count, memory_bytes=self._cache_bytes,
+                           disk_bytes=disk_bytes)
+
+    def close(self):
+        """Forget all keys and delete the databases."""
+        for shard in self._shards:
+            shard.close()
+        self._shards.clear()
+        self._tempdir.cleanup()
+
+    def _open_shard(self, index, cache_bytes):
+        """Create a shard's database, configured for use as scratch space."""
+        path = os.path.join(self._tempdir.name, f'shard-{index}.sqlite3')
+        shard = sqlite3.connect(path)
+        shard.execute('PRAGMA journal_mode = OFF')
+        shard.execute('PRAGMA synchronous = OFF')
+        shard.execute(f'PRAGMA cache_size = {-(cache_bytes // 1024)}')
+        shard.execute(
+            'CREATE TABLE seen (code INTEGER PRIMARY KEY, keys BLOB NOT NULL)')
+        return shard
+
+    def _commit(self):
+        """Commit pending insertions in all shards."""
+        for shard in self._shards:
+            shard.commit()
+        self._uncommitted = 0
+
+
+class BloomSeenSet(SeenSet):
+    """
+    Approximate seen set in fixed memory, using a Bloom filter.
+
+    The filter is sized so that, after capacity distinct keys have been added,
+    the probability a new key is wrongly reported as seen is about error_rate.
+    Adding more keys than capacity makes false positives more likely. Keys
+    that were seen are always reported as seen.
+
+    Keys are hashed with hash(), so the filter is meaningful only within a
+    single process, and only for keys whose equal values hash equally.
+
+    >>> seen = BloomSeenSet(1000, error_rate=0.001)
+    >>> [seen.add_new(key) for key in ['ab', 'cd', 'ab', 42, 42.0]]
+    [True, True, False, True, False]
+    >>> seen.bit_count, seen.hash_count
+    (14378, 10)
+    """
+
+    __slots__ = ('_capacity', '_error_rate', '_bits', '_bit_count',
+                 '_hash_count', '_count')
+
+    def __init__(self, capacity, error_rate=0.01):
+        """Create an empty Bloom filter for capacity keys."""
+        validate_positive('capacity', capacity)
+        if not 0.0 < error_rate < 1.0:
+            raise ValueError('error_rate must be strictly between 0 and 1')
+
+        bit_count = math.ceil(-capacity * math.log(error_rate)
+                              / math.log(2)**2)
+
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._bits = bytearray((bit_count + 7) // 8)
+        self._bit_count = bit_count
+        self._hash_count = max(1, round(bit_count / capacity * math.log(2)))
+        self._count = 0
+
+    def __repr__(self):
+        """Representation for debugging."""
+        return (f'<{type(self).__name__} capacity={self._capacity!r}'
+                f' error_rate={self._error_rate!r}>')
+
+    @property
+    def capacity(self):
+        """The number of keys the filter was sized for."""
+        return self._capacity
+
+    @property
+    def error_rate(self):
+        """The false positive rate the filter was sized for."""
+        return self._error_rate
+
+    @property
+    def bit_count(self):
+        """The number of bits in the filter."""
+        return self._bit_count
+
+    @property
+    def hash_count(self):
+        """The number of bits set for each key."""
+        return self._hash_count
+
+    def add_new(self, key):
+        """Record key. Return True if new, False if (probably) recorded."""
+        bits = self._bits
+        bit_count = self._bit_count
+        mixed = _mix64(hash(key) & _MASK64)
+        position = mixed & 0xFFFF_FFFF
+        step = (mixed >> 32) | 1
+        new = False
+
+        for _ in range(self._hash_count):
+            index = position % bit_count
+            mask = 1 << (index & 7)
+            byte = bits[index >> 3]
+            if not byte & mask:
+                bits[index >> 3] = byte | mask
+                new = True
+            position += step
+
+        if new:
+            self._count += 1
+        return new
+
+    def stats(self):
+        """Report resource use, which is fixed when the filter is created."""
+        return MemoryStats(count=self._count,
+                           memory_bytes=sys.getsizeof(self._bits),
+                           disk_bytes=0)
+
+
+class RecentSeenSet(SeenSet):
+    """
+    Seen set remembering only the maxsize most recently seen keys.
+
+    Seeing a remembered key again makes it the most recent. When a new key is
+    added to a full RecentSeenSet, the least recently seen key is forgotten.
+    This suppresses duplicates that occur near each other, as in a stream of
+    retried or replayed events.
+
+    >>> seen = RecentSeenSet(2)
+    >>> [seen.add_new(key) for key in 'abacbca']
+    [True, True, False, True, True, False, True]
+    """
+
+    __slots__ = ('_maxsize', '_keys')
+
+    def __init__(self, maxsize):
+        """Create an empty seen set that remembers up to maxsize keys."""
+        validate_positive('maxsize', maxsize)
+
+        self._maxsize = maxsize
+        self._keys = collections.OrderedDict()
+
+    def __repr__(self):
+        """Representation for debugging."""
+        return f'<{type(self).__name__} maxsize={self._maxsize!r}>'
+
+    @property
+    def maxsize(self):
+        """The maximum number of keys remembered."""
+        return self._maxsize
+
+    def add_new(self, key):
+        """Record key. Return True if it is new, False if remembered."""
+        try:
+            self._keys.move_to_end(key)
+        except KeyError:
+            if len(self._keys) == self._maxsize:
+                self._keys.popitem(last=False)
+            self._keys[key] = None
+            return True
+
+        return False
+
+    def stats(self):
+        """Report approximate resource use. This walks all remembered keys."""
+        return MemoryStats(count=len(self._keys),
+                           memory_bytes=_shallow_size(self._keys),
+                           disk_bytes=0)
+
+
+def distinct_using(iterable, *, key=None, seen=None):
+    """
+    Yield first occurrences of values with equal keys, recording keys in seen.
+
+    This is like gencomp1.distinct, but keys are recorded with seen.add_new,
+    so memory use depends on the kind of SeenSet passed. If seen is None, an
+    ExactSeenSet is used. The caller owns seen, and may check its stats while
+    or after iterating.
+
+    >>> list(distinct_using([3, 1, 3, 2, 1]))
+    [3, 1, 2]
+    >>> words = ['foo', 'bar', 'foobar', 'baz', 'quux', 'wq']
+    >>> list(distinct_using(words, key=len, seen=BloomSeenSet(100)))
+    ['foo', 'foobar', 'quux', 'wq']
+    >>> list(distinct_using('aabbaacc', seen=RecentSeenSet(1)))
+    ['a', 'b', 'a', 'c']
+    """
+    if key is None:
+        key = identity_function
+    if seen is None:
+        seen = ExactSeenSet()
+
+    add_new = seen.add_new
+
+    for element in iterable:
+        if add_new(key(element)):
+            yield element
+
+
+@enum.unique
+class _Missing(enum.Enum):
+    """Marker for an absent subject key. It keeps its identity when pickled."""
+
+    MISSING = enum.auto()
+
+
+def key_projector(subject_keys):
+    """
+    Make a function projecting a dict to a tuple of its values at subject_keys.
+
+    A subject key the dict doesn't have is represented by a marker object that
+    is equal only to itself, so projections are equal exactly when dicts agree
+    on the subject keys, in the sense of gencomp1.distinct_dicts_by_keys. All
+    values are looked up at once, by an operator.itemgetter, and the lookups
+    are only repeated one by one if that raises KeyError. So dicts must not
+    insert missing keys when subscripted, as a collections.defaultdict does.
+
+    >>> project = key_projector(['b', 'a'])
+    >>> project({'a': 1, 'b': 2, 'c': 3})
+    (2, 1)
+    >>> project({'a': 1}) == project({'a': 1, 'c': 3}) != project({'a': 2})
+    True
+    >>> key_projector(['a'])({'a': 1})
+    (1,)
+    >>> key_projector([])({'a': 1})
+    ()
+    """
+    my_keys = tuple(subject_keys)
+
+    match my_keys:
+        case ():
+            def get_all(_):
+                return ()
+        case (only_key,):
+            def get_all(d):
+                return (d[only_key],)
+        case _:
+            get_all = operator.itemgetter(*my_keys)
+
+    def project(d):
+        try:
+            return get_all(d)
+        except KeyError:
+            return tuple([d.get(key, _Missing.MISSING) for key in my_keys])
+
+    return project
+
+
+class _Collisions(list):
+    """Unequal keys with the same hash code, in a worker's record of keys."""
+
+    __slots__ = ()
+
+
+def _first_occurrence_worker(connection):
+    """
+    Serve one partition of a parallel distinct operation.
+
+    Each message received is a triple of lists: positions, hash codes, and
+    the keys at those positions, in increasing order of position. The reply is
+    a list of the positions of keys not seen in this or any earlier message.
+    A message of None means to stop. If comparing keys raises an exception,
+    the reply is that exception instead, so the caller can raise it.
+
+    Keys are recorded in a dict from hash codes, so they need not be hashed
+    again here. Keys are compared as a set would compare them, by identity and
+    then equality.
+    """
+    seen = {}
+
+    with connection:
+        while (message := connection.recv()) is not None:
+            try:
+                reply = _new_positions(seen, *message)
+            except Exception as error:  # Let the caller handle it.
+                reply = error
+
+            try:
+                connection.send(reply)
+            except Exception:  # The error could not be pickled.
+                connection.send(RuntimeError(repr(reply)))
+
+
+def _new_positions(seen, positions, codes, keys):
+    """Record keys in seen. Return the positions of those not already in it."""
+    new_positions = []
+
+    for position, code, key in zip(positions, codes, keys):
+        try:
+            existing = seen[code]
+        except KeyError:
+            seen[code] = key
+        else:
+            if type(existing) is _Collisions:
+                if key in existing:
+                    continue
+                existing.append(key)
+            elif existing is key or existing == key:
+                continue
+            else:
+                seen[code] = _Collisions((existing, key))
+
+        new_positions.append(position)
+
+    return new_positions
+
+
+class _Partitions:
+    """
+    Worker processes each owning the seen keys for one partition of hashes.
+
+    submit sends a batch of keys, split by hash(key) % count, with their hash
+    codes. collect waits for the results and gives the positions (sequence
+    numbers) in the batch of first occurrences of keys, merged into increasing
+    order. At most one batch is submitted at a time.
+    """
+
+    __slots__ = ('_connections', '_processes', '_outstanding')
+
+    def __init__(self, count):
+        """Start count worker processes."""
+        self._connections = []
+        self._processes = []
+        self._outstanding = False
+
+        for _ in range(count):
+            parent_end, child_end = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_first_occurrence_worker,
+                                              args=(child_end,), daemon=True)
+            process.start()
+            child_end.close()
+            self._connections.append(parent_end)
+            self._processes.append(process)
+
+    def __enter__(self):
+        """Just return the workers, so they will be stopped."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop the workers."""
+        del exc_type, exc_value, traceback
+        self.close()
+
+    def submit(self, keys):
+        """Send a batch of keys to the workers that own their partitions."""
+        count = len(self._connections)
+        parts = [([], [], []) for _ in range(count)]
+        for position, key in enumerate(keys):
+            code = hash(key)
+            positions, codes, part_keys = parts[code % count]
+            positions.append(position)
+            codes.append(code)
+            part_keys.append(key)
+
+        for connection, part in zip(self._connections, parts):
+            connection.send(part)
+        self._outstanding = True
+
+    def collect(self):
+        """
+        Get sorted positions of new keys in the batch last submitted.
+
+        If a worker failed to check its keys, the exception it reported is
+        raised here, after all the replies have been received.
+        """
+        self._outstanding = False
+        replies = [connection.recv() for connection in self._connections]
+        for reply in replies:
+            if isinstance(reply, BaseException):
+                raise reply
+        return heapq.merge(*replies)
+
+    def close(self):
+        """Stop the workers, first reading any results not yet collected."""
+        for connection in self._connections:
+            try:
+                if self._outstanding:
+                    connection.recv()
+                connection.send(None)
+            except (EOFError, OSError):
+                pass  # The worker has already exited.
+            connection.close()
+        self._outstanding = False
+        for process in self._processes:
+            process.join()
+        self._connections.clear()
+        self._processes.clear()
+
+
+def parallel_distinct(iterable, *, key=None, processes=None,
+                      batch_size=_BATCH_SIZE):
+    """
+    Yield first occurrences of values with equal keys, using worker processes.
+
+    This does what gencomp1.distinct does. Values are taken in batches of
+    batch_size, and their keys are partitioned by hash among processes worker
+    processes (os.cpu_count() if None). Each worker owns the seen keys in its
+    partition and replies with the positions in the batch of keys that are
+    new. Those lists are merged, so values are yielded in their original
+    order. Keys are computed here, but are checked in the workers, and the
+    next batch's keys are computed while the workers check the current batch.
+
+    Keys must be picklable. Each key is sent along with its hash code, so
+    workers don't hash it again. This is worthwhile when keys are costly to
+    compare or to store in one process, but for small keys that are cheap to
+    hash, it is usually slower than gencomp1.distinct.
+
+    >>> list(parallel_distinct([3, 1, 3, 2, 1, 3], processes=2))
+    [3, 1, 2]
+    >>> words = ['foo', 'bar', 'foobar', 'baz', 'quux', 'wq']
+    >>> list(parallel_distinct(words, key=len, processes=3, batch_size=2))
+    ['foo', 'foobar', 'quux', 'wq']
+    """
+    if key is None:
+        key = identity_function
+    if processes is None:
+        processes = os.cpu_count() or 1
+    else:
+        validate_positive('processes', processes)
+    validate_positive('batch_size', batch_size)
+
+    with _Partitions(processes) as partitions:
+        previous = None
+
+        for batch in batches(iterable, batch_size):
+            keys = list(map(key, batch))
+            if previous is not None:
+                new_positions = partitions.collect()
+                yield from map(previous.__getitem__, new_positions)
+            partitions.submit(keys)
+            previous = batch
+
+        if previous is not None:
+            yield from map(previous.__getitem__, partitions.collect())
+
+
+def distinct_dicts_columnar(dicts, subject_keys, *,
+                            batch_size=_BATCH_SIZE, processes=None):
+    """
+    Yield dicts that differ from all previous ones on at least one subject key.
+
+    This does what gencomp1.distinct_dicts_by_keys does, but the subject keys
+    are compiled once, by key_projector, into a function that gets all their
+    values with one operator.itemgetter call. Dicts are taken in batches of
+    batch_size, and each batch is projected in a single pass of map.
+
+    If processes is None, the projections are checked against a set here, and
+    each is hashed only once. Otherwise it is the number of worker processes
+    that parallel_distinct uses to check them. Projected values must then be
+    picklable, but only the projections, not the dicts, are sent to workers.
+    This helps when checking is the costly part, such as when there are many
+    subject keys whose values are slow to compare.
+
+    Subscripting each dict must raise KeyError for a missing key.
+
+    >>> ds = [{'a': 1, 'b': 2, 'c': 3, 'd': 4, 'e': 5},
+    ...       {'e': 6, 'd': 4, 'c': 7, 'b': 2, 'a': 8},
+    ...       {'a': 1, 'b': 2, 'c': 3, 'e': 5}]
+    >>> for d in distinct_dicts_columnar(ds, ['d', 'f']): print(d)
+    {'a': 1, 'b': 2, 'c': 3, 'd': 4, 'e': 5}
+    {'a': 1, 'b': 2, 'c': 3, 'e': 5}
+    >>> list(distinct_dicts_columnar(ds, ['b'], processes=2)) == ds[:1]
+    True
+    """
+    validate_positive('batch_size', batch_size)
+
+    project = key_projector(subject_keys)
+
+    if processes is not None:
+        yield from parallel_distinct(dicts, key=project, processes=processes,
+                                     batch_size=batch_size)
+        return
+
+    seen = set()
+    add = seen.add
+
+    for batch in batches(dicts, batch_size):
+        for d, projection in zip(batch, map(project, batch)):
+            size = len(seen)
+            add(projection)
+            if len(seen) != size:
+                yield d
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
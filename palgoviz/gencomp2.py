@@ -27,15 +27,19 @@ __all__ = [
     'product_two',
     'product_two_alt',
     'product_two_flexible',
+    'product_two_array',
     'pairs',
     'ascending_countdowns',
     'ascending_countdowns_alt',
     'three_sums',
     'three_sums_alt',
+    'three_sums_numpy',
     'three_sum_indices_1',
     'three_sum_indices_2',
     'three_sum_indices_3',
     'three_sum_indices_4',
+    'three_sum_indices_fast',
+    'three_sum_count',
     'dot_product_slow',
     'dot_product',
     'flatten2',
@@ -44,6 +48,7 @@ __all__ = [
     'compose_dicts_simple',
     'compose_dicts',
     'compose_dicts_view',
+    'ComposedView',
     'matrix_square_flat',
     'matrix_square_nested',
     'transpose',
@@ -51,14 +56,20 @@ __all__ = [
     'affines',
     'Affine',
     'affines_alt',
+    'AffineBatch',
     'my_cycle',
     'my_chain',
 ]
 
-from collections import deque
-from collections.abc import Iterable
+from collections import Counter, deque
+from collections.abc import Iterable, Mapping
 import itertools
 
+import numpy as np
+
+_CHUNK_SIZE = 1 << 20
+"""Default maximum number of elements in an intermediate NumPy array."""
+
 
 def empty():
     """
@@ -147,6 +158,35 @@ def product_two_flexible(a, b):
     return ((x, y) for x in a for y in my_b)
 
 
+def product_two_array(a, b):
+    """
+    Make a 2-D NumPy array whose rows are the pairs product_two(a, b) yields.
+
+    a and b are iterables of numbers, usually 1-D arrays or ranges. The array
+    is built by repeating and tiling, without making any tuples. Its dtype is
+    what NumPy promotes the elements of a and b to, so a row may hold 1.0 where
+    the corresponding tuple from product_two holds 1. (They are equal.)
+
+    >>> product_two_array(range(2), np.array([10, 20, 30]))
+    array([[ 0, 10],
+           [ 0, 20],
+           [ 0, 30],
+           [ 1, 10],
+           [ 1, 20],
+           [ 1, 30]])
+    >>> a, b = np.arange(4), np.linspace(0.5, 2.0, 4)
+    >>> [tuple(row) for row in product_two_array(a, b)] == list(
+    ...     product_two(a, b))
+    True
+    >>> product_two_array([], [1, 2]).shape
+    (0, 2)
+    """
+    my_a = _as_array(a)
+    my_b = _as_array(b)
+    return np.column_stack((np.repeat(my_a, len(my_b)),
+                            np.tile(my_b, len(my_a))))
+
+
 def pairs(iterable):
     """
     Yield pairs (x, y) where x and y appear in iterable, with x preceding y.
@@ -229,7 +269,14 @@ def three_sums(a, b, c):
     [19, 20, 21, 26, 27, 28, 29, 30, 31, 36, 37, 38, 39, 40, 41, 46, 47, 48]
     >>> three_sums(range(10), range(10), range(10)) == set(range(28))
     True
+
+    If a, b, and c are all ranges, or all 1-D arrays of numbers, this uses
+    three_sums_numpy (below), which returns an equal set.
     """
+    arrays = _as_numeric_arrays(a, b, c)
+    if arrays is not None:
+        return three_sums_numpy(*arrays)
+
     my_a = list(a)
     my_b = list(b)
     my_c = list(c)
@@ -257,10 +304,113 @@ def three_sums_alt(a, b, c):
     [19, 20, 21, 26, 27, 28, 29, 30, 31, 36, 37, 38, 39, 40, 41, 46, 47, 48]
     >>> three_sums_alt(range(10), range(10), range(10)) == set(range(28))
     True
+
+    Like three_sums, this uses three_sums_numpy (below) for ranges or arrays.
     """
+    arrays = _as_numeric_arrays(a, b, c)
+    if arrays is not None:
+        return three_sums_numpy(*arrays)
+
     return {x + y + z for x, y, z in itertools.product(a, b, c)}
 
 
+def _as_array(iterable):
+    """Make a 1-D NumPy array from an iterable, using np.arange for ranges."""
+    if isinstance(iterable, range):
+        return np.arange(iterable.start, iterable.stop, iterable.step)
+    if isinstance(iterable, np.ndarray):
+        return iterable
+    return np.array(list(iterable))
+
+
+def _as_numeric_arrays(*iterables):
+    """
+    Get arrays for iterables whose sums NumPy computes as Python would, if any.
+
+    This returns a list of 1-D arrays if the iterables are all ranges whose
+    elements' sums fit in int64, or are all 1-D arrays of ints or floats (not
+    bools, which NumPy adds differently). Otherwise it returns None. Mixing
+    ranges and arrays is not supported, because NumPy would promote Python
+    ints differently in scalar arithmetic than in array arithmetic.
+    """
+    if all(isinstance(iterable, range) for iterable in iterables):
+        bound = sum(max(abs(r.start), abs(r.stop)) for r in iterables)
+        if bound >= 2**63:
+            return None
+        return [np.arange(r.start, r.stop, r.step, dtype=np.int64)
+                for r in iterables]
+
+    if all(isinstance(iterable, np.ndarray) and iterable.ndim == 1
+           and iterable.dtype.kind in 'iuf' for iterable in iterables):
+        return list(iterables)
+
+    return None
+
+
+def _sorted_distinct(array):
+    """
+    Sort a 1-D array and remove duplicates, like np.unique.
+
+    This is how np.unique has traditionally worked. Doing it directly is much
+    faster with some NumPy versions, whose np.unique does not sort to find
+    duplicates and is then slow on large arrays of ints.
+    """
+    ordered = np.sort(array)
+    if len(ordered) < 2:
+        return ordered
+    keep = np.empty(len(ordered), dtype=bool)
+    keep[0] = True
+    np.not_equal(ordered[1:], ordered[:-1], out=keep[1:])
+    return ordered[keep]
+
+
+def _distinct_sums(xs, ys, chunk_size):
+    """Make a sorted array of all distinct sums of an x in xs and a y in ys."""
+    rows = max(1, chunk_size // max(1, len(ys)))
+    parts = [np.empty(0, dtype=np.result_type(xs, ys))]
+
+    for start in range(0, len(xs), rows):
+        sums = xs[start:start + rows, np.newaxis] + ys
+        parts.append(_sorted_distinct(sums.ravel()))
+
+    # Deduplicating each chunk separately, then all of them once, avoids
+    # re-sorting everything found so far each time a chunk is added.
+    return _sorted_distinct(np.concatenate(parts))
+
+
+def three_sums_numpy(a, b, c, *, chunk_size=_CHUNK_SIZE):
+    """
+    Make a set of all sums x + y + z, taken from a, b, c, computed by NumPy.
+
+    a, b, and c may be any iterables whose elements are numbers, but usually
+    they are 1-D arrays or ranges. The sums x + y are computed by broadcasting,
+    for chunks of a at a time, so no intermediate array has more than about
+    chunk_size elements. Duplicates are removed before adding z, which is then
+    done in the same way. Addition happens in the same order as in three_sums,
+    so the results are equal even for floats. The NaN value is not supported.
+
+    >>> three_sums_numpy([2, 3], [], [20, 30])
+    set()
+    >>> s = three_sums_numpy((n * 10 for n in (1, 2, 3)), [7, 7, 14],
+    ...                      iter(range(2, 5)))
+    >>> isinstance(s, set)
+    True
+    >>> sorted(s)
+    [19, 20, 21, 26, 27, 28, 29, 30, 31, 36, 37, 38, 39, 40, 41, 46, 47, 48]
+    >>> three_sums_numpy(range(10), range(10), range(10), chunk_size=7) == set(
+    ...     range(28))
+    True
+    >>> rng = np.random.default_rng(seed=0)
+    >>> u, v, w = (rng.normal(size=40) for _ in range(3))
+    >>> three_sums_numpy(u, v, w, chunk_size=100) == three_sums(
+    ...     list(u), list(v), list(w))
+    True
+    """
+    ab = _distinct_sums(_as_array(a), _as_array(b), chunk_size)
+    abc = _distinct_sums(ab, _as_array(c), chunk_size)
+    return set(abc.tolist())
+
+
 def three_sum_indices_1(a, b, c, target):
     """
     Make an iterator of tuples (i, j, k) where a[i], b[j], c[k] all differ from
@@ -392,6 +542,116 @@ def three_sum_indices_4(a, b, c, target):
             if x + y + z == target and x != y and x != z and y != z)
 
 
+def three_sum_indices_fast(a, b, c, target):
+    """
+    Make an iterator of tuples (i, j, k) where a[i], b[j], c[k] all differ from
+    each other and sum to target.
+
+    This is like the four implementations above, and yields the same tuples in
+    the same (lexicographic) order, but it does not try every k for each i and
+    j. Instead, it indexes c by value, so the only z values it looks up are
+    target - x - y. With N the total number of tuples yielded, it takes time
+    O(len(a) * len(b) + len(c) + N) on average.
+
+    That difference (a lookup instead of checking a sum) means the result may
+    differ from the other implementations when the subtractions round, as they
+    can with floats. The elements should be exact numbers, such as ints.
+
+    >>> list(three_sum_indices_fast([1, 2, 3], [10, 9], [7, 9, 8], 20))
+    [(0, 0, 1), (1, 0, 2), (2, 0, 0), (2, 1, 2)]
+    >>> next(three_sum_indices_fast([0] * 10, [0] * 20, [0] * 30, 0))
+    Traceback (most recent call last):
+      ...
+    StopIteration
+    >>> from itertools import repeat as r
+    >>> sum(1 for _ in three_sum_indices_fast(r(1, 10), r(2, 20), r(3, 30), 6))
+    6000
+    >>> import random
+    >>> a, b, c = ([random.randrange(-20, 20) for _ in range(30)]
+    ...            for _ in range(3))
+    >>> (list(three_sum_indices_fast(a, b, c, 5))
+    ...  == list(three_sum_indices_1(a, b, c, 5)))
+    True
+    """
+    my_a = tuple(a)
+    my_b = tuple(b)
+
+    c_indices = {}
+    for k, z in enumerate(c):
+        c_indices.setdefault(z, []).append(k)
+
+    for i, x in enumerate(my_a):
+        for j, y in enumerate(my_b):
+            if x == y:
+                continue
+            z = target - x - y
+            if z == x or z == y:
+                continue
+            for k in c_indices.get(z, ()):
+                yield (i, j, k)
+
+
+def _sorted_runs(iterable):
+    """Make a sorted list of (value, count) pairs from an iterable."""
+    return sorted(Counter(iterable).items())
+
+
+def three_sum_count(a, b, c, target):
+    """
+    Count the tuples three_sum_indices_fast(a, b, c, target) would yield.
+
+    Equal values are grouped and counted, and b and c are sorted by value. For
+    each distinct value x in a, pairs of values from b and c whose sum is
+    target minus x are found by a two-pointer scan: one pointer moves up
+    through b while the other moves down through c. This takes O(n log n) time
+    to sort and then O(n**2) time to scan, where n is the greatest of the
+    inputs' lengths, and it never makes the tuples it counts.
+
+    As in three_sum_indices_fast, the elements should be exact numbers.
+
+    >>> three_sum_count([1, 2, 3], [10, 9], [7, 9, 8], 20)
+    4
+    >>> three_sum_count([0] * 10, [0] * 20, [0] * 30, 0)
+    0
+    >>> from itertools import repeat as r
+    >>> three_sum_count(r(1, 10), r(2, 20), r(3, 30), 6)
+    6000
+    >>> three_sum_count([], [1, 2], [3, 4], 6)
+    0
+    >>> import random
+    >>> a, b, c = ([random.randrange(-20, 20) for _ in range(30)]
+    ...            for _ in range(3))
+    >>> three_sum_count(a, b, c, 5) == sum(1 for _ in
+    ...                                    three_sum_indices_1(a, b, c, 5))
+    True
+    """
+    b_runs = _sorted_runs(b)
+    c_runs = _sorted_runs(c)
+    count = 0
+
+    for x, x_count in Counter(a).items():
+        remaining = target - x
+        low = 0
+        high = len(c_runs) - 1
+
+        while low < len(b_runs) and high >= 0:
+            y, y_count = b_runs[low]
+            z, z_count = c_runs[high]
+            pair_sum = y + z
+
+            if pair_sum < remaining:
+                low += 1
+            elif pair_sum > remaining:
+                high -= 1
+            else:
+                if x != y and x != z and y != z:
+                    count += x_count * y_count * z_count
+                low += 1
+                high -= 1
+
+    return count
+
+
 def dot_product_slow(u, v):
     """
     Compute the dot product of real-valued vectors represented as dictionaries.
@@ -687,6 +947,214 @@ def compose_dicts_view(back, front):
     return lambda key: back[front[key]]
 
 
+class ComposedView(Mapping):
+    """
+    Read-only mapping view of the composition of a chain of mappings.
+
+    ComposedView(back, front) behaves like compose_dicts(back, front), but it
+    is a live view, as compose_dicts_view returns, and it supports chains of
+    any positive number of mappings: ComposedView(c, b, a) looks up a key in
+    a, then the result in b, then that result in c.
+
+    Like compose_dicts_view, subscripting raises KeyError for the first key
+    found missing along the chain, which may not be the key passed, and
+    TypeError if a value met along the chain is unhashable. Keys for which
+    either happens are not in the view and are skipped when iterating it.
+
+    If memoize is true, resolved values are cached. The cache is cleared when
+    invalidate is called. If a version function is also passed, it is called
+    on each lookup, and the cache is cleared whenever it returns a value
+    different from the value it returned when the cache was last used. Any
+    cheap value that changes when the underlying mappings change works.
+
+    >>> status_colors = dict(OK='green', meh='blue', danger='red')
+    >>> color_names = dict(green='verde', blue='azul', red='rojo')
+    >>> name_lengths = dict(verde=5, azul=4)
+    >>> view = ComposedView(name_lengths, color_names, status_colors)
+    >>> view['OK'], dict(view)
+    (5, {'OK': 5, 'meh': 4})
+    >>> view['danger']
+    Traceback (most recent call last):
+      ...
+    KeyError: 'rojo'
+    >>> 'danger' in view, len(view)
+    (False, 2)
+    >>> name_lengths['rojo'] = 4
+    >>> view['danger']
+    4
+    >>> generation = 0
+    >>> cached = ComposedView(name_lengths, color_names, status_colors,
+    ...                       memoize=True, version=lambda: generation)
+    >>> cached['OK'], cached.memoized
+    (5, 1)
+    >>> name_lengths['verde'] = 99  # The cache doesn't know about this...
+    >>> cached['OK']
+    5
+    >>> generation += 1  # ...until the version changes.
+    >>> cached['OK']
+    99
+    >>> ComposedView()
+    Traceback (most recent call last):
+      ...
+    TypeError: ComposedView needs at least one mapping
+    """
+
+    __slots__ = ('_mappings', '_memo', '_version', '_last_version')
+
+    def __init__(self, *mappings, memoize=False, version=None):
+        """Create a view of mappings composed in order, from back to front."""
+        if not mappings:
+            name = type(self).__name__
+            raise TypeError(f'{name} needs at least one mapping')
+        if version is not None and not memoize:
+            raise ValueError("version only makes sense when memoizing")
+
+        self._mappings = mappings[::-1]  # Front to back, in lookup order.
+        self._memo = {} if memoize else None
+        self._version = version
+        self._last_version = None if version is None else version()
+
+    def __repr__(self):
+        """Representation for debugging."""
+        return (f'<{type(self).__name__} depth={len(self._mappings)!r}'
+                f' memoize={self._memo is not None!r}>')
+
+    def __getitem__(self, key):
+        """Look up key through the chain of mappings."""
+        memo = self._checked_memo()
+        if memo is None:
+            return self._resolve(key)
+        try:
+            return memo[key]
+        except KeyError:
+            value = memo[key] = self._resolve(key)
+            return value
+
+    def __contains__(self, key):
+        """Check if key resolves through the whole chain."""
+        try:
+            self[key]
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __iter__(self):
+        """Iterate over the front mapping's keys that resolve."""
+        return (key for key in self._mappings[0] if key in self)
+
+    def __len__(self):
+        """Count the keys that resolve. This takes linear time."""
+        return sum(1 for _ in self)
+
+    def get(self, key, default=None):
+        """Look up key through the chain, returning default if it's absent."""
+        try:
+            return self[key]
+        except (KeyError, TypeError):
+            return default
+
+    @property
+    def memoized(self):
+        """Number of resolved values cached, or None if not memoizing."""
+        memo = self._checked_memo()
+        return None if memo is None else len(memo)
+
+    def invalidate(self):
+        """Clear the cache of resolved values, if memoizing."""
+        if self._memo is not None:
+            self._memo.clear()
+
+    def resolve_many(self, keys, default=None):
+        """
+        Look up many keys, returning a list of values, with default for
+        keys that don't resolve.
+
+        The keys are looked up one mapping at a time, for all keys at once,
+        which avoids walking the chain separately in Python code for each key.
+        If memoizing, only keys not already cached are looked up.
+
+        >>> view = ComposedView({1: 'one', 2: 'two'}, {'a': 1, 'b': 2, 'c': 3},
+        ...                     memoize=True)
+        >>> view.resolve_many(['b', 'x', 'a', 'c'])
+        ['two', None, 'one', None]
+        >>> view.memoized
+        2
+        """
+        memo = self._checked_memo()
+        missing = object()
+
+        if memo is None:
+            values = _look_up_all(self._mappings, list(keys), missing)
+            return [default if value is missing else value for value in values]
+
+        my_keys = list(keys)
+        values = _get_all_or(memo, my_keys, missing)
+        pending = [index for index, value in enumerate(values)
+                   if value is missing]
+
+        resolved = _look_up_all(self._mappings,
+                                [my_keys[index] for index in pending],
+                                missing)
+
+        for index, value in zip(pending, resolved):
+            if value is missing:
+                values[index] = default
+            else:
+                values[index] = memo[my_keys[index]] = value
+
+        return values
+
+    def _checked_memo(self):
+        """Get the memo, first clearing it if the version has changed."""
+        if self._version is not None:
+            version = self._version()
+            if version != self._last_version:
+                self._memo.clear()
+                self._last_version = version
+        return self._memo
+
+    def _resolve(self, key):
+        """Look up key through the chain of mappings, without the memo."""
+        value = key
+        for mapping in self._mappings:
+            value = mapping[value]
+        return value
+
+
+def _get_or(mapping, key, default):
+    """Look up key in mapping, or return default if it's absent/unhashable."""
+    try:
+        return mapping[key]
+    except (KeyError, TypeError):
+        return default
+
+
+def _get_all_or(mapping, keys, missing):
+    """Look up each of keys in mapping, with missing for those that fail."""
+    try:
+        get = mapping.get
+        return [missing if key is missing else get(key, missing)
+                for key in keys]
+    except TypeError:  # Some key was unhashable.
+        return [missing if key is missing else _get_or(mapping, key, missing)
+                for key in keys]
+
+
+def _look_up_all(mappings, keys, missing):
+    """Look up keys through mappings level by level, missing for failures."""
+    values = keys
+    complete = True
+    for mapping in mappings:
+        if complete:
+            try:
+                values = list(map(mapping.__getitem__, values))
+                continue
+            except (KeyError, TypeError):
+                complete = False
+        values = _get_all_or(mapping, values, missing)
+    return values
+
+
 def matrix_square_flat(f, n):
     """
     Square an n-by-n matrix. The result is a dict with index pairs as keys.
@@ -919,6 +1387,191 @@ def affines_alt(weights, biases):
     return {Affine(w, b) for w, b in itertools.product(weights, biases)}
 
 
+class AffineBatch:
+    """
+    A sequence of 1-dimensional affine functions, stored as arrays.
+
+    Weights and biases are stored as read-only float arrays, so evaluating
+    every function at every one of many inputs is a single outer product,
+    rather than a Python call per function per input. Indexing or iterating
+    gives Affine objects.
+
+    >>> batch = AffineBatch([2.0, -1.0, 0.5], [1.0, 0.0, 3.0])
+    >>> batch
+    AffineBatch(weights=[2.0, -1.0, 0.5], biases=[1.0, 0.0, 3.0])
+    >>> len(batch)
+    3
+    >>> batch[0]
+    Affine(weight=2.0, bias=1.0)
+    >>> batch(10)
+    array([ 21., -10.,   8.])
+    >>> batch([0, 2])
+    array([[ 1.,  5.],
+           [ 0., -2.],
+           [ 3.,  4.]])
+    >>> AffineBatch([1.0], [])
+    Traceback (most recent call last):
+      ...
+    ValueError: weights and biases must be 1-D, of equal length
+    """
+
+    __slots__ = ('_weights', '_biases')
+
+    def __init__(self, weights, biases):
+        """Create a batch of affine functions with parallel weights, biases."""
+        my_weights = np.array(weights, dtype=float)
+        my_biases = np.array(biases, dtype=float)
+        if my_weights.shape != my_biases.shape or my_weights.ndim != 1:
+            raise ValueError('weights and biases must be 1-D, of equal length')
+
+        my_weights.flags.writeable = False
+        my_biases.flags.writeable = False
+        self._weights = my_weights
+        self._biases = my_biases
+
+    @classmethod
+    def product(cls, weights, biases):
+        """
+        Make a batch of distinct affine functions like affines_alt's result.
+
+        Every combination of a weight from weights and a bias from biases is
+        used once. The functions are ordered by weight, then by bias.
+
+        >>> u = [2.3, 1.0, 2.3, -6.5, 5.4]
+        >>> v = [1.9, 3.6, -5.1, 1.9]
+        >>> batch = AffineBatch.product(u, v)
+        >>> set(batch) == affines_alt(u, v)
+        True
+        >>> len(batch)
+        12
+        >>> batch[:3](10).round(1)
+        array([-70.1, -63.1, -61.4])
+        """
+        my_weights = _sorted_distinct(np.array(list(weights), dtype=float))
+        my_biases = _sorted_distinct(np.array(list(biases), dtype=float))
+        return cls(np.repeat(my_weights, len(my_biases)),
+                   np.tile(my_biases, len(my_weights)))
+
+    @classmethod
+    def from_affines(cls, affines):
+        """
+        Make a batch of the functions represented by some Affine objects.
+
+        >>> AffineBatch.from_affines([Affine(1, 2), Affine(3, 4)])
+        AffineBatch(weights=[1.0, 3.0], biases=[2.0, 4.0])
+        """
+        pairs = [(f.weight, f.bias) for f in affines]
+        return cls([w for w, _ in pairs], [b for _, b in pairs])
+
+    def __repr__(self):
+        """Represent this AffineBatch as Python code."""
+        return (f'{type(self).__name__}(weights={self._weights.tolist()!r},'
+                f' biases={self._biases.tolist()!r})')
+
+    def __len__(self):
+        """Number of functions in the batch."""
+        return len(self._weights)
+
+    def __getitem__(self, index):
+        """Get a function as an Affine, or a slice of functions as a batch."""
+        if isinstance(index, slice):
+            return type(self)(self._weights[index], self._biases[index])
+        return Affine(self._weights[index].item(), self._biases[index].item())
+
+    def __iter__(self):
+        """Iterate over the functions in the batch, as Affine objects."""
+        for w, b in zip(self._weights.tolist(), self._biases.tolist()):
+            yield Affine(w, b)
+
+    def __call__(self, x):
+        """
+        Evaluate every function at x, or at every element of an array x.
+
+        If x is a scalar, return a 1-D array of each function's value at x.
+        Otherwise, entry (i, ...) of the result is function i evaluated at
+        entry (...) of x.
+        """
+        return (np.multiply.outer(self._weights, x)
+                + self._biases.reshape((-1,) + (1,) * np.ndim(x)))
+
+    @property
+    def weights(self):
+        """Read-only array of the weights (slopes) of the functions."""
+        return self._weights
+
+    @property
+    def biases(self):
+        """Read-only array of the biases (y-intercepts) of the functions."""
+        return self._biases
+
+    def unique(self):
+        """
+        Make a batch of the distinct functions, ordered by weight then bias.
+
+        Functions are distinct when their (weight, bias) pairs are, as with
+        Affine equality. The pairs are sorted together with lexsort, and each
+        is kept if it differs from the one before it.
+
+        >>> AffineBatch([1, 2, 1, 1], [5, 0, 5, 4]).unique()
+        AffineBatch(weights=[1.0, 1.0, 2.0], biases=[4.0, 5.0, 0.0])
+        """
+        order = np.lexsort((self._biases, self._weights))
+        weights = self._weights[order]
+        biases = self._biases[order]
+        keep = np.ones(len(order), dtype=bool)
+        keep[1:] = (weights[1:] != weights[:-1]) | (biases[1:] != biases[:-1])
+        return type(self)(weights[keep], biases[keep])
+
+    def compose(self, inner):
+        """
+        Compose each function with an inner function, in closed form.
+
+        Applying w1 x + b1 after w2 x + b2 is w1 w2 x + (w1 b2 + b1). If inner
+        is an Affine, every function is composed with it. If inner is an
+        AffineBatch, corresponding functions are composed, so the batches must
+        have the same length, or inner must have length 1.
+
+        >>> batch = AffineBatch([2.0, 3.0], [1.0, -1.0])
+        >>> batch.compose(Affine(10, 5))
+        AffineBatch(weights=[20.0, 30.0], biases=[11.0, 14.0])
+        >>> batch.compose(batch)
+        AffineBatch(weights=[4.0, 9.0], biases=[3.0, -4.0])
+        """
+        if isinstance(inner, Affine):
+            inner_weights = inner.weight
+            inner_biases = inner.bias
+        elif isinstance(inner, AffineBatch):
+            if len(inner) not in {1, len(self)}:
+                raise ValueError("can't compose batches of different lengths")
+            inner_weights = inner.weights
+            inner_biases = inner.biases
+        else:
+            raise TypeError('inner must be an Affine or AffineBatch')
+
+        return type(self)(self._weights * inner_weights,
+                          self._weights * inner_biases + self._biases)
+
+    def reduce(self):
+        """
+        Compose all the functions into one, with the first applied last.
+
+        That is, compute f0 ∘ f1 ∘ ... ∘ fn-1. Its weight is the product of all
+        the weights. Its bias is the dot product of the biases with the running
+        products of the weights that precede them.
+
+        >>> AffineBatch([2.0, 3.0, 4.0], [1.0, 1.0, 1.0]).reduce()
+        Affine(weight=24.0, bias=9.0)
+        >>> _(1) == Affine(2, 1)(Affine(3, 1)(Affine(4, 1)(1)))
+        True
+        >>> AffineBatch([], []).reduce()
+        Affine(weight=1.0, bias=0.0)
+        """
+        prefixes = np.ones(len(self))
+        np.cumprod(self._weights[:-1], out=prefixes[1:])
+        return Affine(float(np.prod(self._weights)),
+                      float(prefixes @ self._biases))
+
+
 def my_cycle(iterable):
     """
     Repeat an iterable indefinitely. Like itertools.cycle.
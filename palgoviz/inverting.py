@@ -0,0 +1,381 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""
+Inverting dictionaries that may map different keys to the same value.
+
+gencomp1.invert and gencomp1.invert_alt need an injective dictionary. When two
+keys have the same value, all but the last are lost. The inverses here map
+each value to a tuple of all the keys that have it, in the order they were
+given:
+
+  invert_all inverts a whole dictionary at once.
+
+  InvertedIndex is built incrementally, from any number of mappings or
+  streams of (key, value) pairs, and partial indexes can be merged. If keys
+  are integers, they can be stored compactly in arrays of a fixed type.
+  build_inverted_index uses this to build partial indexes of chunks of a
+  stream in worker processes, then merges them.
+
+  ArrayInvertedIndex is built all at once from NumPy arrays of integer keys
+  and of values, with a single stable sort. It stores the keys in one array,
+  grouped by value, and takes a small fixed amount of memory per key.
+"""
+
+__all__ = [
+    'invert_all',
+    'InvertedIndex',
+    'build_inverted_index',
+    'ArrayInvertedIndex',
+]
+
+import array
+import collections
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import itertools
+
+import numpy as np
+
+from palgoviz.util import batches, validate_positive
+
+_INTEGER_TYPECODES = frozenset('bBhHiIlLqQ')
+"""Typecodes of array.array types that store integers."""
+
+_CHUNK_SIZE = 2**16
+"""Default number of pairs indexed in each worker process call."""
+
+
+def invert_all(dictionary):
+    """
+    Return a dict mapping each value in dictionary to a tuple of its keys.
+
+    This is like gencomp1.invert, but it doesn't require the dictionary to be
+    injective. Keys with equal values are kept in the dictionary's order.
+
+    >>> invert_all({})
+    {}
+    >>> invert_all({'a': 1, 'b': 2, 'c': 1})
+    {1: ('a', 'c'), 2: ('b',)}
+    >>> invert_all({x: x % 3 for x in range(10)})[1]
+    (1, 4, 7)
+    """
+    groups = collections.defaultdict(list)
+    for key, value in dictionary.items():
+        groups[value].append(key)
+    return {value: tuple(keys) for value, keys in groups.items()}
+
+
+class InvertedIndex(Mapping):
+    """
+    Incrementally built mapping from each value to a tuple of its keys.
+
+    Pairs are added by update (or passed to the constructor), either as a
+    mapping or as an iterable of (key, value) pairs. Keys with equal values
+    are kept in the order they were added. Values must be hashable.
+
+    If typecode is None, keys may be any objects, and are stored in lists.
+    Otherwise it is an integer typecode of the array module, such as 'q' for
+    signed 64-bit integers, and each value's keys are stored in an array of
+    that type, which takes much less memory than a list of ints.
+
+    >>> index = InvertedIndex({'a': 1, 'b': 2})
+    >>> index.update([('c', 1), ('d', 3)])
+    >>> dict(index)
+    {1: ('a', 'c'), 2: ('b',), 3: ('d',)}
+    >>> index.pair_count
+    4
+    >>> squares = InvertedIndex(((x, x * x) for x in range(-3, 4)),
+    ...                         typecode='b')
+    >>> squares[4], squares[0]
+    ((-2, 2), (0,))
+    >>> squares
+    <InvertedIndex values=4 pairs=7 typecode='b'>
+    >>> InvertedIndex(typecode='d')
+    Traceback (most recent call last):
+      ...
+    ValueError: typecode must be an integer array typecode
+    """
+
+    __slots__ = ('_groups', '_typecode')
+
+    def __init__(self, pairs=(), *, typecode=None):
+        """Create an index of pairs, with keys stored according to typecode."""
+        if typecode is None:
+            factory = list
+        elif typecode in _INTEGER_TYPECODES:
+            factory = functools.partial(array.array, typecode)
+        else:
+            raise ValueError('typecode must be an integer array typecode')
+
+        self._groups = collections.defaultdict(factory)
+        self._typecode = typecode
+        self.update(pairs)
+
+    def __repr__(self):
+        """Representation for debugging."""
+        return (f'<{type(self).__name__} values={len(self)!r}'
+                f' pairs={self.pair_count!r} typecode={self._typecode!r}>')
+
+    def __getitem__(self, value):
+        """Get a tuple of the keys that have value."""
+        if value not in self._groups:
+            raise KeyError(value)
+        return tuple(self._groups[value])
+
+    def __contains__(self, value):
+        """Check if any key has value."""
+        return value in self._groups
+
+    def __iter__(self):
+        """Iterate over the values, in the order each was first added."""
+        return iter(self._groups)
+
+    def __len__(self):
+        """Count the distinct values."""
+        return len(self._groups)
+
+    @property
+    def typecode(self):
+        """The array typecode keys are stored as, or None if in lists."""
+        return self._typecode
+
+    @property
+    def pair_count(self):
+        """Number of (key, value) pairs added. This takes linear time."""
+        return sum(map(len, self._groups.values()))
+
+    def update(self, pairs):
+        """Add the items of a mapping, or (key, value) pairs, to the index."""
+        if isinstance(pairs, Mapping):
+            pairs = pairs.items()
+
+        groups = self._groups
+        for key, value in pairs:
+            groups[value].append(key)
+
+    def merge(self, other):
+        """
+        Add all pairs from another InvertedIndex, after the pairs already here.
+
+        Both indexes must store keys the same way. Each value's keys are
+        extended all at once, which is much faster than adding them one by one.
+
+        >>> left = InvertedIndex({'a': 1, 'b': 2})
+        >>> left.merge(InvertedIndex({'c': 2, 'd': 3}))
+        >>> dict(left)
+        {1: ('a',), 2: ('b', 'c'), 3: ('d',)}
+        """
+        if other._typecode != self._typecode:
+            raise ValueError('typecodes of merged indexes must match')
+
+        groups = self._groups
+        for value, keys in other._groups.items():
+            groups[value].extend(keys)
+
+
+def _index_chunk(pairs, typecode):
+    """Build an InvertedIndex of a chunk of pairs, in a worker process."""
+    return InvertedIndex(pairs, typecode=typecode)
+
+
+def build_inverted_index(pairs, *, typecode=None, processes=None,
+                         chunk_size=_CHUNK_SIZE):
+    """
+    Build an InvertedIndex from a mapping, or iterable of (key, value) pairs.
+
+    If processes is None, this just builds it here. Otherwise, pairs are taken
+    in chunks of chunk_size, and each chunk is indexed in one of processes
+    worker processes. The partial indexes are merged here, in order, so the
+    result is the same. At most twice as many chunks as processes are in
+    flight at once, so pairs may come from a long stream.
+
+    Keys and values must be picklable. Each partial index is sent back with
+    each value once, rather than once per key, so this helps most when many
+    keys share values and when keys are stored in arrays (see InvertedIndex).
+
+    >>> index = build_inverted_index(((x, x % 4) for x in range(20)),
+    ...                              typecode='l', processes=2, chunk_size=3)
+    >>> index[1]
+    (1, 5, 9, 13, 17)
+    """
+    if processes is None:
+        return InvertedIndex(pairs, typecode=typecode)
+    validate_positive('processes', processes)
+    validate_positive('chunk_size', chunk_size)
+
+    if isinstance(pairs, Mapping):
+        pairs = pairs.items()
+
+    result = InvertedIndex(typecode=typecode)
+    chunks = batches(pairs, chunk_size)
+
+    with ProcessPoolExecutor(processes) as executor:
+        pending = collections.deque(
+            executor.submit(_index_chunk, chunk, typecode)
+            for chunk in itertools.islice(chunks, processes * 2))
+
+        while pending:
+            partial = pending.popleft().result()
+            for chunk in itertools.islice(chunks, 1):
+                pending.append(executor.submit(_index_chunk, chunk, typecode))
+            result.merge(partial)
+
+    return result
+
+
+class ArrayInvertedIndex(Mapping):
+    """
+    Mapping from each value to a tuple of its integer keys, stored in arrays.
+
+    This is built from a 1-D array-like of integer keys and a 1-D array-like
+    of values of equal length, where values[i] is the value of keys[i]. The
+    values must be sortable by NumPy, such as numbers or strings. Both are
+    sorted together by value, stably, so keys with equal values keep their
+    order. The keys are then stored in one array, and the distinct values in
+    another, with the positions where each value's keys start. Looking up a
+    value is a binary search, and takes O(log n) time.
+
+    >>> index = ArrayInvertedIndex([10, 11, 12, 13, 14], [2, 1, 2, 1, 2])
+    >>> dict(index)
+    {1: (11, 13), 2: (10, 12, 14)}
+    >>> index.key_array(2)
+    array([10, 12, 14])
+    >>> 3 in index, len(index)
+    (False, 2)
+    >>> ArrayInvertedIndex.from_dict({5: 'x', 6: 'y', 7: 'x'})['x']
+    (5, 7)
+    >>> ArrayInvertedIndex([1.5], [0])
+    Traceback (most recent call last):
+      ...
+    TypeError: keys must be integers
+    """
+
+    __slots__ = ('_keys', '_distinct', '_starts')
+
+    def __init__(self, keys, values):
+        """Create an index of keys with their corresponding values."""
+        keys = np.asarray(keys)
+        values = np.asarray(values)
+
+        if keys.size == 0:
+            keys = keys.astype(np.int64)
+        elif keys.dtype.kind not in 'iu':
+            raise TypeError('keys must be integers')
+        if keys.ndim != 1 or values.ndim != 1:
+            raise ValueError('keys and values must be one-dimensional')
+        if len(keys) != len(values):
+            raise ValueError('keys and values must have the same length')
+
+        order = np.argsort(values, kind='stable')
+        distinct, starts = np.unique(values[order], return_index=True)
+
+        self._keys = keys[order]
+        self._distinct = distinct
+        self._starts = np.append(starts, len(keys))
+
+        for arr in self._keys, self._distinct, self._starts:
+            arr.flags.writeable = False
+
+    @classmethod
+    def from_dict(cls, dictionary):
+        """Make an ArrayInvertedIndex of a dict with integer keys."""
+        return cls(list(dictionary), list(dictionary.values()))
+
+    @classmethod
+    def concatenate(cls, indexes):
+        """
+        Make an ArrayInvertedIndex of all pairs in indexes, in that order.
+
+        This is how ArrayInvertedIndex objects built separately, such as in
+        different processes, are merged.
+
+        >>> parts = [ArrayInvertedIndex([1, 2], ['a', 'b']),
+        ...          ArrayInvertedIndex([3], ['a'])]
+        >>> ArrayInvertedIndex.concatenate(parts)['a']
+        (1, 3)
+        """
+        my_indexes = list(indexes)
+        if not my_indexes:
+            raise ValueError('need at least one index to concatenate')
+
+        keys = np.concatenate([index._keys for index in my_indexes])
+        values = np.concatenate([
+            np.repeat(index._distinct, np.diff(index._starts))
+            for index in my_indexes
+        ])
+        return cls(keys, values)
+
+    def __repr__(self):
+        """Representation for debugging."""
+        return (f'<{type(self).__name__} values={len(self)!r}'
+                f' pairs={len(self._keys)!r} dtype={self._keys.dtype.name}>')
+
+    def __getitem__(self, value):
+        """Get a tuple of the keys that have value."""
+        return tuple(self.key_array(value).tolist())
+
+    def __iter__(self):
+        """Iterate over the distinct values, in sorted order."""
+        return iter(self._distinct.tolist())
+
+    def __len__(self):
+        """Count the distinct values."""
+        return len(self._distinct)
+
+    @property
+    def pair_count(self):
+        """Number of (key, value) pairs in the index."""
+        return len(self._keys)
+
+    @property
+    def nbytes(self):
+        """Number of bytes taken by the arrays that store the index."""
+        return (self._keys.nbytes + self._distinct.nbytes
+                + self._starts.nbytes)
+
+    def key_array(self, value):
+        """
+        Get a read-only array view of the keys that have value.
+
+        A value that can't be compared with the values here, such as None in
+        an index of int values, or that isn't a scalar, is just not found.
+
+        >>> index = ArrayInvertedIndex([1, 2], [10, 30])
+        >>> index.key_array(30).tolist()
+        [2]
+        >>> index.key_array(None)
+        Traceback (most recent call last):
+          ...
+        KeyError: None
+        """
+        try:
+            if np.ndim(value) != 0:
+                raise KeyError(value)
+            position = int(np.searchsorted(self._distinct, value))
+            found = (position != len(self._distinct)
+                     and self._distinct[position] == value)
+        except (TypeError, ValueError) as error:  # Incomparable with values.
+            raise KeyError(value) from error
+        if not found:
+            raise KeyError(value)
+        start, stop = self._starts[position:position + 2]
+        return self._keys[start:stop]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
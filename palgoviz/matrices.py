@@ -0,0 +1,417 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""
+Matrix multiplication and transposition, for matrices that may be large.
+
+gencomp2.matrix_square_flat and gencomp2.matrix_square_nested call f(i, k)
+and f(k, j) for every term of every entry of the product: 2n**3 calls. Here,
+materialize calls f once per entry, and multiply uses NumPy's matmul when the
+entries are machine numbers. Entries that are not, such as Fractions or ints
+too big for int64, are multiplied exactly by a blocked pure-Python algorithm.
+
+Matrices are 2-D NumPy arrays when NumPy can multiply them exactly, or when
+their entries are floats, and lists of row lists otherwise. Float products are
+computed by BLAS, which may add the terms of each entry in a different order
+than Python would, so they can differ from gencomp2's results by rounding.
+to_flat and to_nested convert either kind to the formats that the gencomp2
+functions return.
+
+gencomp2.transpose and gencomp2.transpose_alt build a new tuple of tuples.
+TransposedView instead presents a matrix's transpose without copying it, while
+transpose_blocked builds the tuple of tuples one strip of columns at a time,
+and transpose_array gives a NumPy view.
+"""
+
+__all__ = [
+    'materialize',
+    'multiply',
+    'square',
+    'to_flat',
+    'to_nested',
+    'square_flat',
+    'square_nested',
+    'TransposedView',
+    'transpose_blocked',
+    'transpose_array',
+]
+
+from collections.abc import Sequence
+from operator import itemgetter
+
+import numpy as np
+
+from palgoviz.util import validate_positive
+
+_BLOCK_SIZE = 64
+"""Default side length of square blocks in the pure-Python multiplication."""
+
+_STRIP_WIDTH = 1024
+"""Default number of columns transpose_blocked transposes at a time."""
+
+_INT64_MAX = (1 << 63) - 1
+"""Maximum absolute value an int64 product entry may have without overflow."""
+
+
+def _as_matrix(matrix):
+    """Convert a matrix to an array, if NumPy can use it, or a list of rows."""
+    if isinstance(matrix, np.ndarray):
+        if matrix.ndim != 2:
+            raise ValueError('matrix must be 2-dimensional')
+        array = matrix
+    else:
+        rows = [list(row) for row in matrix]
+        if len({len(row) for row in rows}) > 1:
+            raise ValueError('matrix rows must all have the same length')
+        array = np.array(rows)
+        if array.ndim != 2:  # Possible when there are no rows.
+            return rows
+
+    if array.dtype.kind == 'b':
+        return array.astype(np.int64)
+    if array.dtype.kind in 'iufc':
+        return array
+    return array.tolist()
+
+
+def _shape(matrix):
+    """Get the (height, width) of an array or list of rows."""
+    if isinstance(matrix, np.ndarray):
+        return matrix.shape
+    return len(matrix), (len(matrix[0]) if matrix else 0)
+
+
+def _max_magnitude(array):
+    """Get the maximum absolute value in an integer array, as a Python int."""
+    if array.size == 0:
+        return 0
+    return max(-int(array.min()), int(array.max()))
+
+
+def _fits_in_int64(a, b):
+    """Check that the product of integer arrays a and b can't overflow."""
+    bound = _max_magnitude(a) * _max_magnitude(b) * a.shape[1]
+    return bound <= _INT64_MAX
+
+
+def materialize(f, height, width=None):
+    """
+    Evaluate a binary function once for each entry of a matrix.
+
+    As in gencomp2.matrix_square_flat, f(i, j) gives the ij entry, where i and
+    j are 1-based. The matrix has the given height and width, which defaults
+    to the height. Return an array when possible, else a list of rows.
+
+    >>> materialize(lambda i, j: 10 * i + j, 2, 3)
+    array([[11, 12, 13],
+           [21, 22, 23]])
+    >>> from fractions import Fraction
+    >>> materialize(lambda i, j: Fraction(i, j), 2)
+    [[Fraction(1, 1), Fraction(1, 2)], [Fraction(2, 1), Fraction(1, 1)]]
+    """
+    if width is None:
+        width = height
+    return _as_matrix([[f(i, j) for j in range(1, width + 1)]
+                       for i in range(1, height + 1)])
+
+
+def _multiply_blocked(a, b, block_size):
+    """Multiply lists of rows exactly, one block of a's columns at a time."""
+    height = len(a)
+    inner = len(b)
+    width = len(b[0]) if b else 0
+    result = [[0] * width for _ in range(height)]
+
+    for k_start in range(0, inner, block_size):
+        k_stop = k_start + block_size
+        for j_start in range(0, width, block_size):
+            j_stop = j_start + block_size
+            b_block = [row[j_start:j_stop] for row in b[k_start:k_stop]]
+            for a_row, out_row in zip(a, result):
+                out = out_row[j_start:j_stop]
+                for a_ik, b_row in zip(a_row[k_start:k_stop], b_block):
+                    if a_ik:
+                        out = [x + a_ik * y for x, y in zip(out, b_row)]
+                out_row[j_start:j_stop] = out
+
+    return result
+
+
+def multiply(a, b, *, block_size=_BLOCK_SIZE):
+    """
+    Compute the matrix product of a and b.
+
+    Each of a and b may be a 2-D array, or any sequence of equal-length rows.
+    If NumPy can compute the product exactly, or the entries are floating
+    point, it does, with matmul, and the result is an array. Float entries of
+    the product then equal those Python arithmetic gives only up to rounding
+    error, because matmul may sum terms in a different order, and may use
+    fused multiply-add. Otherwise, the result is a list of rows computed with
+    Python arithmetic, working in block_size by block_size blocks, so the rows
+    of b being used are likely to stay in cache as a sweeps over them.
+
+    >>> multiply([[1, 2], [3, 4]], [[5, 6], [7, 8]])
+    array([[19, 22],
+           [43, 50]])
+    >>> multiply([[2**40, 0], [0, 1]], [[2**40, 1], [0, 1]])  # Too big.
+    [[1208925819614629174706176, 1099511627776], [0, 1]]
+    >>> from fractions import Fraction as F
+    >>> multiply([[F(1, 2), F(1, 3)]], [[F(1, 2)], [F(1, 3)]], block_size=1)
+    [[Fraction(13, 36)]]
+    >>> multiply([[1, 2]], [[1, 2]])
+    Traceback (most recent call last):
+      ...
+    ValueError: can't multiply 1x2 and 1x2 matrices
+    """
+    validate_positive('block_size', block_size)
+
+    my_a = _as_matrix(a)
+    my_b = _as_matrix(b)
+    a_height, a_width = _shape(my_a)
+    b_height, b_width = _shape(my_b)
+    if a_width != b_height:
+        raise ValueError(f"can't multiply {a_height}x{a_width}"
+                         f" and {b_height}x{b_width} matrices")
+
+    if isinstance(my_a, np.ndarray) and isinstance(my_b, np.ndarray):
+        if my_a.dtype.kind not in 'iu' or my_b.dtype.kind not in 'iu':
+            return my_a @ my_b
+        if _fits_in_int64(my_a, my_b):
+            return my_a.astype(np.int64) @ my_b.astype(np.int64)
+
+    if isinstance(my_a, np.ndarray):
+        my_a = my_a.tolist()
+    if isinstance(my_b, np.ndarray):
+        my_b = my_b.tolist()
+    return _multiply_blocked(my_a, my_b, block_size)
+
+
+def square(matrix, *, block_size=_BLOCK_SIZE):
+    """
+    Compute the matrix product of a square matrix with itself.
+
+    >>> square(((0, -1), (-1, 0)))
+    array([[1, 0],
+           [0, 1]])
+    """
+    my_matrix = _as_matrix(matrix)
+    return multiply(my_matrix, my_matrix, block_size=block_size)
+
+
+def to_flat(matrix):
+    """
+    Convert a matrix to a dict mapping 1-based (i, j) pairs to entries.
+
+    Entries of arrays are converted to Python numbers.
+
+    >>> to_flat(np.array([[1, 2], [3, 4]]))
+    {(1, 1): 1, (1, 2): 2, (2, 1): 3, (2, 2): 4}
+    """
+    rows = to_nested(matrix)
+    return {(i, j): entry
+            for i, row in enumerate(rows, 1)
+            for j, entry in enumerate(row, 1)}
+
+
+def to_nested(matrix):
+    """
+    Convert a matrix to a list of rows, each a list of entries.
+
+    Entries of arrays are converted to Python numbers.
+
+    >>> to_nested(np.array([[1.5, 2.0]]))
+    [[1.5, 2.0]]
+    >>> to_nested(((1, 2), (3, 4)))
+    [[1, 2], [3, 4]]
+    """
+    if isinstance(matrix, np.ndarray):
+        return matrix.tolist()
+    return [list(row) for row in matrix]
+
+
+def square_flat(f, n, *, block_size=_BLOCK_SIZE):
+    """
+    Square an n-by-n matrix. The result is a dict with index pairs as keys.
+
+    This returns the same result as gencomp2.matrix_square_flat, but calls f
+    only once per entry and multiplies with multiply. For float entries, the
+    results are equal only up to rounding error, as explained in multiply.
+
+    >>> b = ((1, 2, 3), (4, 5, 6), (7, 8, 9))
+    >>> square_flat(lambda i, j: b[i - 1][j - 1], 3) == {
+    ...     (1, 1):  30, (1, 2):  36, (1, 3):  42,
+    ...     (2, 1):  66, (2, 2):  81, (2, 3):  96,
+    ...     (3, 1): 102, (3, 2): 126, (3, 3): 150,
+    ... }
+    True
+    """
+    return to_flat(square(materialize(f, n), block_size=block_size))
+
+
+def square_nested(f, n, *, block_size=_BLOCK_SIZE):
+    """
+    Square an n-by-n matrix. The result is a nested list with 0-based indexing.
+
+    This returns the same result as gencomp2.matrix_square_nested, but calls f
+    only once per entry and multiplies with multiply. For float entries, the
+    results are equal only up to rounding error, as explained in multiply.
+
+    >>> b = ((1, 2, 3), (4, 5, 6), (7, 8, 9))
+    >>> square_nested(lambda i, j: b[i - 1][j - 1], 3)
+    [[30, 36, 42], [66, 81, 96], [102, 126, 150]]
+    >>> square_nested(lambda i, j: i + j, 0)
+    []
+    """
+    return to_nested(square(materialize(f, n), block_size=block_size))
+
+
+class TransposedView(Sequence):
+    """
+    Zero-copy view of the transpose of a matrix represented as a sequence of
+    rows, such as the tuples of tuples gencomp2.transpose accepts.
+
+    Creating the view takes O(1) time, and the view stores only a reference to
+    the matrix. A view is itself a sequence of rows, each a tuple made on
+    demand, in O(height) time, from a column of the underlying matrix. Columns
+    of the view are rows of the underlying matrix, returned without copying.
+    Indexing with a pair accesses a single entry in O(1) time.
+
+    If the underlying matrix is changed, the view reflects the changes.
+
+    >>> view = TransposedView(((1, 2, 3), (4, 5, 6)))
+    >>> view
+    TransposedView(((1, 2, 3), (4, 5, 6)))
+    >>> len(view), view.width
+    (3, 2)
+    >>> view[0], view[-1]
+    ((1, 4), (3, 6))
+    >>> view[2, 1]
+    6
+    >>> view.column(1)
+    (4, 5, 6)
+    >>> list(view)
+    [(1, 4), (2, 5), (3, 6)]
+    >>> view.materialize()
+    ((1, 4), (2, 5), (3, 6))
+    >>> view[3]
+    Traceback (most recent call last):
+      ...
+    IndexError: range object index out of range
+    """
+
+    __slots__ = ('_matrix',)
+
+    def __init__(self, matrix):
+        """Create a view of the transpose of matrix, a sequence of rows."""
+        self._matrix = matrix
+
+    def __repr__(self):
+        """Representation for debugging."""
+        return f'{type(self).__name__}({self._matrix!r})'
+
+    def __len__(self):
+        """Height of the view: the width of the underlying matrix."""
+        return len(self._matrix[0]) if self._matrix else 0
+
+    def __getitem__(self, index):
+        """Get a row of the view, a slice of rows, or an (i, j) entry."""
+        if isinstance(index, tuple):
+            i, j = index
+            return self._matrix[j][i]
+        if isinstance(index, slice):
+            return tuple(map(self.row, range(len(self))[index]))
+        return self.row(index)
+
+    def __iter__(self):
+        """Iterate over the rows of the view."""
+        return map(self.row, range(len(self)))
+
+    @property
+    def width(self):
+        """Width of the view: the height of the underlying matrix."""
+        return len(self._matrix)
+
+    @property
+    def matrix(self):
+        """The underlying matrix, whose transpose this is a view of."""
+        return self._matrix
+
+    def row(self, i):
+        """Get row i of the view (column i of the matrix) as a new tuple."""
+        i = range(len(self))[i]
+        return tuple(map(itemgetter(i), self._matrix))
+
+    def column(self, j):
+        """Get column j of the view (row j of the matrix), without copying."""
+        return self._matrix[j]
+
+    def materialize(self, *, strip_width=_STRIP_WIDTH):
+        """Build the transpose as a tuple of tuples, with transpose_blocked."""
+        return transpose_blocked(self._matrix, strip_width=strip_width)
+
+
+def transpose_blocked(matrix, *, strip_width=_STRIP_WIDTH):
+    """
+    Transpose a matrix represented as a tuple of tuples, a strip at a time.
+
+    This returns the same result as gencomp2.transpose. It slices strip_width
+    columns off every row, transposes that strip with zip, and moves on, so
+    the temporary slices never hold more than height * strip_width references,
+    however wide the matrix is. When a row is no wider than a strip, slicing it
+    returns the row itself, and this is as fast as gencomp2.transpose_alt.
+
+    >>> transpose_blocked(((1, 2, 3), (4, 5, 6)), strip_width=2)
+    ((1, 4), (2, 5), (3, 6))
+    >>> transpose_blocked(((1, 2), (3, 4), (5, 6)))
+    ((1, 3, 5), (2, 4, 6))
+    >>> transpose_blocked(())
+    ()
+    """
+    validate_positive('strip_width', strip_width)
+    if not matrix:
+        return ()
+
+    width = len(matrix[0])
+    result = []
+    for start in range(0, width, strip_width):
+        stop = start + strip_width
+        result.extend(zip(*[row[start:stop] for row in matrix]))
+    return tuple(result)
+
+
+def transpose_array(matrix):
+    """
+    Transpose a matrix with NumPy.
+
+    If matrix is already a NumPy array, this returns a view of its transpose,
+    without copying. Otherwise, the matrix is converted to an array first.
+
+    >>> a = np.arange(6).reshape(2, 3)
+    >>> t = transpose_array(a)
+    >>> t
+    array([[0, 3],
+           [1, 4],
+           [2, 5]])
+    >>> np.shares_memory(a, t)
+    True
+    >>> transpose_array(((1, 2), (3, 4))).tolist()
+    [[1, 3], [2, 4]]
+    """
+    return np.asarray(matrix).T
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
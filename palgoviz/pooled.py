@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""
+Mapping, filtering, and testing elements, with the calls run in a pool.
+
+gencomp1.map_one, gencomp1.map_one_alt, gencomp1.my_filter, and
+gencomp1.my_filter_alt call func or predicate on one element at a time. So do
+gencomp1.my_any, gencomp1.my_all, and their _alt versions, when passed a
+generator expression that calls a predicate. The functions here call func or
+predicate in a concurrent.futures executor instead:
+
+  Elements are taken from the iterable in chunks of chunk_size, and each chunk
+  is one task. With a process pool, this sends many elements, and gets back
+  many results, in each round trip.
+
+  At most window chunks are in flight at once. More are taken from the
+  iterable only as results are consumed, so an infinite iterable can be used,
+  and a slow consumer doesn't make results pile up.
+
+  If ordered is true, results are yielded in the same order as by the
+  sequential functions. Otherwise, each chunk's results are yielded as soon as
+  it is done, which keeps workers busy when some chunks are much slower.
+
+pooled_map and pooled_filter are lazy: nothing is submitted until the first
+result is requested. pooled_any and pooled_all stop as soon as the result is
+known. If no executor is passed, a ThreadPoolExecutor is made for each call,
+and shut down when the generator finishes or is closed, or when pooled_any or
+pooled_all returns. A passed executor (such as a ProcessPoolExecutor, which
+func or predicate must then be picklable for) is left open. Either way, chunks
+not yet started are canceled when no longer needed. Chunks already running
+can't be stopped, but at most window of them are, and nothing waits for them:
+they finish in the background, and their results are discarded.
+"""
+
+__all__ = ['pooled_map', 'pooled_filter', 'pooled_any', 'pooled_all']
+
+import collections
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import contextlib
+import itertools
+import os
+
+from palgoviz.util import batches, validate_positive
+
+
+def _apply_chunk(func, chunk):
+    """Call func on each element of a chunk. This runs in a worker."""
+    return list(map(func, chunk))
+
+
+def _filter_chunk(predicate, chunk):
+    """Keep the elements of a chunk that satisfy predicate, in a worker."""
+    return list(filter(predicate, chunk))
+
+
+def _any_chunk(predicate, chunk):
+    """Check if any element of a chunk satisfies predicate, in a worker."""
+    return any(chunk if predicate is None else map(predicate, chunk))
+
+
+def _all_chunk(predicate, chunk):
+    """Check if all elements of a chunk satisfy predicate, in a worker."""
+    return all(chunk if predicate is None else map(predicate, chunk))
+
+
+def _run_chunks(task, func, iterable, executor, workers, window, chunk_size,
+                ordered):
+    """
+    Yield task(func, chunk) for chunks of iterable, computed in an executor.
+
+    This holds the logic common to all the public functions in this module.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    else:
+        validate_positive('workers', workers)
+    if window is None:
+        window = workers * 2
+    else:
+        validate_positive('window', window)
+    validate_positive('chunk_size', chunk_size)
+
+    chunks = batches(iterable, chunk_size)
+
+    owned = executor is None
+    if owned:
+        executor = ThreadPoolExecutor(workers)
+
+    def submit_more(count):
+        for chunk in itertools.islice(chunks, count):
+            yield executor.submit(task, func, chunk)
+
+    pending = collections.deque() if ordered else set()
+    finished = False
+    try:
+        if ordered:
+            pending.extend(submit_more(window))
+            while pending:
+                result = pending.popleft().result()
+                pending.extend(submit_more(1))
+                yield result
+        else:
+            pending.update(submit_more(window))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                pending.update(submit_more(len(done)))
+                for future in done:
+                    yield future.result()
+        finished = True
+    finally:
+        for future in pending:
+            future.cancel()
+        if owned:
+            # If stopping early, don't wait for chunks that are running.
+            executor.shutdown(wait=finished, cancel_futures=True)
+
+
+def pooled_map(func, iterable, *, executor=None, workers=None, window=None,
+               chunk_size=1, ordered=True):
+    """
+    Map values from an iterable through the unary function func, in a pool.
+
+    This is like gencomp1.map_one, but func is called in executor, or if that
+    is None, in a pool of threads, as many as workers (os.cpu_count() if
+    None). At most window chunks of chunk_size elements are in flight at once
+    (twice workers if None). If ordered is false, results may be yielded out
+    of order. See the module docstring for details.
+
+    If func raises an exception, it is raised here when the result that
+    would have come from the call is reached.
+
+    >>> list(pooled_map(lambda x: x**2, range(1, 11), chunk_size=3))
+    [1, 4, 9, 16, 25, 36, 49, 64, 81, 100]
+    >>> sorted(pooled_map(len, ['foobar', (10, 20)], ordered=False))
+    [2, 6]
+    >>> import itertools
+    >>> squares = pooled_map(lambda x: x**2, itertools.count(), workers=2)
+    >>> [next(squares) for _ in range(5)]
+    [0, 1, 4, 9, 16]
+    >>> squares.close()
+    """
+    chunk_results = _run_chunks(_apply_chunk, func, iterable, executor,
+                                workers, window, chunk_size, ordered)
+    with contextlib.closing(chunk_results):
+        for results in chunk_results:
+            yield from results
+
+
+def pooled_filter(predicate, iterable, *, executor=None, workers=None,
+                  window=None, chunk_size=1, ordered=True):
+    """
+    Yield the values in an iterable that satisfy predicate, checked in a pool.
+
+    This is like gencomp1.my_filter, including that if predicate is None,
+    truthy values are yielded, but predicate is called in a pool as by
+    pooled_map, and takes the same other arguments. Only elements that satisfy
+    predicate are sent back from workers.
+
+    >>> foods = ['ham', 'spam', 'foo', 'eggs']
+    >>> list(pooled_filter(lambda x: len(x) == 3, foods, chunk_size=2))
+    ['ham', 'foo']
+    >>> list(pooled_filter(None, [0, 1, [], [2], '', 'x'], workers=3))
+    [1, [2], 'x']
+    """
+    chunk_results = _run_chunks(_filter_chunk, predicate, iterable,
+                                executor, workers, window, chunk_size,
+                                ordered)
+    with contextlib.closing(chunk_results):
+        for results in chunk_results:
+            yield from results
+
+
+def _decide(task, predicate, iterable, executor, workers, window, chunk_size,
+            deterministic, decisive):
+    """Return decisive if task gives it for any chunk, else not decisive."""
+    chunk_results = _run_chunks(task, predicate, iterable, executor, workers,
+                                window, chunk_size, deterministic)
+    with contextlib.closing(chunk_results):
+        for result in chunk_results:
+            if result is decisive:
+                return decisive
+    return not decisive
+
+
+def pooled_any(predicate, iterable, *, executor=None, workers=None,
+               window=None, chunk_size=1, deterministic=False):
+    """
+    Test if any element of an iterable satisfies predicate, checked in a pool.
+
+    This is like gencomp1.my_any(map(predicate, iterable)), or
+    gencomp1.my_any(iterable) if predicate is None, but predicate is called in
+    a pool, with the same other arguments as pooled_map. Each chunk stops at
+    its first element that satisfies predicate. As soon as any chunk has one,
+    chunks not yet started are canceled, no more are submitted, and True is
+    returned.
+
+    If deterministic is false, the first chunk to finish with an element that
+    satisfies predicate decides the result, and an exception raised in a chunk
+    that finishes before then is raised here. If deterministic is true, chunks
+    are checked in order, as gencomp1.my_any would check their elements. Then
+    predicate raising on an element is only raised here if no earlier element
+    satisfies predicate, and the result is exactly as if the iterable were
+    checked sequentially, though later elements may have been checked too.
+
+    >>> pooled_any(lambda x: x % 17 == 0, range(1, 100), chunk_size=8)
+    True
+    >>> pooled_any(lambda x: x > 100, range(100), workers=2)
+    False
+    >>> import itertools
+    >>> pooled_any(lambda x: x**2 > 50, itertools.count(), deterministic=True)
+    True
+    >>> pooled_any(None, [])
+    False
+    """
+    return _decide(_any_chunk, predicate, iterable, executor, workers, window,
+                   chunk_size, deterministic, True)
+
+
+def pooled_all(predicate, iterable, *, executor=None, workers=None,
+               window=None, chunk_size=1, deterministic=False):
+    """
+    Test if all elements of an iterable satisfy predicate, checked in a pool.
+
+    This is like gencomp1.my_all(map(predicate, iterable)), or
+    gencomp1.my_all(iterable) if predicate is None, but predicate is called
+    in a pool. It works the same as pooled_any, except that chunks stop, and
+    the result is decided, at an element that does not satisfy predicate,
+    and then False is returned.
+
+    >>> pooled_all(lambda x: x % 17 == 0, range(0, 100, 17), chunk_size=2)
+    True
+    >>> pooled_all(lambda x: x < 10, range(100), deterministic=True)
+    False
+    >>> pooled_all(None, [1, 1, 1, 6, 7], workers=3)
+    True
+    >>> pooled_all(None, [])
+    True
+    """
+    return _decide(_all_chunk, predicate, iterable, executor, workers, window,
+                   chunk_size, deterministic, False)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
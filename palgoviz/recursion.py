@@ -48,6 +48,7 @@ __all__ = [
     'merge_sort',
     'merge_sort_bottom_up_unstable',
     'merge_sort_bottom_up',
+    'tune_merge_sort_cutoff',
     'make_deep_tuple',
     'nest',
     'observe_edge',
@@ -64,8 +65,11 @@ __all__ = [
 
 import bisect
 import collections
+import functools
+import timeit
 
-from palgoviz import caching
+from palgoviz import caching, tracing
+from palgoviz.util import identity_function
 
 
 def countdown(n):
@@ -479,7 +483,29 @@ def binary_search_good(values, x):
     return index if (index < len(values)) and (values[index] == x) else None
 
 
-def binary_insertion_sort(values):
+def _sort_by_key(sort, values, key, reverse):
+    """
+    Sort values by key with a sort that accepts no key, preserving stability.
+
+    This is a decorate-sort-undecorate helper for the sorts below that accept
+    key and reverse arguments. Each key is computed exactly once. The sort is
+    given (key, index) pairs, so it compares keys and never compares values.
+    For a reverse sort, indices are negated so that equal keys come out last
+    first, and then the sorted pairs are reversed, which keeps it stable.
+    """
+    if key is None:
+        key = identity_function
+
+    my_values = list(values)
+    sign = -1 if reverse else 1
+    pairs = sort([(key(value), sign * index)
+                  for index, value in enumerate(my_values)])
+    if reverse:
+        pairs.reverse()
+    return [my_values[sign * index] for _, index in pairs]
+
+
+def binary_insertion_sort(values, *, key=None, reverse=False):
     """
     Iterative stable binary insertion sort, creating a new list.
 
@@ -515,7 +541,19 @@ def binary_insertion_sort(values):
     ['bar', 'baz', 'eggs', 'foo', 'foobar', 'ham', 'quux', 'spam']
     >>> binary_insertion_sort([0.0, 0, False])  # Stable sort.
     [0.0, 0, False]
+
+    As with sorted, key is a function to sort by, and reverse=True sorts in
+    descending order, while still preserving the relative order of equal items.
+    The other sorts that accept key and reverse support them the same way.
+
+    >>> binary_insertion_sort(b, key=len)
+    ['foo', 'bar', 'baz', 'ham', 'quux', 'spam', 'eggs', 'foobar']
+    >>> binary_insertion_sort(b, key=len, reverse=True)
+    ['foobar', 'quux', 'spam', 'eggs', 'foo', 'bar', 'baz', 'ham']
     """
+    if key is not None or reverse:
+        return _sort_by_key(binary_insertion_sort, values, key, reverse)
+
     output = []
     for element in values:
         bisect.insort_right(output, element)
@@ -660,7 +698,7 @@ def insort_right_linear(sorted_items, new_item):
     sorted_items.insert(insertion_point, new_item)
 
 
-def insertion_sort(values):
+def insertion_sort(values, *, key=None, reverse=False):
     """
     Iterative stable insertion sort, creating a new list.
 
@@ -694,7 +732,12 @@ def insertion_sort(values):
     ['bar', 'baz', 'eggs', 'foo', 'foobar', 'ham', 'quux', 'spam']
     >>> insertion_sort([0.0, 0, False])  # It's a stable sort.
     [0.0, 0, False]
+    >>> insertion_sort(b, key=len, reverse=True)
+    ['foobar', 'quux', 'spam', 'eggs', 'foo', 'bar', 'baz', 'ham']
     """
+    if key is not None or reverse:
+        return _sort_by_key(insertion_sort, values, key, reverse)
+
     output = []
     for element in values:
         insort_right_linear(output, element)
@@ -915,10 +958,17 @@ def merge_two_alt(values1, values2):
     return results
 
 
-def merge_sort(values, *, merge=merge_two):
+def merge_sort(values, *, merge=merge_two, cutoff=1,
+               small_sort=binary_insertion_sort, key=None, reverse=False):
     """
     Merge sort recursively using a two way merge function.
 
+    Subproblems of length at most cutoff are not split further, but are sorted
+    with small_sort instead, which must be a stable sort that returns a list.
+    On small inputs, an insertion sort does less work than the recursive calls,
+    slicing, and merging it replaces. The default cutoff of 1 makes this a pure
+    mergesort. To find a good cutoff, see tune_merge_sort_cutoff (below).
+
     >>> merge_sort([])
     []
     >>> merge_sort(())
@@ -939,16 +989,51 @@ def merge_sort(values, *, merge=merge_two):
     ['bar', 'baz', 'eggs', 'foo', 'foobar', 'ham', 'quux', 'spam']
     >>> merge_sort([0.0, 0, False])  # It's a stable sort.
     [0.0, 0, False]
+    >>> merge_sort(a, cutoff=4)
+    [-7225, -7129, -6307, 389, 1555, 1597, 2673, 3446, 5315, 5660]
+    >>> merge_sort(b, cutoff=3, small_sort=insertion_sort)
+    ['bar', 'baz', 'eggs', 'foo', 'foobar', 'ham', 'quux', 'spam']
+    >>> merge_sort([0.0, 0, False, 0, 0.0], cutoff=2)  # Still stable.
+    [0.0, 0, False, 0, 0.0]
+    >>> merge_sort(b, key=len, reverse=True)
+    ['foobar', 'quux', 'spam', 'eggs', 'foo', 'bar', 'baz', 'ham']
+    """
+    if key is not None or reverse:
+        return _sort_by_key(
+            functools.partial(merge_sort, merge=merge, cutoff=cutoff,
+                              small_sort=small_sort),
+            values, key, reverse)
+
+    return _merge_sort(values, merge, cutoff, small_sort, None, None)
+
+
+def _merge_sort(values, merge, cutoff, small_sort, on_node, on_edge):
     """
-    def helper(values):
+    Merge sort recursively, as in merge_sort, reporting subproblems if asked.
+
+    If on_node is not None, it is called with each subproblem's input, before
+    that subproblem is solved. If on_edge is not None, it is called as
+    on_edge(parent, child) for each subproblem, right after on_node.
+    """
+    def helper(parent, values):
+        if on_node is not None:
+            on_node(values)
+        if on_edge is not None and parent is not None:
+            on_edge(parent, values)
+
         # base case: length is less than 2, return the list
         if len(values) < 2:
             return values
 
+        # small case: hand the subproblem off to the small sort
+        if len(values) <= cutoff:
+            return small_sort(values)
+
         halfway = len(values) // 2
-        return merge(helper(values[:halfway]), helper(values[halfway:]))
+        return merge(helper(values, values[:halfway]),
+                     helper(values, values[halfway:]))
 
-    return helper(list(values))
+    return helper(None, list(values))
 
 
 def merge_sort_bottom_up_unstable(values, *, merge=merge_two):
@@ -997,10 +1082,16 @@ def merge_sort_bottom_up_unstable(values, *, merge=merge_two):
     return queue[0]
 
 
-def merge_sort_bottom_up(values, *, merge=merge_two):
+def merge_sort_bottom_up(values, *, merge=merge_two, cutoff=1,
+                         small_sort=binary_insertion_sort, key=None,
+                         reverse=False):
     """
     Sort bottom-up, using a two way merge function, iteratively. Stable.
 
+    The initial runs have length cutoff (except the last, which may be shorter)
+    and are sorted by small_sort, as in merge_sort (above). The default cutoff
+    of 1 makes the initial runs singletons, so small_sort is never called.
+
     >>> merge_sort_bottom_up([])
     []
     >>> merge_sort_bottom_up(())
@@ -1023,11 +1114,29 @@ def merge_sort_bottom_up(values, *, merge=merge_two):
     [1, 2, 3, 4, 5, 6, 7]
     >>> merge_sort_bottom_up([0.0, 0, False])  # It's a stable sort.
     [0.0, 0, False]
+    >>> merge_sort_bottom_up([7, 6, 5, 4, 3, 2, 1], cutoff=3)
+    [1, 2, 3, 4, 5, 6, 7]
+    >>> merge_sort_bottom_up([0.0, 0, False, 0, 0.0], cutoff=2)  # Stable.
+    [0.0, 0, False, 0, 0.0]
+    >>> merge_sort_bottom_up(b, key=len, reverse=True)
+    ['foobar', 'quux', 'spam', 'eggs', 'foo', 'bar', 'baz', 'ham']
     """
+    if key is not None or reverse:
+        return _sort_by_key(
+            functools.partial(merge_sort_bottom_up, merge=merge,
+                              cutoff=cutoff, small_sort=small_sort),
+            values, key, reverse)
+
     if not values:
         return []
 
-    queue = collections.deque([x] for x in values)
+    if cutoff > 1:
+        my_values = list(values)
+        queue = collections.deque(small_sort(my_values[i:i + cutoff])
+                                  for i in range(0, len(my_values), cutoff))
+    else:
+        queue = collections.deque([x] for x in values)
+
     queue2 = collections.deque()
 
     while len(queue) > 1:
@@ -1044,6 +1153,45 @@ def merge_sort_bottom_up(values, *, merge=merge_two):
     return queue[0]
 
 
+def tune_merge_sort_cutoff(sample, *, sort=merge_sort,
+                           small_sort=binary_insertion_sort,
+                           candidates=(1, 2, 4, 8, 16, 32, 64), repeat=3):
+    """
+    Find which cutoff, of the candidates, makes sort fastest on sample.
+
+    This is a small benchmark. sort is merge_sort or merge_sort_bottom_up (or
+    another sort accepting cutoff and small_sort keyword arguments), and sample
+    should be typical of the data to be sorted: both its length and the type of
+    its elements affect the result, as does the machine the benchmark runs on.
+    Each candidate is timed repeat times; the best of its times is used.
+
+    >>> import random
+    >>> sample = [random.random() for _ in range(200)]
+    >>> cutoff = tune_merge_sort_cutoff(sample, candidates=(1, 8), repeat=1)
+    >>> cutoff in (1, 8)
+    True
+    >>> merge_sort(sample, cutoff=cutoff) == sorted(sample)
+    True
+    >>> tune_merge_sort_cutoff(sample, candidates=())
+    Traceback (most recent call last):
+      ...
+    ValueError: no candidate cutoffs to try
+    """
+    if not candidates:
+        raise ValueError('no candidate cutoffs to try')
+
+    my_sample = list(sample)
+
+    def best_time(cutoff):
+        return min(timeit.repeat(
+            lambda: sort(my_sample, cutoff=cutoff, small_sort=small_sort),
+            number=1,
+            repeat=repeat,
+        ))
+
+    return min(candidates, key=best_time)
+
+
 def make_deep_tuple(depth):
     """Make a tuple of the specified depth."""
     tup = ()
@@ -1116,13 +1264,27 @@ def flatten(root):
     >>> list(flatten(nest('hi', 3, 3))) == ['hi'] * 27
     True
     """
+    return _flatten(root, None)
+
+
+def _flatten(parent, on_edge):
+    """Yield leaves of parent recursively, calling on_edge if it's not None."""
     # base case: we are at a leaf
-    if not isinstance(root, tuple):
-        yield root
+    if not isinstance(parent, tuple):
+        yield parent
         return
 
-    for element in root:
-        yield from flatten(element)
+    for element in parent:
+        if on_edge is not None:
+            on_edge(parent, element)
+        yield from _flatten(element, on_edge)
+
+
+def _observing(traverse, root, observer):
+    """Call traverse(root, on_edge), with on_edge reporting to observer."""
+    if isinstance(observer, tracing.Tracer):
+        return observer.flushing(traverse(root, observer.record_edge))
+    return traverse(root, observer)
 
 
 def flatten_observed(root, observer):
@@ -1132,6 +1294,11 @@ def flatten_observed(root, observer):
     This is like flatten (above), but it also calls observer(parent, child) for
     each child found, in the order they are found.
 
+    observer may instead be a tracing.Tracer, which receives the same edges in
+    chunks (and may sample them), or None, in which case this works just like
+    flatten. The other *_observed functions accept observers in the same ways.
+    A callable observer is called directly, without going through a Tracer.
+
     >>> list(flatten_observed((), observe_edge))
     []
     >>> list(flatten_observed(({()},), observe_edge))
@@ -1151,15 +1318,17 @@ def flatten_observed(root, observer):
     (4, (5,), (), 6)  ->  ()
     (4, (5,), (), 6)  ->  6
     [1, 2, 3, 4, 5, 6]
+    >>> def show_children(edges): print([child for _, child in edges])
+    >>> tracer = tracing.Tracer(show_children, chunk_size=4)
+    >>> list(flatten_observed(root3, tracer))
+    [(1, (2,), 3), 1, (2,), 2]
+    [3, (4, (5,), (), 6), 4, (5,)]
+    [5, (), 6]
+    [1, 2, 3, 4, 5, 6]
+    >>> list(flatten_observed(root3, None))
+    [1, 2, 3, 4, 5, 6]
     """
-    # Base case: we are at a leaf.
-    if not isinstance(root, tuple):
-        yield root
-        return
-
-    for element in root:
-        observer(root, element)
-        yield from flatten_observed(element, observer)
+    return _observing(_flatten, root, observer)
 
 
 def flatten_iterative(root):
@@ -1189,14 +1358,28 @@ def flatten_iterative(root):
     >>> list(flatten_iterative(nest('hi', 3, 3))) == ['hi'] * 27
     True
     """
-    stack = [root]
+    return _flatten_iterative(root, None)
+
+
+def _flatten_iterative(root, on_edge):
+    """Yield leaves of root iteratively, calling on_edge if it's not None."""
+    if not isinstance(root, tuple):
+        yield root
+        return
+
+    stack = [(root, iter(root))]
 
     while stack:
-        element = stack.pop()
-        if isinstance(element, tuple):
-            stack.extend(reversed(element))
-        else:
+        parent, children = stack[-1]
+        for element in children:
+            if on_edge is not None:
+                on_edge(parent, element)
+            if isinstance(element, tuple):
+                stack.append((element, iter(element)))
+                break
             yield element
+        else:
+            stack.pop()
 
 
 def flatten_iterative_observed(root, observer):
@@ -1233,17 +1416,7 @@ def flatten_iterative_observed(root, observer):
     (4, (5,), (), 6)  ->  6
     [1, 2, 3, 4, 5, 6]
     """
-    stack = [(None, root)]
-
-    while stack:
-        parent, element = stack.pop()
-        if parent is not None:
-            observer(parent, element)
-
-        if isinstance(element, tuple):
-            stack.extend((element, child) for child in reversed(element))
-        else:
-            yield element
+    return _observing(_flatten_iterative, root, observer)
 
 
 def flatten_levelorder(root):
@@ -1279,11 +1452,19 @@ def flatten_levelorder(root):
     >>> list(flatten_levelorder(nest('hi', 3, 3))) == ['hi'] * 27
     True
     """
+    return _flatten_levelorder(root, None)
+
+
+def _flatten_levelorder(root, on_edge):
+    """Yield leaves of root breadth-first, calling on_edge if it's not None."""
     queue = collections.deque((root,))
 
     while queue:
         element = queue.popleft()
         if isinstance(element, tuple):
+            if on_edge is not None:
+                for child in element:
+                    on_edge(element, child)
             queue.extend(element)
         else:
             yield element
@@ -1317,17 +1498,16 @@ def flatten_levelorder_observed(root, observer):
     (2,)  ->  2
     (5,)  ->  5
     [1, 3, 4, 6, 2, 5]
+    >>> def show_children(edges): print([child for _, child in edges])
+    >>> tracer = tracing.Tracer(show_children, chunk_size=3, sample_every=2)
+    >>> list(flatten_levelorder_observed(root3, tracer))
+    [(1, (2,), 3), 1]
+    [3]
+    [(5,), 6]
+    [5]
+    [1, 3, 4, 6, 2, 5]
     """
-    queue = collections.deque((root,))
-
-    while queue:
-        element = queue.popleft()
-        if isinstance(element, tuple):
-            for subelement in element:
-                observer(element, subelement)
-            queue.extend(element)
-        else:
-            yield element
+    return _observing(_flatten_levelorder, root, observer)
 
 
 def leaf_sum(root):
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""
+Skipping elements without stepping through them, when the source allows it.
+
+gencomp1.drop and gencomp1.pick advance past skipped elements one by one, even
+when the iterable is a list or range that could be indexed directly. skip
+checks what the iterable supports and uses the fastest way available:
+
+  A range is sliced, which is O(1).
+
+  A fresh iterator over a list, tuple, str, bytes, bytearray, or array.array
+  has its position set directly, which is O(1). It is still a live iterator
+  over the original object, as with iter, so changes to a list show up as
+  usual. If n is at least the length, the iterator is exhausted, as it would
+  be by advancing it, so it stays empty even if the list grows.
+
+  Anything else, including other sequences (such as a deque, which may not
+  index in O(1) time), file objects, generators, and iterators that may
+  already be partly consumed, is advanced with itertools.islice, which runs
+  at C speed but is still O(n) to skip n elements.
+
+take_fast, drop_fast, and pick_fast use skip (or, for take_fast, slicing) to do
+what gencomp1.take, gencomp1.drop, and gencomp1.pick do.
+"""
+
+__all__ = ['skip', 'take_fast', 'drop_fast', 'pick_fast']
+
+import array
+from collections.abc import Sequence
+import itertools
+
+_POSITIONABLE_ITERATOR_TYPES = frozenset(
+    type(iter(sequence))
+    for sequence in ([], (), '', '\N{GREEK SMALL LETTER ALPHA}', b'',
+                     bytearray(), array.array('b'))
+)
+"""Iterator types whose position can be set with __setstate__, as by pickle."""
+
+
+def _validate_count(n, message):
+    """Check that n is a nonnegative int, with message if it is negative."""
+    if not isinstance(n, int):
+        raise TypeError('n must be an int')
+
+    if n < 0:
+        raise ValueError(message)
+
+
+def skip(iterable, n):
+    """
+    Return an iterator over the elements of iterable after the first n.
+
+    The skipping is done immediately, in O(1) time when possible (see the
+    module docstring). If the iterable is an iterator, that iterator is
+    advanced, and may be returned.
+
+    >>> list(skip(range(10), 7))
+    [7, 8, 9]
+    >>> next(skip(range(10**20), 10**19))
+    10000000000000000000
+    >>> a = [10, 20, 30]
+    >>> it = skip(a, 2)
+    >>> a.append(40)
+    >>> list(it)
+    [30, 40]
+    >>> list(skip('abc', 5))
+    []
+    >>> b = [1, 2]
+    >>> it = skip(b, 5)
+    >>> b.extend([3, 4, 5, 6, 7])
+    >>> list(it)  # Exhausted, just as if it had been advanced 5 times.
+    []
+    >>> it = iter(range(10))
+    >>> next(it)
+    0
+    >>> list(skip(it, 5))
+    [6, 7, 8, 9]
+    >>> skip([], -1)
+    Traceback (most recent call last):
+      ...
+    ValueError: can't skip negatively many items
+    """
+    _validate_count(n, "can't skip negatively many items")
+
+    if isinstance(iterable, range):
+        return iter(iterable[n:])
+
+    it = iter(iterable)
+
+    if it is not iterable and type(it) in _POSITIONABLE_ITERATOR_TYPES:
+        # __setstate__ clamps the position to the length, but doesn't exhaust
+        # the iterator, so it would resume if the sequence grew. Exhaust it.
+        length = len(iterable)
+        if n < length:
+            it.__setstate__(n)
+        else:
+            it.__setstate__(length)
+            next(it, None)
+        return it
+
+    next(itertools.islice(it, n, n), None)
+    return it
+
+
+def take_fast(iterable, n):
+    """
+    Return an iterator over the first n elements of iterable, or all if fewer.
+
+    This is like gencomp1.take, but it slices a range (in O(1) time) and uses
+    itertools.islice otherwise.
+
+    >>> list(take_fast(range(10**20), 3))
+    [0, 1, 2]
+    >>> list(take_fast((x**2 for x in range(5)), 10))
+    [0, 1, 4, 9, 16]
+    >>> take_fast([], -1)
+    Traceback (most recent call last):
+      ...
+    ValueError: can't yield negatively many items
+    """
+    _validate_count(n, "can't yield negatively many items")
+
+    if isinstance(iterable, range):
+        return iter(iterable[:n])
+
+    return itertools.islice(iterable, n)
+
+
+def drop_fast(iterable, n):
+    """
+    Skip the first n elements of iterable (or all if fewer). Yield the rest.
+
+    This is like gencomp1.drop, but it uses skip. Unlike gencomp1.drop, the
+    skipping happens when drop_fast is called, not on the first call to next.
+
+    >>> list(drop_fast(range(5), 2))
+    [2, 3, 4]
+    >>> list(drop_fast('pqr', True))  # OK, since bool is a subclass of int.
+    ['q', 'r']
+    >>> drop_fast(range(5), -1.0)
+    Traceback (most recent call last):
+      ...
+    TypeError: n must be an int
+    """
+    return skip(iterable, n)
+
+
+def pick_fast(iterable, index):
+    """
+    Return the item from the iterable at the index (0-based indexing).
+
+    This is like gencomp1.pick, but a sequence is indexed directly, and other
+    iterables are advanced with skip. If index is out of range or negative,
+    raise IndexError.
+
+    >>> pick_fast(range(10**20), 10**19 + 1)
+    10000000000000000001
+    >>> pick_fast(iter(range(10_000)), 4422)
+    4422
+    >>> pick_fast([10, 20], 2)
+    Traceback (most recent call last):
+      ...
+    IndexError: index out of range
+    >>> pick_fast([10], -1)
+    Traceback (most recent call last):
+      ...
+    IndexError: negative indices are not supported
+    """
+    if index < 0:
+        raise IndexError('negative indices are not supported')
+
+    if isinstance(iterable, Sequence):
+        try:
+            return iterable[index]
+        except IndexError:
+            raise IndexError('index out of range') from None
+
+    for element in skip(iterable, index):
+        return element
+
+    raise IndexError('index out of range')
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
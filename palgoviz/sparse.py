@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""
+Sparse vectors stored as sorted arrays of indices and values.
+
+gencomp2.dot_product takes vectors represented as dicts, and hashes each key of
+the smaller one every time it is called. A SparseVector sorts its indices once,
+so dot products are computed by finding the indices two vectors share, which
+NumPy does without running any Python code per index. Dot products of one
+vector with many, and of many with many, are also supported.
+"""
+
+__all__ = ['SparseVector', 'dot_matrix']
+
+import numpy as np
+
+from palgoviz.gencomp2 import dot_product
+
+
+class SparseVector:
+    """
+    A sparse real-valued vector, with its nonzero components sorted by index.
+
+    Indices are the keys of the dict form that gencomp2.dot_product accepts.
+    They must be mutually comparable: usually all ints, or all strings.
+    Components whose values are zero are not stored.
+
+    >>> u = SparseVector.from_dict({'a': 2, 'b': 3, 'c': 4, 'd': 5})
+    >>> v = SparseVector.from_dict({'b': 0.5, 'd': 1, 'e': 0})
+    >>> v
+    SparseVector.from_dict({'b': 0.5, 'd': 1.0})
+    >>> len(v)
+    2
+    >>> u.dot(v)
+    6.5
+    >>> u.dot(v) == v.dot(u) == dot_product(u.to_dict(), v.to_dict())
+    True
+    >>> SparseVector.from_dict({3: 4, 1: 3}).norm
+    5.0
+    >>> u.dot_many([v, u, SparseVector.from_dict({})])
+    array([ 6.5, 54. ,  0. ])
+    >>> SparseVector(['x', 'x'], [1, 2])
+    Traceback (most recent call last):
+      ...
+    ValueError: duplicate index 'x'
+    >>> SparseVector.from_dict({'a': 1, 1: 2})
+    Traceback (most recent call last):
+      ...
+    TypeError: indices must be mutually comparable
+    """
+
+    __slots__ = ('_indices', '_values', '_norm')
+
+    def __init__(self, indices, values):
+        """Create a sparse vector from parallel index and value sequences."""
+        my_indices = _as_index_array(indices)
+        my_values = np.asarray(values, dtype=float)
+        if my_indices.shape != my_values.shape or my_indices.ndim != 1:
+            raise ValueError('indices and values must be 1-D, of equal length')
+
+        try:
+            order = np.argsort(my_indices, kind='stable')
+        except TypeError as error:
+            raise TypeError('indices must be mutually comparable') from error
+        my_indices = my_indices[order]
+        my_values = my_values[order]
+
+        duplicates = np.flatnonzero(my_indices[1:] == my_indices[:-1])
+        if duplicates.size:
+            duplicate = my_indices[duplicates[0]].item()
+            raise ValueError(f'duplicate index {duplicate!r}')
+
+        nonzero = my_values != 0
+        self._indices = my_indices[nonzero]
+        self._values = my_values[nonzero]
+        self._indices.flags.writeable = False
+        self._values.flags.writeable = False
+        self._norm = None
+
+    @classmethod
+    def from_dict(cls, mapping):
+        """Create a sparse vector from a dict mapping indices to values."""
+        return cls(list(mapping.keys()), list(mapping.values()))
+
+    def to_dict(self):
+        """Make a dict mapping indices to values, as dot_product accepts."""
+        return dict(zip(self._indices.tolist(), self._values.tolist()))
+
+    def __repr__(self):
+        """Represent this SparseVector as Python code."""
+        return f'{type(self).__name__}.from_dict({self.to_dict()!r})'
+
+    def __len__(self):
+        """Number of stored (nonzero) components."""
+        return len(self._indices)
+
+    @property
+    def indices(self):
+        """Read-only sorted array of the indices of nonzero components."""
+        return self._indices
+
+    @property
+    def values(self):
+        """Read-only array of nonzero components, in the order of indices."""
+        return self._values
+
+    @property
+    def norm(self):
+        """Euclidean norm (length) of this vector, computed on first use."""
+        if self._norm is None:
+            self._norm = float(np.sqrt(self._values @ self._values))
+        return self._norm
+
+    def dot(self, other):
+        """
+        Compute the dot product of this vector with another.
+
+        Shared indices are found by intersecting the sorted index arrays.
+
+        >>> u = SparseVector.from_dict({1: 2.0, 5: -1.0, 9: 4.0})
+        >>> u.dot(SparseVector.from_dict({5: 3.0, 9: 0.5, 12: 7.0}))
+        -1.0
+        >>> u.dot(SparseVector.from_dict({'5': 3.0}))  # 5 isn't '5'.
+        0.0
+        """
+        kind = _index_kind(self._indices)
+        if kind is None or kind != _index_kind(other._indices):
+            return float(dot_product(self.to_dict(), other.to_dict()))
+
+        _, mine, theirs = np.intersect1d(self._indices, other._indices,
+                                         assume_unique=True,
+                                         return_indices=True)
+        return float(self._values[mine] @ other._values[theirs])
+
+    def dot_many(self, others, *, normalize=False):
+        """
+        Compute an array of the dot products of this vector with others.
+
+        All the others' indices are looked up in this vector's indices at once,
+        by binary search, and the products are summed per vector by bincount.
+
+        If normalize is true, each dot product is divided by the norms of both
+        vectors, giving cosine similarities. (Zero vectors give NaN.)
+
+        >>> u = SparseVector.from_dict({'a': 1.0, 'b': 1.0})
+        >>> vs = [SparseVector.from_dict({'a': 3.0}),
+        ...       SparseVector.from_dict({'a': 1.0, 'b': 1.0, 'c': 7.0}),
+        ...       SparseVector.from_dict({'c': 2.0})]
+        >>> u.dot_many(vs)
+        array([3., 2., 0.])
+        >>> u.dot_many(vs, normalize=True).round(3)
+        array([0.707, 0.198, 0.   ])
+        """
+        batch = _Batch(others)
+        return batch.dot(self, normalize=normalize)
+
+
+def _as_index_array(indices):
+    """
+    Make a 1-D array of indices, even if the indices are tuples.
+
+    Indices of different types are stored as objects, just as a dict stores
+    them. Otherwise NumPy would convert them to a common type, such as ints and
+    strings to strings, which changes them and can make unequal indices equal.
+    """
+    if (not isinstance(indices, np.ndarray)
+            and len(set(map(type, indices))) > 1):
+        return _as_object_array(indices)
+
+    try:
+        my_indices = np.asarray(indices)
+    except ValueError:  # Tuples of different lengths.
+        pass
+    else:
+        if my_indices.ndim == 1:
+            return my_indices
+
+    return _as_object_array(indices)
+
+
+def _as_object_array(indices):
+    """Make a 1-D array of indices as Python objects, converting nothing."""
+    my_indices = np.empty(len(indices), dtype=object)
+    my_indices[:] = list(indices)
+    return my_indices
+
+
+def _index_kind(indices):
+    """Get a key for the kind of indices, equal if they are comparable."""
+    kind = indices.dtype.kind
+    if kind == 'O':
+        return None  # Arbitrary objects, which NumPy can't compare reliably.
+    return 'n' if kind in 'iuf' else kind
+
+
+class _Batch:
+    """Sparse vectors whose components are concatenated, grouped by kind."""
+
+    __slots__ = ('_vectors', '_kinds', '_groups', '_norms')
+
+    def __init__(self, vectors):
+        """Concatenate each group of vectors whose indices are comparable."""
+        self._vectors = list(vectors)
+        self._kinds = [_index_kind(vector.indices) for vector in self._vectors]
+        self._norms = None
+
+        members = {}
+        for row, kind in enumerate(self._kinds):
+            if kind is not None:
+                members.setdefault(kind, []).append(row)
+
+        self._groups = {}
+        for kind, rows in members.items():
+            group = [self._vectors[row] for row in rows]
+            self._groups[kind] = (
+                np.repeat(rows, [len(vector) for vector in group]),
+                np.concatenate([vector.indices for vector in group]),
+                np.concatenate([vector.values for vector in group]),
+            )
+
+    def __len__(self):
+        """Number of vectors in the batch."""
+        return len(self._vectors)
+
+    def dot(self, vector, normalize):
+        """Compute the dot products of vector with each vector in the batch."""
+        result = np.zeros(len(self._vectors))
+        kind = _index_kind(vector.indices)
+        group = None if kind is None else self._groups.get(kind)
+
+        if group is not None and len(vector):
+            rows, indices, values = group
+            positions = np.searchsorted(vector.indices, indices)
+            positions[positions == len(vector)] = 0
+            found = vector.indices[positions] == indices
+            products = vector.values[positions[found]] * values[found]
+            result += np.bincount(rows[found], weights=products,
+                                  minlength=len(self._vectors))
+
+        for row, (other, other_kind) in enumerate(zip(self._vectors,
+                                                      self._kinds)):
+            if other_kind is None or other_kind != kind:
+                result[row] = vector.dot(other)
+
+        if normalize:
+            if self._norms is None:
+                self._norms = np.array([other.norm for other in self._vectors])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result /= vector.norm * self._norms
+
+        return result
+
+
+def dot_matrix(vectors, others, *, normalize=False):
+    """
+    Make a 2-D array of dot products of each of vectors with each of others.
+
+    The ij entry is vectors[i].dot(others[j]). Each row is computed as by
+    dot_many, with normalize passed along to get cosine similarities, but the
+    others are gathered into concatenated arrays only once, for all rows.
+
+    >>> vs = [SparseVector.from_dict({0: 1.0, 1: 2.0}),
+    ...       SparseVector.from_dict({1: 1.0, 2: 1.0})]
+    >>> dot_matrix(vs, vs)
+    array([[5., 2.],
+           [2., 2.]])
+    >>> dot_matrix(vs, []).shape
+    (2, 0)
+    """
+    batch = _Batch(others)
+    rows = [batch.dot(vector, normalize) for vector in vectors]
+    if not rows:
+        return np.zeros((0, len(batch)))
+    return np.vstack(rows)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
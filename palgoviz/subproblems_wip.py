@@ -35,7 +35,12 @@ __all__ = [
 
 import collections
 
-from palgoviz.recursion import merge_two
+from palgoviz.recursion import (
+    _merge_sort,
+    merge_sort_bottom_up,
+    merge_sort_bottom_up_unstable,
+    merge_two,
+)
 
 
 def observe_node(node):
@@ -57,8 +62,17 @@ def observe_edge_verbose(parent, child):
     print(f'edge:  {parent!r}  ->  {child!r}')
 
 
+def _hooks(node_observer, edge_observer, tracer):
+    """Get functions to call for each node and edge, reporting to observers."""
+    if tracer is None:
+        return node_observer, edge_observer
+    if node_observer is not None or edge_observer is not None:
+        raise TypeError("can't pass both observers and a tracer")
+    return tracer.record_node, tracer.record_edge
+
+
 def merge_sort_observed(values, *, merge=merge_two,
-                        node_observer, edge_observer):
+                        node_observer=None, edge_observer=None, tracer=None):
     """
     Mergesort recursively. Notify observers of subproblem relationships.
 
@@ -69,6 +83,11 @@ def merge_sort_observed(values, *, merge=merge_two,
     once, and no object is passed as either argument to edge_observer until
     after it has been passed to node_observer.
 
+    Instead of node_observer and edge_observer, a tracing.Tracer may be passed
+    as tracer, to receive nodes and edges in chunks. If neither observers nor
+    a tracer are passed, this sorts just as recursion.merge_sort does. The
+    bottom-up versions below accept observers in the same ways.
+
     >>> merge_sort_observed([3, 2, 1],
     ...                     node_observer=observe_node,
     ...                     edge_observer=observe_edge_verbose)
@@ -82,25 +101,42 @@ def merge_sort_observed(values, *, merge=merge_two,
     node:  [1]
     edge:  [2, 1]  ->  [1]
     [1, 2, 3]
+    >>> from palgoviz.tracing import Tracer
+    >>> merge_sort_observed([3, 2, 1], tracer=Tracer(
+    ...     lambda edges: print(f'edges: {len(edges)}'),
+    ...     lambda nodes: print(f'nodes: {len(nodes)}'),
+    ...     chunk_size=3))
+    nodes: 3
+    edges: 1
+    nodes: 2
+    edges: 3
+    [1, 2, 3]
+    >>> merge_sort_observed([3, 2, 1])
+    [1, 2, 3]
     """
-    def do_mergesort(parent, node):
-        node_observer(node)
-        if parent is not None:
-            edge_observer(parent, node)
+    on_node, on_edge = _hooks(node_observer, edge_observer, tracer)
+    try:
+        return _merge_sort(values, merge, 1, None, on_node, on_edge)
+    finally:
+        if tracer is not None:
+            tracer.flush()
 
-        if len(node) < 2:
-            return node
 
-        midpoint = len(node) // 2
-        left = node[:midpoint]
-        right = node[midpoint:]
-        return merge(do_mergesort(node, left), do_mergesort(node, right))
-
-    return do_mergesort(None, list(values))
+def _report_merge(on_node, on_edge, sham_left, sham_right):
+    """Report the subproblem whose halves are sham_left and sham_right."""
+    sham_parent = sham_left + sham_right
+    if on_node is not None:
+        on_node(sham_parent)
+    if on_edge is not None:
+        on_edge(sham_parent, sham_left)
+        on_edge(sham_parent, sham_right)
+    return sham_parent
 
 
 def merge_sort_bottom_up_unstable_observed(values, *, merge=merge_two,
-                                           node_observer, edge_observer):
+                                           node_observer=None,
+                                           edge_observer=None,
+                                           tracer=None):
     """
     Unstable bottom-up mergesort. Notify observers of subproblem relationships.
 
@@ -130,35 +166,34 @@ def merge_sort_bottom_up_unstable_observed(values, *, merge=merge_two,
     edge:  [1, 3, 2]  ->  [3, 2]
     [1, 2, 3]
     """
-    if not values:
-        return []
-
-    queue = collections.deque([x] for x in values)
+    on_node, on_edge = _hooks(node_observer, edge_observer, tracer)
+    if on_node is None and on_edge is None:
+        return merge_sort_bottom_up_unstable(values, merge=merge)
 
+    # The sort itself is done by merge_sort_bottom_up_unstable. Its queue is
+    # mirrored here with unmerged lists, which are the subproblems reported.
     sham_queue = collections.deque([x] for x in values)
-    for node in sham_queue:
-        node_observer(node)
-
-    while len(queue) > 1:
-        left = queue.popleft()
-        right = queue.popleft()
-        queue.append(merge(left, right))
+    if on_node is not None:
+        for node in sham_queue:
+            on_node(node)
 
+    def observed_merge(left, right):
         sham_left = sham_queue.popleft()
         sham_right = sham_queue.popleft()
-        sham_parent = sham_left + sham_right
-
-        node_observer(sham_parent)
-        edge_observer(sham_parent, sham_left)
-        edge_observer(sham_parent, sham_right)
-
-        sham_queue.append(sham_parent)
+        sham_queue.append(_report_merge(on_node, on_edge,
+                                        sham_left, sham_right))
+        return merge(left, right)
 
-    return queue[0]
+    try:
+        return merge_sort_bottom_up_unstable(values, merge=observed_merge)
+    finally:
+        if tracer is not None:
+            tracer.flush()
 
 
 def merge_sort_bottom_up_observed(values, *, merge=merge_two,
-                                  node_observer, edge_observer):
+                                  node_observer=None, edge_observer=None,
+                                  tracer=None):
     """
     Stable bottom-up mergesort. Notify observers of subproblem relationships.
 
@@ -182,41 +217,39 @@ def merge_sort_bottom_up_observed(values, *, merge=merge_two,
     edge:  [3, 2, 1]  ->  [1]
     [1, 2, 3]
     """
-    if not values:
-        return []
-
-    primary = collections.deque([x] for x in values)
-    secondary = collections.deque()
-    sham_primary = collections.deque([x] for x in values)
-    sham_secondary = collections.deque()
-
-    for node in sham_primary:
-        node_observer(node)
-
-    while len(primary) > 1:
-        primary, secondary = secondary, primary
-        sham_primary, sham_secondary = sham_secondary, sham_primary
-
-        while len(secondary) > 1:
-            left = secondary.popleft()
-            right = secondary.popleft()
-            primary.append(merge(left, right))
-
-            sham_left = sham_secondary.popleft()
-            sham_right = sham_secondary.popleft()
-            sham_parent = sham_left + sham_right
-
-            node_observer(sham_parent)
-            edge_observer(sham_parent, sham_left)
-            edge_observer(sham_parent, sham_right)
-
-            sham_primary.append(sham_parent)
-
-        if secondary:
-            primary.append(secondary.popleft())
-            sham_primary.append(sham_secondary.popleft())
-
-    return primary[0]
+    on_node, on_edge = _hooks(node_observer, edge_observer, tracer)
+    if on_node is None and on_edge is None:
+        return merge_sort_bottom_up(values, merge=merge)
+
+    # The sort itself is done by merge_sort_bottom_up. Its queues are mirrored
+    # here with unmerged lists, which are the subproblems reported. A pass ends
+    # when fewer than two lists are left to merge. Then any list left over is
+    # moved to the other queue unmerged, and the queues trade roles.
+    sham_primary = collections.deque()
+    sham_secondary = collections.deque([x] for x in values)
+    if on_node is not None:
+        for node in sham_secondary:
+            on_node(node)
+
+    def observed_merge(left, right):
+        nonlocal sham_primary, sham_secondary
+
+        if len(sham_secondary) < 2:
+            sham_primary.extend(sham_secondary)
+            sham_secondary.clear()
+            sham_primary, sham_secondary = sham_secondary, sham_primary
+
+        sham_left = sham_secondary.popleft()
+        sham_right = sham_secondary.popleft()
+        sham_primary.append(_report_merge(on_node, on_edge,
+                                          sham_left, sham_right))
+        return merge(left, right)
+
+    try:
+        return merge_sort_bottom_up(values, merge=observed_merge)
+    finally:
+        if tracer is not None:
+            tracer.flush()
 
 
 if __name__ == '__main__':
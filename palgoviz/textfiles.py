@@ -0,0 +1,387 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""
+Access to lines of large text files without reading them from the start.
+
+gencomp1.pick, gencomp1.tail_opt, and gencomp1.last can only read a file
+object from the beginning. A LineIndex records where each line of a file
+starts, so any line, or range of lines, can be read directly.
+
+Lines end at '\\n', which is kept, as when a file is opened with newline='\\n'.
+The encoding must be one in which a newline is the byte b'\\n' and that byte
+is never part of another character, as in UTF-8 and Latin-1.
+
+gencomp1.tail and gencomp1.tail_opt read a file object all the way through to
+get its last lines. tail_lines instead seeks backward from the end of a file.
+"""
+
+__all__ = ['LineIndex', 'tail_lines']
+
+import collections
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+import io
+import os
+
+import numpy as np
+
+from palgoviz.util import validate_positive
+
+_BLOCK_SIZE = 2**20
+"""Number of bytes read at a time when building an index."""
+
+_INDEX_SUFFIX = '.lineidx'
+"""Suffix added to a text file's path to get its default index path."""
+
+_OFFSET_DTYPE = np.dtype('<i8')
+"""Type of the offsets stored in an index file."""
+
+_TAIL_BLOCK_SIZE = 2**16
+"""Default number of bytes tail_lines reads at a time."""
+
+
+def _split_lines(text):
+    """Split text into lines, keeping each '\\n', as file iteration does."""
+    *lines, rest = text.split('\n')
+    lines = [line + '\n' for line in lines]
+    if rest:
+        lines.append(rest)
+    return lines
+
+
+def _write_offsets(path, index_path):
+    """Write an index of the starts of lines in one pass through a file."""
+    with (open(path, mode='rb') as source,
+          open(index_path, mode='wb') as index):
+        index.write(np.zeros(1, dtype=_OFFSET_DTYPE).tobytes())
+        position = last = 0
+
+        while block := source.read(_BLOCK_SIZE):
+            data = np.frombuffer(block, dtype=np.uint8)
+            starts = np.flatnonzero(data == ord('\n')) + (position + 1)
+            index.write(starts.astype(_OFFSET_DTYPE).tobytes())
+            position += len(block)
+            if len(starts) != 0:
+                last = int(starts[-1])
+
+        if last != position:
+            index.write(np.array([position], dtype=_OFFSET_DTYPE).tobytes())
+
+
+def _read_lines(path, encoding, start, stop):
+    """Read and decode the lines in a range of bytes of a file."""
+    with open(path, mode='rb') as file:
+        file.seek(start)
+        return _split_lines(file.read(stop - start).decode(encoding))
+
+
+def _scan_range(func, path, encoding, start, stop):
+    """Call func on a list of the lines in a range of bytes of a file."""
+    return func(_read_lines(path, encoding, start, stop))
+
+
+class LineIndex(Sequence):
+    """
+    Sequence of the lines of a text file, read as needed using an index.
+
+    The index holds the byte offset where each line starts, and the file's
+    size. It is made in one pass through the file, and saved at index_path,
+    which defaults to the file's path with '.lineidx' appended. If an index is
+    already there and is newer than the file and ends at the file's current
+    size, it is used instead. The index is memory-mapped, so it is not loaded
+    into memory all at once.
+
+    Getting a line, or a slice of lines, seeks directly to them. Slices are
+    lists. tail gets the last lines by seeking from the end. scan calls a
+    function on consecutive ranges of lines, optionally in worker processes.
+
+    A LineIndex keeps the file open, so it should be closed when no longer
+    needed. It is a context manager that closes itself. It is not safe to use
+    from multiple threads at once, and if the file changes, a new LineIndex is
+    needed.
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as directory:
+    ...     path = os.path.join(directory, 'squares.txt')
+    ...     with open(path, mode='w', encoding='utf-8') as file:
+    ...         file.writelines(f'{i**2}\\n' for i in range(100_000))
+    ...     with LineIndex(path) as lines:
+    ...         print(len(lines), repr(lines[99_999]), lines[10:13])
+    ...         print(lines.tail(2), os.path.exists(path + '.lineidx'))
+    100000 '9999800001\\n' ['100\\n', '121\\n', '144\\n']
+    ['9999600004\\n', '9999800001\\n'] True
+    """
+
+    __slots__ = ('_path', '_index_path', '_encoding', '_offsets', '_file')
+
+    def __init__(self, path, *, encoding='utf-8', index_path=None):
+        """Open a text file with an index, making and saving it if needed."""
+        path = os.fspath(path)
+        if index_path is None:
+            index_path = path + _INDEX_SUFFIX
+        else:
+            index_path = os.fspath(index_path)
+
+        self._path = path
+        self._index_path = index_path
+        self._encoding = encoding
+        self._file = open(path, mode='rb')
+
+        try:
+            self._offsets = self._load_offsets()
+            if self._offsets is None:
+                _write_offsets(path, index_path)
+                self._offsets = self._load_offsets()
+        except BaseException:
+            self._file.close()
+            raise
+
+    def __repr__(self):
+        """Representation for debugging."""
+        return f'<{type(self).__name__} path={self._path!r} lines={len(self)}>'
+
+    def __enter__(self):
+        """Just return the index, so it will be closed."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the file and the index."""
+        del exc_type, exc_value, traceback
+        self.close()
+
+    def __len__(self):
+        """Get the number of lines in the file."""
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        """Get a line, or a list of the lines in a slice."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return self._read(start, max(start, stop))
+            return [self[i] for i in range(start, stop, step)]
+
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('line index out of range')
+        return self._read(index, index + 1)[0]
+
+    def __iter__(self):
+        """Yield each line, reading the file sequentially."""
+        with open(self._path, encoding=self._encoding, newline='\n') as file:
+            yield from file
+
+    @property
+    def path(self):
+        """The path of the text file."""
+        return self._path
+
+    @property
+    def index_path(self):
+        """The path of the index file."""
+        return self._index_path
+
+    @property
+    def encoding(self):
+        """The encoding used to decode lines."""
+        return self._encoding
+
+    @property
+    def offsets(self):
+        """Read-only array of where lines start, with the file size last."""
+        return self._offsets
+
+    def tail(self, n):
+        """Get a list of the last n lines (or all, if fewer)."""
+        if n < 0:
+            raise ValueError("can't get negatively many lines")
+        return self._read(max(0, len(self) - n), len(self))
+
+    def scan(self, func, *, lines_per_range=100_000, processes=None):
+        """
+        Yield func(lines) for consecutive ranges of lines, in order.
+
+        Each range has lines_per_range lines, except possibly the last. If
+        processes is None, this reads the ranges and calls func here.
+        Otherwise, that is done in a pool of that many worker processes, each
+        seeking directly to its ranges, so func and its results must be
+        picklable.
+        """
+        validate_positive('lines_per_range', lines_per_range)
+        if processes is not None:
+            validate_positive('processes', processes)
+
+        boundaries = self._offsets[::lines_per_range].tolist()
+        if boundaries[-1] != self._offsets[-1]:
+            boundaries.append(int(self._offsets[-1]))
+        starts = boundaries[:-1]
+        stops = boundaries[1:]
+        count = len(starts)
+
+        if processes is None:
+            for start, stop in zip(starts, stops):
+                yield _scan_range(func, self._path, self._encoding,
+                                  start, stop)
+            return
+
+        with ProcessPoolExecutor(processes) as executor:
+            yield from executor.map(_scan_range, [func] * count,
+                                    [self._path] * count,
+                                    [self._encoding] * count, starts, stops)
+
+    def close(self):
+        """Close the text file and release the index."""
+        self._file.close()
+        self._offsets = np.zeros(1, dtype=_OFFSET_DTYPE)
+
+    def _load_offsets(self):
+        """Memory-map the index, if it exists and is up to date."""
+        try:
+            index_stat = os.stat(self._index_path)
+        except FileNotFoundError:
+            return None
+
+        source_stat = os.fstat(self._file.fileno())
+        if (index_stat.st_mtime_ns < source_stat.st_mtime_ns
+                or index_stat.st_size < _OFFSET_DTYPE.itemsize
+                or index_stat.st_size % _OFFSET_DTYPE.itemsize != 0):
+            return None
+
+        offsets = np.memmap(self._index_path, dtype=_OFFSET_DTYPE, mode='r')
+        if offsets[0] != 0 or offsets[-1] != source_stat.st_size:
+            return None
+        return offsets
+
+    def _read(self, start, stop):
+        """Read a list of the lines from start to stop, which are in range."""
+        if start == stop:
+            return []
+        begin = int(self._offsets[start])
+        self._file.seek(begin)
+        data = self._file.read(int(self._offsets[stop]) - begin)
+        return _split_lines(data.decode(self._encoding))
+
+
+def _split_byte_lines(data):
+    """Split bytes into lines, keeping each b'\\n', as file iteration does."""
+    *lines, rest = data.split(b'\n')
+    lines = [line + b'\n' for line in lines]
+    if rest:
+        lines.append(rest)
+    return lines
+
+
+def _read_tail_region(file, n, start, block_size):
+    """
+    Read the bytes of the last n lines of a seekable binary file.
+
+    Only bytes at or after start are read. More than n lines may be returned,
+    but never part of a line. The file is left at its end.
+    """
+    end = file.seek(0, os.SEEK_END)
+    position = end
+    blocks = []
+    newlines = 0
+    needed = None
+
+    while position > start:
+        size = min(block_size, position - start)
+        position -= size
+        file.seek(position)
+        block = file.read(size)
+        blocks.append(block)
+        if needed is None:
+            # A final newline ends the last line, rather than separating it.
+            needed = n + block.endswith(b'\n')
+        newlines += block.count(b'\n')
+        if newlines >= needed:
+            break
+
+    file.seek(end)
+    region = b''.join(reversed(blocks))
+    if position > start:
+        region = region[region.index(b'\n') + 1:]
+    return region
+
+
+def _is_newline_safe(encoding):
+    """Check if encoding represents newlines as b'\\n', as UTF-8 does."""
+    return '\n'.encode(encoding) == b'\n' and 'a'.encode(encoding) == b'a'
+
+
+def tail_lines(file, n, *, block_size=_TAIL_BLOCK_SIZE):
+    """
+    Return a tuple of the last n lines of a file object (or all, if fewer).
+
+    This is like gencomp1.tail, but if the file is seekable, it reads
+    backward from the end in blocks of block_size bytes, until it has found
+    enough newlines, so the amount read is proportional to the length of the
+    lines returned, not the file. Either way, lines before the file's current
+    position are not included, and the file is left at its end.
+
+    For a binary file, lines are bytes objects, split at b'\\n'. For a text
+    file, the bytes are decoded with its encoding and error handler, and split
+    as the default newline=None mode does. Seeking backward is used for a text
+    file only if it is at its start, its encoding is compatible with ASCII (as
+    described in the module docstring), and it has a binary buffer attribute.
+    Otherwise, the rest of the file is read through.
+
+    >>> import io
+    >>> tail_lines(io.BytesIO(b'a\\nbb\\nccc\\n'), 2, block_size=1)
+    (b'bb\\n', b'ccc\\n')
+    >>> text = io.TextIOWrapper(io.BytesIO(b'x\\r\\ny\\nz'), encoding='utf-8')
+    >>> tail_lines(text, 2)
+    ('y\\n', 'z')
+    >>> tail_lines(io.BytesIO(b'one line'), 5)
+    (b'one line',)
+    """
+    if not isinstance(n, int):
+        raise TypeError('n must be an int')
+    if n < 0:
+        raise ValueError("can't get negatively many lines")
+    validate_positive('block_size', block_size)
+
+    if not file.seekable():
+        return tuple(collections.deque(file, n))
+
+    if not isinstance(file, io.TextIOBase):
+        start = file.tell()
+        if n == 0:
+            file.seek(0, os.SEEK_END)
+            return ()
+        region = _read_tail_region(file, n, start, block_size)
+        return tuple(_split_byte_lines(region)[-n:])
+
+    buffer = getattr(file, 'buffer', None)
+    if (buffer is None or file.tell() != 0
+            or not _is_newline_safe(file.encoding)):
+        return tuple(collections.deque(file, n))
+
+    file.seek(0, os.SEEK_END)
+    if n == 0:
+        return ()
+    region = _read_tail_region(buffer, n, 0, block_size)
+    file.seek(0, os.SEEK_END)
+    with io.TextIOWrapper(io.BytesIO(region), encoding=file.encoding,
+                          errors=file.errors) as decoded:
+        return tuple(collections.deque(decoded, n))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
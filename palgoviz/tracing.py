@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""
+Batched, optionally sampled, delivery of traversal events to observers.
+
+The *_observed functions in recursion.py and subproblems_wip.py report the
+nodes and edges they discover. They accept per-item observers, which they call
+directly for each event. They also accept a Tracer, which records events and
+delivers them in chunks (lists), and may sample them, so observers that only
+need some of the events, or that have high per-call overhead, are called less.
+
+A traversal records events in a Tracer by calling record_edge(parent, child)
+and record_node(node). Those methods append to pending_edges and pending_nodes,
+and flush when either list has reached chunk_size items.
+"""
+
+__all__ = ['Tracer']
+
+from palgoviz.util import validate_positive
+
+
+class Tracer:
+    """
+    Recorder of nodes and edges that delivers them to observers in chunks.
+
+    If given, edges_observer is called with a list of (parent, child) pairs,
+    and nodes_observer is called with a list of nodes. Either may be None, in
+    which case that kind of event is discarded. Lists have at most chunk_size
+    items, and fewer when sampling skips some. Empty lists are never passed.
+
+    If sample_every is n, only every nth edge (the 0th, the nth, the 2nth...)
+    is delivered. Nodes are never sampled, so nodes_observer still sees every
+    node before seeing any edge to or from it: when a flush delivers nodes and
+    edges, nodes are delivered first.
+
+    >>> tracer = Tracer(print, chunk_size=3)
+    >>> tracer.pending_edges.extend([('a', 'b'), ('a', 'c'), ('b', 'd')])
+    >>> tracer.flush()
+    [('a', 'b'), ('a', 'c'), ('b', 'd')]
+    >>> tracer.pending_edges
+    []
+    >>> tracer.flush()  # Nothing pending, so the observer is not called.
+    >>> sampler = Tracer(print, sample_every=2)
+    >>> sampler.pending_edges.extend((0, k) for k in range(5))
+    >>> sampler.flush()
+    [(0, 0), (0, 2), (0, 4)]
+    >>> sampler.pending_edges.extend((1, k) for k in range(4))
+    >>> sampler.flush()  # Counting continues from the previous flush.
+    [(1, 1), (1, 3)]
+    >>> Tracer(print, chunk_size=0)
+    Traceback (most recent call last):
+      ...
+    ValueError: chunk_size must be positive
+    """
+
+    __slots__ = (
+        '_edges_observer',
+        '_nodes_observer',
+        '_chunk_size',
+        '_sample_every',
+        '_edge_count',
+        '_pending_edges',
+        '_pending_nodes',
+    )
+
+    def __init__(self, edges_observer, nodes_observer=None, *,
+                 chunk_size=1024, sample_every=1):
+        """Create a tracer that delivers to the given batch observers."""
+        validate_positive('chunk_size', chunk_size)
+        validate_positive('sample_every', sample_every)
+
+        self._edges_observer = edges_observer
+        self._nodes_observer = nodes_observer
+        self._chunk_size = chunk_size
+        self._sample_every = sample_every
+        self._edge_count = 0
+        self._pending_edges = []
+        self._pending_nodes = []
+
+    def __repr__(self):
+        """Representation for debugging."""
+        return (f'<{type(self).__name__} chunk_size={self._chunk_size!r}'
+                f' sample_every={self._sample_every!r}'
+                f' pending_edges={len(self._pending_edges)!r}'
+                f' pending_nodes={len(self._pending_nodes)!r}>')
+
+    @property
+    def chunk_size(self):
+        """Number of pending items that should trigger a flush."""
+        return self._chunk_size
+
+    @property
+    def sample_every(self):
+        """Stride by which recorded edges are sampled for delivery."""
+        return self._sample_every
+
+    @property
+    def pending_edges(self):
+        """List of recorded but not yet delivered (parent, child) pairs."""
+        return self._pending_edges
+
+    @property
+    def pending_nodes(self):
+        """List of recorded but not yet delivered nodes."""
+        return self._pending_nodes
+
+    def record_edge(self, parent, child):
+        """
+        Record an edge from parent to child. Flush if chunk_size are pending.
+
+        >>> tracer = Tracer(print, chunk_size=2)
+        >>> tracer.record_edge('a', 'b')
+        >>> tracer.record_edge('a', 'c')
+        [('a', 'b'), ('a', 'c')]
+        """
+        edges = self._pending_edges
+        edges.append((parent, child))
+        if len(edges) >= self._chunk_size:
+            self.flush()
+
+    def record_node(self, node):
+        """Record a node. Flush if chunk_size nodes are pending."""
+        nodes = self._pending_nodes
+        nodes.append(node)
+        if len(nodes) >= self._chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Deliver all pending nodes, then all (sampled) pending edges."""
+        if self._pending_nodes:
+            nodes = self._pending_nodes[:]
+            self._pending_nodes.clear()
+            if self._nodes_observer is not None:
+                self._deliver(self._nodes_observer, nodes)
+
+        if self._pending_edges:
+            start = -self._edge_count % self._sample_every
+            edges = self._pending_edges[start::self._sample_every]
+            self._edge_count += len(self._pending_edges)
+            self._pending_edges.clear()
+            if self._edges_observer is not None:
+                self._deliver(self._edges_observer, edges)
+
+    def _deliver(self, batch_observer, items):
+        """Pass items to batch_observer in lists of at most chunk_size."""
+        if len(items) <= self._chunk_size:
+            if items:
+                batch_observer(items)
+        else:
+            for index in range(0, len(items), self._chunk_size):
+                batch_observer(items[index:index + self._chunk_size])
+
+    def flushing(self, iterable):
+        """
+        Yield from iterable, flushing when it is exhausted or abandoned.
+
+        >>> tracer = Tracer(print)
+        >>> def gen():
+        ...     tracer.pending_edges.append(('p', 'q'))
+        ...     yield 'leaf'
+        >>> list(tracer.flushing(gen()))
+        [('p', 'q')]
+        ['leaf']
+        """
+        try:
+            yield from iterable
+        finally:
+            self.flush()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
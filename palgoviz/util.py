@@ -19,6 +19,8 @@ specific to testing, yet still neither belong in any other module nor currently
 justify the creation of more specific modules to contain them.
 """
 
+import itertools
+
 
 def identity_function(arg):
     """
@@ -51,3 +53,40 @@ def identity_function(arg):
             f = identity_function
     """
     return arg
+
+
+def validate_positive(name, value):
+    """
+    Check that value, an argument called name, is a positive int.
+
+    >>> validate_positive('n', 3)
+    >>> validate_positive('n', 0)
+    Traceback (most recent call last):
+      ...
+    ValueError: n must be positive
+    >>> validate_positive('chunk_size', 2.0)
+    Traceback (most recent call last):
+      ...
+    TypeError: chunk_size must be an int
+    """
+    if not isinstance(value, int):
+        raise TypeError(f'{name} must be an int')
+    if value < 1:
+        raise ValueError(f'{name} must be positive')
+
+
+def batches(iterable, size):
+    """
+    Yield successive lists of up to size elements from iterable, lazily.
+
+    Every list but the last has exactly size elements. No list is empty. Each
+    is new, so the caller may keep or modify it. size must be positive.
+
+    >>> list(batches(range(7), 3))
+    [[0, 1, 2], [3, 4, 5], [6]]
+    >>> list(batches([], 3))
+    []
+    """
+    it = iter(iterable)
+    while batch := list(itertools.islice(it, size)):
+        yield batch
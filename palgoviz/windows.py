@@ -0,0 +1,523 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""
+Sliding window aggregates and views, without O(n) work per window.
+
+gencomp1.windowed yields each width-n window as a new tuple, so aggregating
+each window separately, as by sum(window) or max(window), takes O(n) time per
+window. The functions here yield the same results as such code would, but
+update each aggregate as the window slides, instead of recomputing it:
+
+  windowed_sums and windowed_means add the entering element and subtract the
+  leaving one.
+
+  windowed_mins and windowed_maxes keep a monotonic deque of the elements that
+  could still be the minimum or maximum of some window.
+
+  windowed_reduce works with any associative binary function, using an
+  AggregatingQueue, which is a queue built from two stacks.
+
+  aggregate_array_windows does this for a 1-D NumPy array, all at once.
+
+When the windows themselves are needed, windowed_views yields lightweight
+WindowView objects over one shared ring buffer, instead of a new tuple per
+window, and array_windows gives all windows of a NumPy array as one 2-D view.
+"""
+
+__all__ = [
+    'windowed_sums',
+    'windowed_means',
+    'windowed_mins',
+    'windowed_maxes',
+    'AggregatingQueue',
+    'windowed_reduce',
+    'aggregate_array_windows',
+    'WindowView',
+    'windowed_views',
+    'array_windows',
+]
+
+import collections
+from collections.abc import Sequence
+import itertools
+import operator
+
+import numpy as np
+
+from palgoviz.util import identity_function, validate_positive
+
+
+def windowed_sums(iterable, n):
+    """
+    Yield the sum of each width-n contiguous subsequence of iterable, in order.
+
+    This gives the same results as (sum(w) for w in windowed(iterable, n)) but
+    takes O(1) amortized time per element. Every n steps, the sum is computed
+    from scratch, so, with floating point numbers, rounding errors from adding
+    and subtracting don't accumulate for longer than that.
+
+    >>> list(windowed_sums([3, 1, 4, 1, 5, 9, 2, 6], 3))
+    [8, 6, 10, 15, 16, 17]
+    >>> list(windowed_sums(range(5), 6))
+    []
+    >>> list(itertools.islice(windowed_sums(itertools.count(), 1000), 3))
+    [499500, 500500, 501500]
+    """
+    validate_positive('n', n)
+    it = iter(iterable)
+    window = collections.deque(itertools.islice(it, n))
+    if len(window) < n:
+        return
+
+    total = sum(window)
+    yield total
+
+    for step, element in enumerate(it, 1):
+        oldest = window.popleft()
+        window.append(element)
+        if step % n == 0:
+            total = sum(window)
+        else:
+            total = total - oldest + element
+        yield total
+
+
+def windowed_means(iterable, n):
+    """
+    Yield the arithmetic mean of each width-n window of iterable, in order.
+
+    >>> list(windowed_means([2, 4, 6, 8], 2))
+    [3.0, 5.0, 7.0]
+    """
+    return (total / n for total in windowed_sums(iterable, n))
+
+
+def _windowed_extremes(iterable, n, key, is_dominated):
+    """
+    Yield the extreme element of each window, using a monotonic deque.
+
+    is_dominated(old_key, new_key) is true if an older element can no longer
+    be the extreme of any window, because a newer one has a better key. It
+    must be false on ties, so that the first extreme element is yielded.
+    """
+    validate_positive('n', n)
+    if key is None:
+        key = identity_function
+
+    candidates = collections.deque()  # Entries are (index, key, element).
+
+    for index, element in enumerate(iterable):
+        element_key = key(element)
+        while candidates and is_dominated(candidates[-1][1], element_key):
+            candidates.pop()
+        candidates.append((index, element_key, element))
+
+        if candidates[0][0] <= index - n:
+            candidates.popleft()
+        if index >= n - 1:
+            yield candidates[0][2]
+
+
+def windowed_mins(iterable, n, *, key=None):
+    """
+    Yield the minimum of each width-n window of iterable, in order.
+
+    This gives the same results as (min(w, key=key) for w in windowed(...)),
+    including which of several minimal elements is chosen, but takes O(1)
+    amortized time per element.
+
+    >>> list(windowed_mins([3, 1, 4, 1, 5, 9, 2, 6], 3))
+    [1, 1, 1, 1, 2, 2]
+    >>> list(windowed_mins(['bb', 'a', 'cc', 'd'], 2, key=len))
+    ['a', 'a', 'd']
+    """
+    return _windowed_extremes(iterable, n, key, operator.gt)
+
+
+def windowed_maxes(iterable, n, *, key=None):
+    """
+    Yield the maximum of each width-n window of iterable, in order.
+
+    This gives the same results as (max(w, key=key) for w in windowed(...)),
+    including which of several maximal elements is chosen, but takes O(1)
+    amortized time per element.
+
+    >>> list(windowed_maxes([3, 1, 4, 1, 5, 9, 2, 6], 3))
+    [4, 4, 5, 9, 9, 9]
+    >>> list(windowed_maxes(['bb', 'a', 'cc', 'd'], 2, key=len))
+    ['bb', 'cc', 'cc']
+    """
+    return _windowed_extremes(iterable, n, key, operator.lt)
+
+
+class AggregatingQueue:
+    """
+    FIFO queue that can report the aggregate of its elements in O(1) time.
+
+    The aggregate is function(function(function(a, b), c), ...) for elements
+    a, b, c, ... from oldest to newest. function must be associative, but it
+    need not be commutative.
+
+    The queue is made of two stacks. New elements are pushed on the back
+    stack, which tracks the aggregate of its elements. Old elements are popped
+    from the front stack, each entry of which holds the aggregate of that
+    element and all newer elements in the front stack. When the front stack
+    is empty and an element must be popped, every element in the back stack
+    is moved to it. Each element is moved once, so operations take O(1)
+    amortized time.
+
+    >>> q = AggregatingQueue(operator.add)
+    >>> for word in 'the', 'quick', 'brown': q.append(word)
+    >>> q.aggregate
+    'thequickbrown'
+    >>> q.popleft()
+    'the'
+    >>> q.append('fox')
+    >>> q.aggregate, len(q)
+    ('quickbrownfox', 3)
+    >>> q
+    <AggregatingQueue len=3>
+    >>> AggregatingQueue(max).aggregate
+    Traceback (most recent call last):
+      ...
+    ValueError: can't aggregate an empty queue
+    """
+
+    __slots__ = ('_function', '_front', '_back', '_back_aggregate')
+
+    def __init__(self, function):
+        """Create an empty queue that aggregates with a binary function."""
+        self._function = function
+        self._front = []  # Entries are (element, aggregate), oldest on top.
+        self._back = []
+        self._back_aggregate = None
+
+    def __repr__(self):
+        """Representation for debugging."""
+        return f'<{type(self).__name__} len={len(self)!r}>'
+
+    def __len__(self):
+        """Number of elements in the queue."""
+        return len(self._front) + len(self._back)
+
+    @property
+    def aggregate(self):
+        """Aggregate of all the elements, from oldest to newest."""
+        if not self._front:
+            if not self._back:
+                raise ValueError("can't aggregate an empty queue")
+            return self._back_aggregate
+        front_aggregate = self._front[-1][1]
+        if not self._back:
+            return front_aggregate
+        return self._function(front_aggregate, self._back_aggregate)
+
+    def append(self, element):
+        """Add an element as the newest in the queue."""
+        if self._back:
+            self._back_aggregate = self._function(self._back_aggregate,
+                                                  element)
+        else:
+            self._back_aggregate = element
+        self._back.append(element)
+
+    def popleft(self):
+        """Remove and return the oldest element in the queue."""
+        if not self._front:
+            if not self._back:
+                raise IndexError('pop from an empty queue')
+            self._transfer()
+        return self._front.pop()[0]
+
+    def _transfer(self):
+        """Move all elements from the back stack to the front stack."""
+        element = self._back.pop()
+        self._front.append((element, element))
+        while self._back:
+            element = self._back.pop()
+            aggregate = self._function(element, self._front[-1][1])
+            self._front.append((element, aggregate))
+        self._back_aggregate = None
+
+
+def windowed_reduce(iterable, n, function):
+    """
+    Yield function's aggregate of each width-n window of iterable, in order.
+
+    This gives the same results as (functools.reduce(function, w) for w in
+    windowed(iterable, n)), provided function is associative, but calls
+    function O(1) amortized times per element, using an AggregatingQueue.
+
+    >>> import math
+    >>> list(windowed_reduce([12, 18, 8, 20, 15, 25], 3, math.gcd))
+    [2, 2, 1, 5]
+    >>> list(windowed_reduce('abcde', 3, operator.add))
+    ['abc', 'bcd', 'cde']
+    """
+    validate_positive('n', n)
+    queue = AggregatingQueue(function)
+
+    for element in iterable:
+        queue.append(element)
+        if len(queue) > n:
+            queue.popleft()
+        if len(queue) == n:
+            yield queue.aggregate
+
+
+def _array_window_extremes(array, n, ufunc):
+    """
+    Compute minima or maxima of windows of a 1-D array, with a ufunc.
+
+    This is the van Herk/Gil-Werman algorithm: split the array into blocks of
+    width n, and accumulate within each block, forward and backward. Each
+    window spans the end of one block and the start of the next (or is one
+    block), so its extreme combines a backward and a forward accumulation.
+    """
+    count = len(array) - n + 1
+    padded_length = -(-len(array) // n) * n
+    padded = np.resize(array, padded_length)  # Padding is never used.
+    blocks = padded.reshape(-1, n)
+
+    forward = ufunc.accumulate(blocks, axis=1).ravel()
+    backward = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    return ufunc(backward[:count], forward[n - 1:n - 1 + count])
+
+
+def aggregate_array_windows(array, n, how='sum'):
+    """
+    Compute an aggregate of each width-n window of a 1-D array.
+
+    how is 'sum', 'mean', 'min', 'max', or a binary NumPy ufunc, such as
+    np.multiply. The result has one element per window, so it is empty if the
+    array is shorter than n.
+
+    Sums are differences of a cumulative sum. Minima and maxima are computed
+    by the van Herk/Gil-Werman algorithm. These all take O(1) time per element,
+    however wide the windows are. A ufunc instead reduces each window of a
+    strided sliding_window_view of the array, without copying, in O(n) time
+    per window, but in compiled code.
+
+    With floating point numbers, the cumulative sum may accumulate rounding
+    error over a long array, so sums and means are accurate relative to the
+    whole array's magnitude, rather than to each window's.
+
+    >>> a = np.array([3, 1, 4, 1, 5, 9, 2, 6])
+    >>> aggregate_array_windows(a, 3)
+    array([ 8,  6, 10, 15, 16, 17])
+    >>> aggregate_array_windows(a, 3, 'max')
+    array([4, 4, 5, 9, 9, 9])
+    >>> aggregate_array_windows(a, 4, 'min')
+    array([1, 1, 1, 1, 2])
+    >>> aggregate_array_windows(a, 2, 'mean')
+    array([2. , 2.5, 2.5, 3. , 7. , 5.5, 4. ])
+    >>> aggregate_array_windows(a, 3, np.multiply)
+    array([ 12,   4,  20,  45,  90, 108])
+    >>> aggregate_array_windows(a, 9)
+    array([], dtype=int64)
+    """
+    validate_positive('n', n)
+    my_array = np.asarray(array)
+    if my_array.ndim != 1:
+        raise ValueError('array must be 1-dimensional')
+
+    if len(my_array) < n:
+        dtype = float if how == 'mean' else my_array.dtype
+        return np.empty(0, dtype=dtype)
+
+    if isinstance(how, np.ufunc):
+        view = np.lib.stride_tricks.sliding_window_view(my_array, n)
+        return how.reduce(view, axis=1)
+
+    match how:
+        case 'sum' | 'mean':
+            totals = np.cumsum(my_array)
+            sums = totals[n - 1:].copy()
+            sums[1:] -= totals[:-n]
+            return sums / n if how == 'mean' else sums
+        case 'min':
+            return _array_window_extremes(my_array, n, np.minimum)
+        case 'max':
+            return _array_window_extremes(my_array, n, np.maximum)
+        case _:
+            raise ValueError(f'unknown aggregate {how!r}')
+
+
+class _Ring:
+    """Ring buffer shared by the WindowViews from one windowed_views call."""
+
+    __slots__ = ('buffer', 'start', 'step')
+
+    def __init__(self, buffer):
+        """Create a ring whose buffer holds the first window's elements."""
+        self.buffer = buffer  # Elements of the current window, rotated.
+        self.start = 0  # Index in buffer of the oldest element.
+        self.step = 0  # Number of times the window has moved.
+
+
+class WindowView(Sequence):
+    """
+    Read-only view of one window of elements, from windowed_views.
+
+    A view stays valid only until the windowed_views generator that yielded
+    it is advanced, because that reuses the slot of the view's oldest element
+    for a new element. Using an invalidated view, except to check is_valid or
+    call repr, raises RuntimeError. To keep a window's elements, copy them,
+    such as with tuple(view), while the view is valid.
+
+    Views take O(1) time and space to create. Indexing a view takes O(1) time.
+
+    >>> it = windowed_views('abcde', 3)
+    >>> view = next(it)
+    >>> view
+    <WindowView ('a', 'b', 'c')>
+    >>> view[0], view[-1], len(view), 'b' in view
+    ('a', 'c', 3, True)
+    >>> next(it)
+    <WindowView ('b', 'c', 'd')>
+    >>> view.is_valid
+    False
+    >>> view
+    <WindowView (invalidated)>
+    >>> view[0]
+    Traceback (most recent call last):
+      ...
+    RuntimeError: window view used after its window moved
+    """
+
+    __slots__ = ('_ring', '_step', '_start')
+
+    def __init__(self, ring):
+        """Create a view of the current window of ring. (Internal use.)"""
+        self._ring = ring
+        self._step = ring.step
+        self._start = ring.start
+
+    def __repr__(self):
+        """Representation for debugging, showing the elements if valid."""
+        if not self.is_valid:
+            return f'<{type(self).__name__} (invalidated)>'
+        return f'<{type(self).__name__} {tuple(self)!r}>'
+
+    def __len__(self):
+        """Width of the window."""
+        return len(self._ring.buffer)
+
+    def __getitem__(self, index):
+        """Get an element, or a tuple of elements for a slice."""
+        self._check()
+        buffer = self._ring.buffer
+        if isinstance(index, slice):
+            return tuple(buffer[(self._start + i) % len(buffer)]
+                         for i in range(len(buffer))[index])
+        i = range(len(buffer))[index]
+        return buffer[(self._start + i) % len(buffer)]
+
+    def __iter__(self):
+        """
+        Iterate over the elements of the window, oldest first.
+
+        The view is checked before each element, so an iterator that outlives
+        the window raises RuntimeError rather than yielding newer elements.
+        """
+        self._check()
+        return self._elements()
+
+    @property
+    def is_valid(self):
+        """Whether the window this view shows has not moved since."""
+        return self._ring.step == self._step
+
+    def _elements(self):
+        """Yield the elements of the window, checking validity each time."""
+        buffer = self._ring.buffer
+        for i in range(len(buffer)):
+            self._check()
+            yield buffer[(self._start + i) % len(buffer)]
+
+    def _check(self):
+        """Raise RuntimeError if this view has been invalidated."""
+        if not self.is_valid:
+            raise RuntimeError('window view used after its window moved')
+
+
+def windowed_views(iterable, n):
+    """
+    Yield a WindowView of each width-n window of iterable, in order.
+
+    This gives the same windows as gencomp1.windowed, but as views over a
+    shared ring buffer of n elements, which is updated in place as the window
+    slides. So the total allocation is O(L) for an input of length L, rather
+    than O(nL). Each view is valid only until the next view is requested.
+
+    >>> [tuple(view) for view in windowed_views(range(5), 3)]
+    [(0, 1, 2), (1, 2, 3), (2, 3, 4)]
+    >>> list(windowed_views(range(2), 3))
+    []
+    """
+    validate_positive('n', n)
+    it = iter(iterable)
+    buffer = list(itertools.islice(it, n))
+    if len(buffer) < n:
+        return
+
+    ring = _Ring(buffer)
+    yield WindowView(ring)
+
+    for element in it:
+        buffer[ring.start] = element
+        ring.start = (ring.start + 1) % n
+        ring.step += 1
+        yield WindowView(ring)
+
+    ring.step += 1  # The generator is done, so no view should be used.
+
+
+def array_windows(array, n):
+    """
+    Get all width-n windows of a 1-D array as rows of a 2-D strided view.
+
+    No elements are copied: row i starts at element i of the array. The view
+    is read-only, since its rows overlap. It shares memory with the array, so
+    it stays valid as long as the array does, and changes to the array appear
+    in the view.
+
+    >>> a = np.arange(6)
+    >>> w = array_windows(a, 4)
+    >>> w
+    array([[0, 1, 2, 3],
+           [1, 2, 3, 4],
+           [2, 3, 4, 5]])
+    >>> np.shares_memory(a, w)
+    True
+    >>> a[3] = 30
+    >>> w[:, 3]
+    array([30,  4,  5])
+    >>> array_windows(a, 7).shape
+    (0, 7)
+    """
+    validate_positive('n', n)
+    my_array = np.asarray(array)
+    if my_array.ndim != 1:
+        raise ValueError('array must be 1-dimensional')
+    if len(my_array) < n:
+        return np.empty((0, n), dtype=my_array.dtype)
+    return np.lib.stride_tricks.sliding_window_view(my_array, n)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
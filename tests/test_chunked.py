@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for chunked.py."""
+
+import itertools
+import unittest
+
+from parameterized import parameterized
+
+from palgoviz.chunked import chained, flattened2, ungrouped
+from palgoviz.gencomp2 import flatten2, my_chain, ungroup
+
+
+def _rows():
+    """Make rows of varied lengths and types, including empty ones."""
+    return [[], list(range(7)), (), tuple('abc'), range(10, 25), [None] * 3,
+            iter([1.5, 2.5]), 'xyz', [[1, 2], [3]]]
+
+
+_CHUNK_SIZES = [(1,), (2,), (3,), (8,), (4096,)]
+
+
+class TestChunked(unittest.TestCase):
+    """Tests for chained, flattened2, ungrouped, and their chunks."""
+
+    def _check_chunks(self, chunks, expected, chunk_size):
+        """Check that chunks have the right sizes and concatenate properly."""
+        *full, last = chunks or [[]]
+        for chunk in full:
+            self.assertEqual(len(chunk), chunk_size)
+        self.assertLessEqual(len(last), chunk_size)
+        if full:
+            self.assertTrue(last)
+        self.assertEqual(list(itertools.chain.from_iterable(chunks)),
+                         expected)
+
+    @parameterized.expand(_CHUNK_SIZES)
+    def test_chained_matches_my_chain(self, chunk_size):
+        expected = list(my_chain(*_rows()))
+        self.assertEqual(list(chained(*_rows(), chunk_size=chunk_size)),
+                         expected)
+        chunks = list(chained(*_rows(), chunk_size=chunk_size).chunks())
+        self._check_chunks(chunks, expected, chunk_size)
+
+    @parameterized.expand(_CHUNK_SIZES)
+    def test_flattened2_matches_flatten2(self, chunk_size):
+        def data():
+            return [0, _rows(), 'ab', (3, [4, 5], [[6]]), [iter([7, 8])], [9]]
+
+        expected = list(flatten2(data()))
+        self.assertEqual(list(flattened2(data(), chunk_size=chunk_size)),
+                         expected)
+        chunks = list(flattened2(data(), chunk_size=chunk_size).chunks())
+        self._check_chunks(chunks, expected, chunk_size)
+
+    @parameterized.expand(_CHUNK_SIZES)
+    def test_ungrouped_matches_ungroup(self, chunk_size):
+        adj = {1: [2, 3], 2: [4, 5], 3: [6, 7], 4: [8, 9], 5: [], 6: [],
+               7: [], 8: [], 9: [2, 5]}
+        edges = list(ungrouped(adj, chunk_size=chunk_size))
+        self.assertEqual(len(edges), len(ungroup(adj)))
+        self.assertEqual(set(edges), ungroup(adj))
+        chunks = list(ungrouped(adj, chunk_size=chunk_size).chunks())
+        self._check_chunks(chunks, edges, chunk_size)
+
+    def test_chunks_are_distinct_lists(self):
+        chunks = list(chained(range(10), chunk_size=3).chunks())
+        self.assertTrue(all(type(chunk) is list for chunk in chunks))
+        self.assertEqual(len({id(chunk) for chunk in chunks}), len(chunks))
+
+    def test_chunks_are_lazy(self):
+        chunks = chained(itertools.count(), chunk_size=5).chunks()
+        self.assertEqual(next(chunks), [0, 1, 2, 3, 4])
+        self.assertEqual(next(chunks), [5, 6, 7, 8, 9])
+
+    def test_bad_chunk_sizes_raise(self):
+        with self.assertRaises(ValueError):
+            chained([1], chunk_size=0)
+        with self.assertRaises(TypeError):
+            chained([1], chunk_size=2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for columnar.py."""
+
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from palgoviz.columnar import enumerate_column, zip_columns, zip_two_columns
+from palgoviz.gencomp1 import my_enumerate, my_zip, zip_two
+
+
+def _rows(batches, names):
+    """Convert batches of either kind to a list of row tuples."""
+    rows = []
+    for batch in batches:
+        columns = [batch[name].tolist() for name in names]
+        rows.extend(zip(*columns))
+    return rows
+
+
+def _columns(*lengths):
+    """Make columns of different dtypes with the given lengths."""
+    makers = [
+        lambda n: np.arange(n, dtype=np.int64) * 3,
+        lambda n: np.linspace(0.0, 1.0, n),
+        lambda n: np.array([str(i) for i in range(n)], dtype=str),
+        lambda n: np.arange(n) % 2 == 0,
+    ]
+    return [makers[index % len(makers)](length)
+            for index, length in enumerate(lengths)]
+
+
+class TestZipColumns(unittest.TestCase):
+    """Tests for zip_columns and zip_two_columns."""
+
+    @parameterized.expand([
+        ('equal', (10, 10, 10), 3),
+        ('shortest_first', (4, 10, 7), 2),
+        ('shortest_last', (9, 8, 10, 5), 1),
+        ('one_batch', (6, 6), 100),
+        ('exact_batches', (8, 8), 4),
+        ('empty_column', (5, 0), 2),
+        ('single', (7,), 3),
+    ])
+    def test_matches_my_zip(self, _name, lengths, batch_size):
+        columns = _columns(*lengths)
+        names = [f'f{index}' for index in range(len(columns))]
+        expected = list(my_zip(*(column.tolist() for column in columns)))
+        for structured in True, False:
+            with self.subTest(structured=structured):
+                batches = list(zip_columns(*columns, batch_size=batch_size,
+                                           structured=structured))
+                self.assertEqual(_rows(batches, names), expected)
+                self.assertTrue(all(0 < len(batch[names[0]]) <= batch_size
+                                    for batch in batches))
+
+    def test_zip_two_matches_zip_two(self):
+        first, second = _columns(12, 9)
+        expected = list(zip_two(first.tolist(), second.tolist()))
+        batches = zip_two_columns(first, second, names=['x', 'y'],
+                                  batch_size=4)
+        self.assertEqual(_rows(batches, ['x', 'y']), expected)
+
+    def test_structured_batches_copy(self):
+        column = np.arange(5)
+        batch, = zip_columns(column)
+        batch['f0'][0] = 99
+        self.assertEqual(column[0], 0)
+
+    def test_record_batches_are_views(self):
+        column = np.arange(5)
+        batch, = zip_columns(column, structured=False)
+        self.assertTrue(np.shares_memory(batch['f0'], column))
+
+    def test_structured_dtype(self):
+        batch, = zip_columns(np.array([1], dtype=np.int16), np.array([2.5]),
+                             names=['a', 'b'])
+        self.assertEqual(batch.dtype,
+                         np.dtype([('a', np.int16), ('b', np.float64)]))
+
+    def test_no_columns(self):
+        self.assertEqual(list(zip_columns()), [])
+
+    @parameterized.expand([
+        ('two_dimensional', ([[1, 2]],), {}, ValueError),
+        ('too_few_names', ([1], [2]), {'names': ['a']}, ValueError),
+        ('duplicate_names', ([1], [2]), {'names': 'aa'}, ValueError),
+        ('zero_batch_size', ([1],), {'batch_size': 0}, ValueError),
+        ('float_batch_size', ([1],), {'batch_size': 2.0}, TypeError),
+    ])
+    def test_bad_arguments_raise_immediately(self, _name, columns, kwargs,
+                                             error):
+        with self.assertRaises(error):
+            zip_columns(*columns, **kwargs)
+
+
+class TestEnumerateColumn(unittest.TestCase):
+    """Tests for enumerate_column."""
+
+    @parameterized.expand([
+        (0, 10, 3),
+        (5, 10, 4),
+        (-3, 7, 100),
+        (2**40, 6, 5),
+        (0, 0, 2),
+    ])
+    def test_matches_my_enumerate(self, start, length, batch_size):
+        column, = _columns(length)
+        expected = list(my_enumerate(column.tolist(), start))
+        for structured in True, False:
+            with self.subTest(structured=structured):
+                batches = enumerate_column(column, start,
+                                           batch_size=batch_size,
+                                           structured=structured)
+                self.assertEqual(_rows(batches, ['index', 'value']),
+                                 expected)
+
+    def test_custom_names(self):
+        batch, = enumerate_column(['a', 'b'], names=['i', 'letter'])
+        self.assertEqual(batch.dtype.names, ('i', 'letter'))
+        self.assertEqual(batch.dtype['i'], np.dtype(np.int64))
+
+    def test_bad_arguments_raise_immediately(self):
+        with self.assertRaises(TypeError):
+            enumerate_column([1], 1.5)
+        with self.assertRaises(ValueError):
+            enumerate_column([1], names=['index'])
+        with self.assertRaises(ValueError):
+            enumerate_column([1], batch_size=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for counting.py."""
+
+import operator
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from palgoviz.counting import (
+    count,
+    count_if,
+    count_lines,
+    count_matching_lines,
+)
+from palgoviz.gencomp1 import how_many, length_of_opt
+
+_ITERABLE_FACTORIES = [
+    ('empty_list', lambda: []),
+    ('list', lambda: list(range(100))),
+    ('range', lambda: range(3, 1000, 7)),
+    ('set', lambda: set('abracadabra')),
+    ('iterator', lambda: iter(range(500))),
+    ('generator', lambda: (x for x in range(1000) if x % 3)),
+    ('string', lambda: 'hello, world'),
+]
+
+
+class TestCount(unittest.TestCase):
+    """Tests for count and count_if."""
+
+    @parameterized.expand(_ITERABLE_FACTORIES)
+    def test_count_matches_length_of_opt(self, _name, factory):
+        self.assertEqual(count(factory()), length_of_opt(factory()))
+
+    @parameterized.expand(_ITERABLE_FACTORIES)
+    def test_count_if_matches_how_many(self, _name, factory):
+        def predicate(x):
+            return hash(x) % 3 == 0
+
+        self.assertEqual(count_if(predicate, factory()),
+                         how_many(predicate, factory()))
+
+    @parameterized.expand(_ITERABLE_FACTORIES)
+    def test_count_if_none_matches_how_many(self, _name, factory):
+        self.assertEqual(count_if(None, factory()),
+                         how_many(None, factory()))
+
+    def test_count_consumes_iterator(self):
+        it = iter(range(10))
+        self.assertEqual(count(it), 10)
+        self.assertEqual(list(it), [])
+
+    @parameterized.expand([
+        ('ints', np.array([0, 1, 2, 0, -3])),
+        ('floats', np.array([0.0, -0.0, 0.5, np.nan])),
+        ('bools', np.array([True, False, True])),
+        ('empty', np.array([], dtype=np.int64)),
+    ])
+    def test_count_if_none_on_array_matches_how_many(self, _name, array):
+        self.assertEqual(count_if(None, array), how_many(None, array))
+
+    def test_count_if_vectorized_matches_how_many(self):
+        array = np.arange(-50, 50)
+        self.assertEqual(count_if(lambda a: a % 4 == 1, array,
+                                  vectorized=True),
+                         how_many(lambda x: x % 4 == 1, array))
+
+    def test_count_if_vectorized_wrong_shape_raises(self):
+        with self.assertRaises(ValueError):
+            count_if(lambda a: a[:-1] > 0, np.arange(5), vectorized=True)
+
+
+_FILE_CONTENTS = [
+    ('empty', b''),
+    ('one_line', b'hello\n'),
+    ('no_final_newline', b'a\nbb\nccc'),
+    ('only_newlines', b'\n\n\n\n'),
+    ('crlf', b'a\r\nb\r\n\r\nc\r\n'),
+    ('lone_cr', b'a\rb\nc\r\n'),
+    ('non_ascii', 'caf\N{LATIN SMALL LETTER E WITH ACUTE}\n'
+                  '\N{GREEK SMALL LETTER ALPHA}\N{GREEK SMALL LETTER BETA}\n'
+                  '\N{SNOWMAN}'.encode('utf-8')),
+    ('many', b''.join(b'%d\n' % i for i in range(2000))),
+]
+
+
+class TestCountLines(unittest.TestCase):
+    """Tests for count_lines and count_matching_lines."""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._path = os.path.join(self._directory.name, 'lines.txt')
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def _write(self, data):
+        with open(self._path, mode='wb') as file:
+            file.write(data)
+
+    def _expected_lines(self):
+        with open(self._path, encoding='utf-8', newline='\n') as file:
+            return list(file)
+
+    @parameterized.expand(_FILE_CONTENTS)
+    def test_count_lines(self, _name, data):
+        self._write(data)
+        expected = len(self._expected_lines())
+        self.assertEqual(count_lines(self._path), expected)
+        self.assertEqual(count_lines(self._path, processes=2, range_size=3),
+                         expected)
+
+    @parameterized.expand(_FILE_CONTENTS)
+    def test_count_matching_lines(self, _name, data):
+        self._write(data)
+        predicate = operator.methodcaller('endswith', '\r\n')
+        lines = self._expected_lines()
+        expected = sum(map(predicate, lines))
+        self.assertEqual(count_matching_lines(predicate, self._path,
+                                              range_size=5),
+                         expected)
+        self.assertEqual(count_matching_lines(predicate, self._path,
+                                              processes=2, range_size=50),
+                         expected)
+        self.assertEqual(count_matching_lines(None, self._path), len(lines))
+
+    def test_nonpositive_processes_raises(self):
+        self._write(b'a\nb\n')
+        with self.assertRaises(ValueError):
+            count_lines(self._path, processes=0)
+        with self.assertRaises(ValueError):
+            count_matching_lines(None, self._path, processes=0)
+
+    def test_float_processes_raises(self):
+        self._write(b'a\nb\n')
+        with self.assertRaises(TypeError):
+            count_lines(self._path, processes=2.0)
+        with self.assertRaises(TypeError):
+            count_matching_lines(None, self._path, processes=2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for cycling.py."""
+
+import itertools
+import os
+import pathlib
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from palgoviz.cycling import cycle_array, cycle_source, cycle_spilled
+from palgoviz.gencomp2 import my_cycle
+
+
+def _take(iterable, count):
+    """Get a list of the first count elements of iterable."""
+    return list(itertools.islice(iterable, count))
+
+
+class TestCycleSource(unittest.TestCase):
+    """Tests for cycle_source."""
+
+    @parameterized.expand([
+        ('list', [1, 2, 3]),
+        ('tuple', ('a', 'b')),
+        ('range', range(5)),
+        ('str', 'xyz'),
+    ])
+    def test_collection_matches_my_cycle(self, _name, source):
+        self.assertEqual(_take(cycle_source(source), 17),
+                         _take(my_cycle(source), 17))
+
+    def test_factory_is_called_once_per_pass(self):
+        calls = []
+
+        def factory():
+            calls.append(None)
+            return iter([10, 20])
+
+        self.assertEqual(_take(cycle_source(factory), 5),
+                         [10, 20, 10, 20, 10])
+        self.assertEqual(len(calls), 3)
+
+    def test_changes_to_source_take_effect(self):
+        source = [1, 2]
+        it = cycle_source(source)
+        self.assertEqual(_take(it, 2), [1, 2])
+        source.append(3)
+        self.assertEqual(_take(it, 5), [3, 1, 2, 3, 1])
+
+    def test_path_reads_lines_each_pass(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory, 'lines.txt')
+            path.write_text('alpha\nbeta\n', encoding='utf-8')
+            it = cycle_source(path, encoding='utf-8')
+            self.assertEqual(_take(it, 5),
+                             ['alpha\n', 'beta\n', 'alpha\n', 'beta\n',
+                              'alpha\n'])
+            it.close()
+
+    def test_empty_path_stops(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory, 'empty.txt')
+            path.touch()
+            self.assertEqual(list(cycle_source(path)), [])
+
+    def test_factory_giving_nothing_stops(self):
+        self.assertEqual(list(cycle_source(lambda: iter(()))), [])
+
+    def test_iterator_raises(self):
+        with self.assertRaises(TypeError):
+            next(cycle_source(x for x in [1]))
+
+
+class TestCycleArray(unittest.TestCase):
+    """Tests for cycle_array."""
+
+    def test_ints_match_my_cycle(self):
+        self.assertEqual(_take(cycle_array(iter(range(4)), 'q'), 11),
+                         _take(my_cycle(range(4)), 11))
+
+    def test_floats_match_my_cycle(self):
+        values = [0.25, -1.5, 3.0]
+        self.assertEqual(_take(cycle_array(iter(values)), 10),
+                         _take(my_cycle(values), 10))
+
+    def test_empty_stops(self):
+        self.assertEqual(list(cycle_array(iter([]), 'q')), [])
+
+    def test_out_of_range_raises(self):
+        with self.assertRaises(OverflowError):
+            list(cycle_array([2**70], 'q'))
+
+
+class TestCycleSpilled(unittest.TestCase):
+    """Tests for cycle_spilled."""
+
+    @parameterized.expand([(1,), (2,), (3,), (7,), (4096,)])
+    def test_matches_my_cycle(self, batch_size):
+        values = [(i, str(i)) for i in range(7)]
+        it = cycle_spilled(iter(values), batch_size=batch_size)
+        self.assertEqual(_take(it, 30), _take(my_cycle(values), 30))
+        it.close()
+
+    def test_empty_stops(self):
+        self.assertEqual(list(cycle_spilled(iter([]))), [])
+
+    def test_is_lazy(self):
+        it = cycle_spilled(itertools.count())
+        self.assertEqual(_take(it, 3), [0, 1, 2])
+        it.close()
+
+    def test_file_is_in_directory_and_removed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            it = cycle_spilled(iter(range(10)), batch_size=4,
+                               directory=directory)
+            _take(it, 15)
+            it.close()
+            self.assertEqual(os.listdir(directory), [])
+
+    @parameterized.expand([
+        ('zero', 0, ValueError),
+        ('float', 2.5, TypeError),
+    ])
+    def test_bad_batch_size_raises_immediately(self, _name, batch_size,
+                                               error):
+        with self.assertRaises(error):
+            cycle_spilled([1], batch_size=batch_size)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for dedup.py."""
+
+import os
+import random
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from palgoviz.dedup import (
+    BloomSeenSet,
+    ExactSeenSet,
+    RecentSeenSet,
+    ShardedDiskSeenSet,
+    distinct_dicts_columnar,
+    distinct_using,
+    key_projector,
+    parallel_distinct,
+)
+from palgoviz.gencomp1 import distinct, distinct_dicts_by_keys
+
+
+def _random_keys(seed, count=2000, limit=500):
+    """Make a list of random keys of mixed types, with many repeats."""
+    rng = random.Random(seed)
+    kinds = [int, float, str, lambda x: (x, str(x))]
+    return [rng.choice(kinds)(rng.randrange(limit)) for _ in range(count)]
+
+
+class TestExactSeenSets(unittest.TestCase):
+    """Tests for distinct_using with exact seen sets."""
+
+    @parameterized.expand([(0,), (1,), (2,)])
+    def test_exact_matches_distinct(self, seed):
+        values = _random_keys(seed)
+        self.assertEqual(list(distinct_using(values, seen=ExactSeenSet())),
+                         list(distinct(values)))
+
+    @parameterized.expand([(1, 1), (4, 0), (16, 2**20)])
+    def test_sharded_matches_distinct(self, shard_count, cache_bytes):
+        values = _random_keys(shard_count)
+        with ShardedDiskSeenSet(shard_count=shard_count,
+                                cache_bytes=cache_bytes,
+                                commit_interval=7) as seen:
+            self.assertEqual(list(distinct_using(values, seen=seen)),
+                             list(distinct(values)))
+
+    def test_key_selector(self):
+        words = ['foo', 'bar', 'foobar', 'baz', 'quux', 'wq']
+        expected = ['foo', 'foobar', 'quux', 'wq']
+        self.assertEqual(list(distinct_using(words, key=len,
+                                             seen=ExactSeenSet())),
+                         expected)
+        with ShardedDiskSeenSet() as seen:
+            self.assertEqual(list(distinct_using(words, key=len, seen=seen)),
+                             expected)
+
+    def test_sharded_handles_hash_collisions(self):
+        # -1 and -2 have the same hash in CPython, but are different keys.
+        with ShardedDiskSeenSet(shard_count=2) as seen:
+            self.assertEqual([seen.add_new(key) for key in [-1, -2, -1, -2]],
+                             [True, True, False, False])
+
+    def test_sharded_stats_and_cleanup(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with ShardedDiskSeenSet(directory, shard_count=3) as seen:
+                for key in range(100):
+                    seen.add_new(key)
+                stats = seen.stats()
+                self.assertEqual(stats.count, 100)
+                self.assertGreater(stats.disk_bytes, 0)
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_exact_stats(self):
+        seen = ExactSeenSet()
+        for key in 'abcab':
+            seen.add_new(key)
+        stats = seen.stats()
+        self.assertEqual(stats.count, 3)
+        self.assertGreater(stats.memory_bytes, 0)
+        self.assertEqual(stats.disk_bytes, 0)
+
+
+class TestBloomSeenSet(unittest.TestCase):
+    """Tests for BloomSeenSet."""
+
+    def test_never_yields_duplicates(self):
+        values = _random_keys(3)
+        result = list(distinct_using(values, seen=BloomSeenSet(500)))
+        self.assertEqual(len(result), len(set(result)))
+        self.assertLessEqual(set(result), set(values))
+
+    def test_false_positive_rate_is_near_target(self):
+        seen = BloomSeenSet(10_000, error_rate=0.02)
+        for key in range(10_000):
+            seen.add_new(key)
+        false_positives = sum(not seen.add_new(key)
+                              for key in range(10_000, 11_000))
+        self.assertLess(false_positives / 1000, 0.04)
+
+    def test_memory_does_not_grow(self):
+        seen = BloomSeenSet(100)
+        before = seen.stats().memory_bytes
+        for key in range(10_000):
+            seen.add_new(key)
+        self.assertEqual(seen.stats().memory_bytes, before)
+
+    @parameterized.expand([
+        ('zero_capacity', 0, 0.01),
+        ('zero_error_rate', 10, 0.0),
+        ('unit_error_rate', 10, 1.0),
+    ])
+    def test_bad_arguments_raise(self, _name, capacity, error_rate):
+        with self.assertRaises(ValueError):
+            BloomSeenSet(capacity, error_rate)
+
+    def test_float_capacity_raises(self):
+        with self.assertRaises(TypeError):
+            BloomSeenSet(10.0)
+
+
+class TestRecentSeenSet(unittest.TestCase):
+    """Tests for RecentSeenSet."""
+
+    def test_large_maxsize_matches_distinct(self):
+        values = _random_keys(4)
+        self.assertEqual(list(distinct_using(values,
+                                             seen=RecentSeenSet(10_000))),
+                         list(distinct(values)))
+
+    def test_forgotten_keys_are_new_again(self):
+        seen = RecentSeenSet(3)
+        self.assertEqual([seen.add_new(key) for key in 'abcdab'],
+                         [True] * 6)
+        self.assertEqual(seen.stats().count, 3)
+
+    def test_seeing_a_key_again_refreshes_it(self):
+        seen = RecentSeenSet(2)
+        self.assertEqual([seen.add_new(key) for key in 'abaca'],
+                         [True, True, False, True, False])
+
+    def test_bad_maxsize_raises(self):
+        with self.assertRaises(ValueError):
+            RecentSeenSet(0)
+        with self.assertRaises(TypeError):
+            RecentSeenSet(2.5)
+
+
+class _BadEquality:
+    """Key that is hashed by identity but whose equality comparison fails."""
+
+    def __hash__(self):
+        return 0
+
+    def __eq__(self, other):
+        raise RuntimeError('boom')
+
+
+class _ExitsWhenUnpickled:
+    """Key that stops any process it is unpickled in."""
+
+    def __reduce__(self):
+        return os._exit, (1,)
+
+
+class TestParallelDistinct(unittest.TestCase):
+    """Tests for parallel_distinct."""
+
+    @parameterized.expand([(1, 1), (2, 3), (3, 64), (4, 4096)])
+    def test_matches_distinct(self, processes, batch_size):
+        values = _random_keys(processes)
+        self.assertEqual(list(parallel_distinct(iter(values),
+                                                processes=processes,
+                                                batch_size=batch_size)),
+                         list(distinct(values)))
+
+    def test_key_selector(self):
+        values = _random_keys(5)
+        self.assertEqual(list(parallel_distinct(values, key=str, processes=2,
+                                                batch_size=50)),
+                         list(distinct(values, key=str)))
+
+    def test_hash_collisions(self):
+        values = [-1, -2, -1, (-1, 0), -2, (-2, 0), (-1, 0), (-2, 0), -1]
+        self.assertEqual(list(parallel_distinct(values, processes=2)),
+                         list(distinct(values)))
+
+    def test_empty(self):
+        self.assertEqual(list(parallel_distinct([], processes=2)), [])
+
+    def test_worker_error_is_raised(self):
+        values = [1, _BadEquality(), 2, _BadEquality()]
+        with self.assertRaisesRegex(RuntimeError, '^boom$'):
+            list(distinct(values))
+        with self.assertRaisesRegex(RuntimeError, '^boom$'):
+            list(parallel_distinct(values, processes=2))
+
+    def test_worker_exit_is_reported(self):
+        with self.assertRaises(EOFError):
+            list(parallel_distinct([1, _ExitsWhenUnpickled()], processes=2))
+
+    def test_bad_arguments_raise(self):
+        with self.assertRaises(ValueError):
+            next(parallel_distinct([1], processes=0))
+        with self.assertRaises(ValueError):
+            next(parallel_distinct([1], processes=1, batch_size=0))
+        with self.assertRaises(TypeError):
+            next(parallel_distinct([1], processes=2.0))
+
+
+def _random_dicts(seed, count=300):
+    """Make dicts that often agree on some keys, some with keys missing."""
+    rng = random.Random(seed)
+    dicts = []
+    for _ in range(count):
+        d = {key: rng.randrange(3) for key in 'abcdefgh'}
+        for key in rng.sample('abcdefgh', rng.randrange(3)):
+            del d[key]
+        dicts.append(d)
+    return dicts
+
+
+_SUBJECT_KEYS = [('',), ('a',), ('ab',), ('cx',), ('hgfe',)]
+
+
+class TestDistinctDictsColumnar(unittest.TestCase):
+    """Tests for key_projector and distinct_dicts_columnar."""
+
+    @parameterized.expand(_SUBJECT_KEYS)
+    def test_projections_agree_exactly_when_dicts_do(self, subject_keys):
+        project = key_projector(subject_keys)
+        dicts = _random_dicts(len(subject_keys), count=40)
+        for d1 in dicts:
+            for d2 in dicts:
+                agree = all(d1.get(k, None) == d2.get(k, None)
+                            and (k in d1) == (k in d2) for k in subject_keys)
+                self.assertEqual(project(d1) == project(d2), agree)
+
+    @parameterized.expand(_SUBJECT_KEYS)
+    def test_matches_distinct_dicts_by_keys(self, subject_keys):
+        dicts = _random_dicts(len(subject_keys))
+        expected = list(distinct_dicts_by_keys(dicts, subject_keys))
+        for batch_size in 1, 7, 4096:
+            with self.subTest(batch_size=batch_size):
+                actual = list(distinct_dicts_columnar(
+                    iter(dicts), iter(subject_keys), batch_size=batch_size))
+                self.assertEqual(actual, expected)
+
+    @parameterized.expand([(1, 5), (2, 1), (3, 64)])
+    def test_parallel_matches_distinct_dicts_by_keys(self, processes,
+                                                     batch_size):
+        dicts = _random_dicts(processes)
+        expected = list(distinct_dicts_by_keys(dicts, 'abc'))
+        actual = list(distinct_dicts_columnar(dicts, 'abc',
+                                              batch_size=batch_size,
+                                              processes=processes))
+        self.assertEqual(actual, expected)
+
+    def test_parallel_stops_cleanly_when_closed_early(self):
+        it = distinct_dicts_columnar(_random_dicts(5), 'abcdefgh',
+                                     batch_size=10, processes=2)
+        next(it)
+        it.close()
+
+    def test_bad_arguments_raise(self):
+        with self.assertRaises(ValueError):
+            next(distinct_dicts_columnar([{}], 'a', batch_size=0))
+        with self.assertRaises(ValueError):
+            next(distinct_dicts_columnar([{}], 'a', processes=0))
+        with self.assertRaises(TypeError):
+            next(distinct_dicts_columnar([{}], 'a', batch_size=2.5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for inverting.py."""
+
+import pickle
+import random
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from palgoviz.gencomp1 import invert
+from palgoviz.inverting import (
+    ArrayInvertedIndex,
+    InvertedIndex,
+    build_inverted_index,
+    invert_all,
+)
+
+
+def _random_dict(seed, count=1000, limit=50):
+    """Make a dict from distinct ints to random ints with many repeats."""
+    rng = random.Random(seed)
+    keys = rng.sample(range(-10 * count, 10 * count), count)
+    return {key: rng.randrange(limit) for key in keys}
+
+
+def _naive_inverse(pairs):
+    """Invert (key, value) pairs by scanning them once per value."""
+    values = list(dict.fromkeys(value for _, value in pairs))
+    return {value: tuple(key for key, other in pairs if other == value)
+            for value in values}
+
+
+class TestInvertAll(unittest.TestCase):
+    """Tests for invert_all."""
+
+    @parameterized.expand([(0,), (1,), (2,)])
+    def test_matches_naive_inverse(self, seed):
+        d = _random_dict(seed)
+        self.assertEqual(invert_all(d), _naive_inverse(list(d.items())))
+
+    def test_injective_agrees_with_invert(self):
+        d = {x: x**3 for x in range(-100, 100)}
+        expected = {value: (key,) for value, key in invert(d).items()}
+        self.assertEqual(invert_all(d), expected)
+
+
+class TestInvertedIndex(unittest.TestCase):
+    """Tests for InvertedIndex and build_inverted_index."""
+
+    @parameterized.expand([(None,), ('q',), ('l',)])
+    def test_matches_invert_all(self, typecode):
+        d = _random_dict(3)
+        index = InvertedIndex(d, typecode=typecode)
+        self.assertEqual(dict(index), invert_all(d))
+        self.assertEqual(index.pair_count, len(d))
+
+    def test_incremental_updates_keep_order(self):
+        pairs = list(_random_dict(4).items())
+        index = InvertedIndex()
+        for start in range(0, len(pairs), 77):
+            index.update(iter(pairs[start:start + 77]))
+        self.assertEqual(dict(index), _naive_inverse(pairs))
+
+    @parameterized.expand([(None,), ('q',)])
+    def test_merge_keeps_order(self, typecode):
+        pairs = list(_random_dict(5).items())
+        left = InvertedIndex(pairs[:400], typecode=typecode)
+        left.merge(InvertedIndex(pairs[400:], typecode=typecode))
+        self.assertEqual(dict(left), _naive_inverse(pairs))
+
+    def test_merge_with_different_typecode_raises(self):
+        with self.assertRaises(ValueError):
+            InvertedIndex(typecode='q').merge(InvertedIndex())
+
+    def test_missing_value_raises_key_error(self):
+        index = InvertedIndex({1: 'a'})
+        with self.assertRaises(KeyError):
+            index['b']
+        self.assertNotIn('b', index)
+        self.assertEqual(len(index), 1)
+
+    def test_typed_key_out_of_range_raises(self):
+        with self.assertRaises(OverflowError):
+            InvertedIndex({300: 'a'}, typecode='b')
+
+    def test_pickles(self):
+        index = InvertedIndex(_random_dict(6), typecode='q')
+        self.assertEqual(pickle.loads(pickle.dumps(index)), index)
+
+    @parameterized.expand([
+        (None, 1, 1),
+        (None, 2, 7),
+        ('q', 2, 100),
+        ('q', 3, 4096),
+    ])
+    def test_build_in_processes(self, typecode, processes, chunk_size):
+        d = _random_dict(processes)
+        index = build_inverted_index(iter(d.items()), typecode=typecode,
+                                     processes=processes,
+                                     chunk_size=chunk_size)
+        self.assertEqual(dict(index), invert_all(d))
+        self.assertEqual(index.typecode, typecode)
+
+    def test_build_bad_arguments_raise(self):
+        with self.assertRaises(ValueError):
+            build_inverted_index({}, processes=0)
+        with self.assertRaises(ValueError):
+            build_inverted_index({}, processes=1, chunk_size=0)
+        with self.assertRaises(TypeError):
+            build_inverted_index({}, processes=1.0)
+        with self.assertRaises(TypeError):
+            build_inverted_index({}, processes=1, chunk_size=2.5)
+
+
+class TestArrayInvertedIndex(unittest.TestCase):
+    """Tests for ArrayInvertedIndex."""
+
+    @parameterized.expand([(7,), (8,), (9,)])
+    def test_matches_invert_all(self, seed):
+        d = _random_dict(seed)
+        index = ArrayInvertedIndex.from_dict(d)
+        self.assertEqual(dict(index), invert_all(d))
+        self.assertEqual(index.pair_count, len(d))
+        self.assertEqual(list(index), sorted(set(d.values())))
+
+    def test_string_values(self):
+        d = {key: str(value) for key, value in _random_dict(10).items()}
+        self.assertEqual(dict(ArrayInvertedIndex.from_dict(d)),
+                         invert_all(d))
+
+    def test_concatenate_keeps_order(self):
+        pairs = list(_random_dict(11).items())
+        parts = [ArrayInvertedIndex.from_dict(dict(pairs[start:start + 300]))
+                 for start in range(0, len(pairs), 300)]
+        self.assertEqual(dict(ArrayInvertedIndex.concatenate(parts)),
+                         _naive_inverse(pairs))
+
+    def test_key_array_is_read_only_view(self):
+        index = ArrayInvertedIndex(np.arange(10), np.arange(10) % 2)
+        keys = index.key_array(1)
+        np.testing.assert_array_equal(keys, [1, 3, 5, 7, 9])
+        with self.assertRaises(ValueError):
+            keys[0] = 0
+
+    def test_missing_value_raises_key_error(self):
+        index = ArrayInvertedIndex([1, 2], [10, 30])
+        for value in 5, 20, 40:
+            with self.subTest(value=value):
+                with self.assertRaises(KeyError):
+                    index[value]
+                self.assertNotIn(value, index)
+
+    @parameterized.expand([
+        ('int_values', [10, 30]),
+        ('str_values', ['a', 'b']),
+    ])
+    def test_incomparable_value_raises_key_error(self, _name, values):
+        index = ArrayInvertedIndex([1, 2], values)
+        for value in None, (1,), [values[0]], object():
+            with self.subTest(value=value):
+                with self.assertRaises(KeyError):
+                    index[value]
+                self.assertNotIn(value, index)
+                self.assertIsNone(index.get(value))
+
+    def test_empty(self):
+        index = ArrayInvertedIndex([], [])
+        self.assertEqual(dict(index), {})
+        self.assertNotIn(0, index)
+
+    @parameterized.expand([
+        ('float_keys', [1.5], [1], TypeError),
+        ('mismatched_lengths', [1, 2], [1], ValueError),
+        ('two_dimensional', [[1]], [[1]], ValueError),
+    ])
+    def test_bad_arguments_raise(self, _name, keys, values, error):
+        with self.assertRaises(error):
+            ArrayInvertedIndex(keys, values)
+
+    def test_concatenate_nothing_raises(self):
+        with self.assertRaises(ValueError):
+            ArrayInvertedIndex.concatenate([])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for matrices.py."""
+
+from fractions import Fraction
+import random
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from palgoviz.gencomp2 import (
+    matrix_square_flat,
+    matrix_square_nested,
+    transpose,
+)
+from palgoviz.matrices import (
+    TransposedView,
+    materialize,
+    multiply,
+    square_flat,
+    square_nested,
+    to_nested,
+    transpose_array,
+    transpose_blocked,
+)
+
+
+def _random_rows(rng, height, width, make_entry):
+    """Make a list of rows of random entries."""
+    return [[make_entry(rng) for _ in range(width)] for _ in range(height)]
+
+
+_ENTRY_MAKERS = [
+    ('small_int', lambda rng: rng.randint(-9, 9)),
+    ('big_int', lambda rng: rng.randint(-2**70, 2**70)),
+    ('fraction', lambda rng: Fraction(rng.randint(-9, 9), rng.randint(1, 9))),
+    ('mixed', lambda rng: rng.choice([rng.randint(-9, 9),
+                                      Fraction(1, rng.randint(1, 9))])),
+    ('bool', lambda rng: rng.choice([False, True])),
+]
+
+
+def _naive_product(a, b):
+    """Multiply lists of rows by the definition of matrix multiplication."""
+    return [[sum(a[i][k] * b[k][j] for k in range(len(b)))
+             for j in range(len(b[0]) if b else 0)]
+            for i in range(len(a))]
+
+
+class TestMultiply(unittest.TestCase):
+    """Tests for the multiply function."""
+
+    @parameterized.expand(_ENTRY_MAKERS)
+    def test_agrees_with_naive_product(self, _name, make_entry):
+        rng = random.Random(1729)
+        for height, inner, width in [(1, 1, 1), (3, 5, 2), (7, 4, 9)]:
+            a = _random_rows(rng, height, inner, make_entry)
+            b = _random_rows(rng, inner, width, make_entry)
+            for block_size in 1, 2, 64:
+                with self.subTest(shape=(height, inner, width),
+                                  block_size=block_size):
+                    result = multiply(a, b, block_size=block_size)
+                    self.assertEqual(to_nested(result), _naive_product(a, b))
+
+    def test_int64_overflow_is_avoided(self):
+        a = [[2**31, 2**31], [1, 1]]
+        result = multiply(a, a)
+        self.assertEqual(to_nested(result), _naive_product(a, a))
+
+    def test_floats_use_numpy(self):
+        a = np.arange(6.0).reshape(2, 3)
+        result = multiply(a, a.T)
+        self.assertIsInstance(result, np.ndarray)
+        np.testing.assert_allclose(result, a @ a.T)
+
+    def test_ragged_rows_raise(self):
+        with self.assertRaises(ValueError):
+            multiply([[1, 2], [3]], [[1], [2]])
+
+    def test_bad_block_size_raises(self):
+        with self.assertRaises(ValueError):
+            multiply([[1]], [[1]], block_size=0)
+        with self.assertRaises(TypeError):
+            multiply([[1]], [[1]], block_size=1.5)
+
+
+class TestSquareAdapters(unittest.TestCase):
+    """Tests that square_flat and square_nested match gencomp2."""
+
+    @parameterized.expand(_ENTRY_MAKERS)
+    def test_match_gencomp2(self, _name, make_entry):
+        rng = random.Random(4104)
+        for n in range(6):
+            rows = _random_rows(rng, n, n, make_entry)
+
+            def f(i, j):
+                return rows[i - 1][j - 1]
+
+            with self.subTest(n=n):
+                self.assertEqual(square_flat(f, n), matrix_square_flat(f, n))
+                self.assertEqual(square_nested(f, n),
+                                 matrix_square_nested(f, n))
+
+    def test_floats_match_gencomp2_up_to_rounding(self):
+        rng = random.Random(4105)
+        n = 12
+        rows = _random_rows(rng, n, n, lambda rng: rng.uniform(-1e3, 1e3))
+
+        def f(i, j):
+            return rows[i - 1][j - 1]
+
+        np.testing.assert_allclose(square_nested(f, n),
+                                   matrix_square_nested(f, n), atol=1e-6)
+        flat = matrix_square_flat(f, n)
+        for key, entry in square_flat(f, n).items():
+            with self.subTest(key=key):
+                self.assertAlmostEqual(entry, flat[key], delta=1e-6)
+
+    def test_materialize_calls_f_once_per_entry(self):
+        calls = []
+
+        def f(i, j):
+            calls.append((i, j))
+            return i * j
+
+        materialize(f, 3, 4)
+        expected = [(i, j) for i in range(1, 4) for j in range(1, 5)]
+        self.assertEqual(calls, expected)
+
+
+_TUPLE_MATRICES = [
+    ('empty', ()),
+    ('one_by_one', ((7,),)),
+    ('row', ((1, 2, 3, 4, 5),)),
+    ('column', ((1,), (2,), (3,))),
+    ('wide', tuple(tuple(range(i * 50, (i + 1) * 50)) for i in range(3))),
+    ('tall', tuple(tuple(range(i * 3, (i + 1) * 3)) for i in range(40))),
+]
+
+
+class TestTranspose(unittest.TestCase):
+    """Tests for TransposedView, transpose_blocked, and transpose_array."""
+
+    @parameterized.expand(_TUPLE_MATRICES)
+    def test_blocked_matches_gencomp2(self, _name, matrix):
+        for strip_width in 1, 2, 7, 1024:
+            with self.subTest(strip_width=strip_width):
+                result = transpose_blocked(matrix, strip_width=strip_width)
+                self.assertEqual(result, transpose(matrix))
+
+    @parameterized.expand(_TUPLE_MATRICES)
+    def test_view_rows_match_gencomp2(self, _name, matrix):
+        view = TransposedView(matrix)
+        expected = transpose(matrix)
+        self.assertEqual(len(view), len(expected))
+        self.assertEqual(tuple(view), expected)
+        self.assertEqual(view[::2], expected[::2])
+        self.assertEqual(view.materialize(), expected)
+
+    @parameterized.expand(_TUPLE_MATRICES)
+    def test_view_entries_and_columns(self, _name, matrix):
+        view = TransposedView(matrix)
+        for j, row in enumerate(matrix):
+            self.assertIs(view.column(j), row)
+            for i, entry in enumerate(row):
+                self.assertEqual(view[i, j], entry)
+
+    def test_view_does_not_copy(self):
+        matrix = [[1, 2], [3, 4]]
+        view = TransposedView(matrix)
+        self.assertIs(view.matrix, matrix)
+        matrix[0][1] = 20
+        self.assertEqual(view[1], (20, 4))
+
+    def test_bad_strip_width_raises(self):
+        with self.assertRaises(ValueError):
+            transpose_blocked(((1,),), strip_width=0)
+        with self.assertRaises(TypeError):
+            transpose_blocked(((1,),), strip_width=2.0)
+
+    @parameterized.expand(_TUPLE_MATRICES[1:])
+    def test_array_matches_gencomp2(self, _name, matrix):
+        self.assertEqual(tuple(map(tuple, transpose_array(matrix).tolist())),
+                         transpose(matrix))
+
+
+if __name__ == '__main__':
+    unittest.main()
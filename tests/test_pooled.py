@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for pooled.py."""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import itertools
+import random
+import threading
+import time
+import unittest
+
+from parameterized import parameterized
+
+from palgoviz.gencomp1 import map_one, my_all, my_any, my_filter
+from palgoviz.pooled import pooled_all, pooled_any, pooled_filter, pooled_map
+
+
+def _square(x):
+    """Square x. This is a module-level function so it can be pickled."""
+    return x * x
+
+
+def _is_odd(x):
+    """Check if a number is odd. This can be pickled, too."""
+    return x % 2 == 1
+
+
+class _CountingIterable:
+    """Iterable over a range that records how many elements were taken."""
+
+    def __init__(self, stop):
+        self.taken = 0
+        self._stop = stop
+
+    def __iter__(self):
+        for element in range(self._stop):
+            self.taken += 1
+            yield element
+
+
+_SETTINGS = [
+    (1, 1, None),
+    (2, 3, 1),
+    (3, 7, 2),
+    (4, 100, 5),
+]
+
+
+class TestPooledMap(unittest.TestCase):
+    """Tests for pooled_map."""
+
+    @parameterized.expand(_SETTINGS)
+    def test_ordered_matches_map_one(self, workers, chunk_size, window):
+        values = range(-20, 50)
+        actual = pooled_map(_square, values, workers=workers,
+                            chunk_size=chunk_size, window=window)
+        self.assertEqual(list(actual), list(map_one(_square, values)))
+
+    @parameterized.expand(_SETTINGS)
+    def test_unordered_has_same_results(self, workers, chunk_size, window):
+        values = range(-20, 50)
+        actual = pooled_map(_square, values, workers=workers,
+                            chunk_size=chunk_size, window=window,
+                            ordered=False)
+        self.assertEqual(sorted(actual), sorted(map_one(_square, values)))
+
+    def test_unordered_yields_finished_chunks_first(self):
+        release = threading.Event()
+
+        def wait_on_zero(x):
+            if x == 0:
+                release.wait(timeout=10)
+            return x
+
+        results = pooled_map(wait_on_zero, range(5), workers=2,
+                             ordered=False)
+        first = next(results)
+        release.set()
+        self.assertNotEqual(first, 0)
+        self.assertEqual(sorted([first, *results]), [0, 1, 2, 3, 4])
+
+    def test_process_pool(self):
+        with ProcessPoolExecutor(2) as executor:
+            actual = pooled_map(_square, range(100), executor=executor,
+                                chunk_size=8)
+            self.assertEqual(list(actual), [x * x for x in range(100)])
+
+    def test_is_lazy(self):
+        source = _CountingIterable(1000)
+        results = pooled_map(_square, source, workers=2)
+        self.assertEqual(source.taken, 0)
+        results.close()
+
+    def test_window_bounds_elements_taken(self):
+        source = _CountingIterable(10_000)
+        results = pooled_map(_square, source, workers=2, window=3,
+                             chunk_size=4)
+        self.assertEqual(next(results), 0)
+        self.assertLessEqual(source.taken, (3 + 1) * 4)
+        results.close()
+
+    def test_infinite_iterable(self):
+        results = pooled_map(_square, itertools.count(), chunk_size=10)
+        self.assertEqual(list(itertools.islice(results, 25)),
+                         [x * x for x in range(25)])
+        results.close()
+
+    def test_exception_raised_in_order(self):
+        results = pooled_map(lambda x: 10 // x, [5, 2, 0, 1], workers=2)
+        self.assertEqual([next(results), next(results)], [2, 5])
+        with self.assertRaises(ZeroDivisionError):
+            next(results)
+
+    def test_passed_executor_stays_open(self):
+        with ThreadPoolExecutor(2) as executor:
+            results = pooled_map(_square, itertools.count(),
+                                 executor=executor)
+            next(results)
+            results.close()
+            self.assertEqual(executor.submit(_square, 3).result(), 9)
+
+    @parameterized.expand([
+        ('zero_workers', {'workers': 0}, ValueError),
+        ('zero_window', {'window': 0}, ValueError),
+        ('zero_chunk_size', {'chunk_size': 0}, ValueError),
+        ('float_chunk_size', {'chunk_size': 1.0}, TypeError),
+    ])
+    def test_bad_arguments_raise(self, _name, kwargs, error):
+        with self.assertRaises(error):
+            next(pooled_map(_square, [1], **kwargs))
+
+
+class TestPooledFilter(unittest.TestCase):
+    """Tests for pooled_filter."""
+
+    @parameterized.expand(_SETTINGS)
+    def test_ordered_matches_my_filter(self, workers, chunk_size, window):
+        values = range(100)
+        actual = pooled_filter(_is_odd, values, workers=workers,
+                               chunk_size=chunk_size, window=window)
+        self.assertEqual(list(actual), list(my_filter(_is_odd, values)))
+
+    @parameterized.expand(_SETTINGS)
+    def test_unordered_has_same_results(self, workers, chunk_size, window):
+        values = range(100)
+        actual = pooled_filter(_is_odd, values, workers=workers,
+                               chunk_size=chunk_size, window=window,
+                               ordered=False)
+        self.assertEqual(sorted(actual), list(my_filter(_is_odd, values)))
+
+    def test_none_predicate_keeps_truthy(self):
+        values = [0, 1, '', 'a', [], [0], None, (), (None,)]
+        self.assertEqual(list(pooled_filter(None, values, chunk_size=2)),
+                         list(my_filter(None, values)))
+
+    def test_process_pool(self):
+        with ProcessPoolExecutor(2) as executor:
+            actual = pooled_filter(_is_odd, range(100), executor=executor,
+                                   chunk_size=16)
+            self.assertEqual(list(actual), list(range(1, 100, 2)))
+
+
+def _random_bits(seed, count, weight):
+    """Make a list of count random 0s and 1s, which are 1 with weight."""
+    rng = random.Random(seed)
+    return [int(rng.random() < weight) for _ in range(count)]
+
+
+def _bits_cases():
+    """Make parameters for tests of pooled_any and pooled_all on bits."""
+    return [
+        (seed, count, weight, workers, chunk_size)
+        for seed, (count, weight, workers, chunk_size) in enumerate([
+            (0, 0.5, 2, 1),
+            (50, 0.0, 3, 4),
+            (50, 1.0, 2, 7),
+            (200, 0.01, 4, 3),
+            (200, 0.99, 4, 3),
+            (1000, 0.5, 2, 64),
+        ])
+    ]
+
+
+class TestPooledAnyAll(unittest.TestCase):
+    """Tests for pooled_any and pooled_all."""
+
+    @parameterized.expand(_bits_cases())
+    def test_matches_my_any_and_my_all(self, seed, count, weight, workers,
+                                       chunk_size):
+        bits = _random_bits(seed, count, weight)
+        for deterministic in False, True:
+            with self.subTest(deterministic=deterministic):
+                kwargs = dict(workers=workers, chunk_size=chunk_size,
+                              deterministic=deterministic)
+                self.assertIs(pooled_any(None, bits, **kwargs), my_any(bits))
+                self.assertIs(pooled_all(None, bits, **kwargs), my_all(bits))
+                self.assertIs(pooled_any(_is_odd, bits, **kwargs),
+                              my_any(map(_is_odd, bits)))
+                self.assertIs(pooled_all(_is_odd, bits, **kwargs),
+                              my_all(map(_is_odd, bits)))
+
+    @parameterized.expand([(False,), (True,)])
+    def test_short_circuits_on_infinite_iterable(self, deterministic):
+        source = itertools.count()
+        self.assertTrue(pooled_any(lambda x: x == 100, source, workers=2,
+                                   window=4, chunk_size=5,
+                                   deterministic=deterministic))
+        self.assertLessEqual(next(source), 100 + (2 * 4 + 1) * 5)
+        self.assertFalse(pooled_all(lambda x: x < 1000, source, workers=2,
+                                    deterministic=deterministic))
+
+    def test_stops_submitting_once_decided(self):
+        calls = itertools.count()
+
+        def count_calls(x):
+            next(calls)
+            return x == 3
+
+        self.assertTrue(pooled_any(count_calls, range(10_000), workers=2,
+                                   window=3, chunk_size=2))
+        self.assertLessEqual(next(calls), (3 * 2 + 2) * 2)
+
+    @parameterized.expand([(False,), (True,)])
+    def test_returns_without_waiting_for_running_chunks(self, deterministic):
+        release = threading.Event()
+
+        def slow_unless_zero(x):
+            if x != 0:
+                release.wait(timeout=10)
+            return x == 0
+
+        try:
+            start = time.perf_counter()
+            self.assertTrue(pooled_any(slow_unless_zero, range(100),
+                                       workers=4,
+                                       deterministic=deterministic))
+            self.assertLess(time.perf_counter() - start, 5)
+        finally:
+            release.set()
+
+    def test_deterministic_ignores_errors_after_decider(self):
+        values = [0, 0, 1, 0, 'oops']
+        self.assertTrue(pooled_any(lambda x: x + 0, values, workers=2,
+                                   deterministic=True))
+        self.assertFalse(pooled_all(lambda x: x + 1, [1, -1, 'oops'],
+                                    workers=2, deterministic=True))
+
+    def test_deterministic_raises_errors_before_decider(self):
+        with self.assertRaises(TypeError):
+            pooled_any(lambda x: x + 0, [0, 'oops', 1], workers=2,
+                       deterministic=True)
+        with self.assertRaises(TypeError):
+            pooled_all(lambda x: x + 1, [1, 'oops', -1], workers=2,
+                       deterministic=True)
+
+    def test_process_pool(self):
+        with ProcessPoolExecutor(2) as executor:
+            self.assertTrue(pooled_any(_is_odd, [*range(0, 1000, 2), 7],
+                                       executor=executor, chunk_size=50))
+            self.assertTrue(pooled_all(_is_odd, range(1, 1000, 2),
+                                       executor=executor, chunk_size=50,
+                                       deterministic=True))
+
+    def test_bad_arguments_raise(self):
+        with self.assertRaises(ValueError):
+            pooled_any(None, [1], window=0)
+        with self.assertRaises(TypeError):
+            pooled_all(None, [1], workers=2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
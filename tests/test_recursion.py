@@ -23,6 +23,8 @@ from parameterized import parameterized, parameterized_class
 
 from palgoviz.compare import OrderIndistinct, Patient, WeakDiamond
 from palgoviz.recursion import (
+    binary_insertion_sort,
+    insertion_sort,
     insort_left_linear,
     insort_right_linear,
     merge_sort,
@@ -432,5 +434,118 @@ class TestMergeSortStability(unittest.TestCase):
         self.assertListEqual(result, vals)
 
 
+_HYBRID_SORT_PARAMS = [
+    (merge_sort.__name__,
+        staticmethod(merge_sort)),
+    (merge_sort_bottom_up.__name__,
+        staticmethod(merge_sort_bottom_up)),
+]
+
+_SMALL_SORT_PARAMS = [
+    (insertion_sort.__name__, insertion_sort),
+    (binary_insertion_sort.__name__, binary_insertion_sort),
+]
+
+_HYBRID_COMBINED_PARAMS = [
+    (f'{sort_name}_{small_name}_cutoff{cutoff}', sort,
+     dict(cutoff=cutoff, small_sort=small_sort))
+    for sort_name, sort in _HYBRID_SORT_PARAMS
+    for small_name, small_sort in _SMALL_SORT_PARAMS
+    for cutoff in (2, 3, 16, 1000)
+]
+
+
+@parameterized_class(('label', 'sort', 'kwargs'), _HYBRID_COMBINED_PARAMS)
+class TestHybridMergeSort(unittest.TestCase):
+    """Tests for merge sorts that hand small subproblems to another sort."""
+
+    def test_empty_list_sorts(self):
+        result = self.sort([], **self.kwargs)
+        self.assertListEqual(result, [])
+
+    def test_singleton_sorts(self):
+        result = self.sort((2,), **self.kwargs)
+        self.assertListEqual(result, [2])
+
+    def test_several_ints_are_sorted(self):
+        vals = [5660, -6307, 5315, 389, 3446, 2673, 1555, -7225, 1597, -7129]
+        expected = [-7225, -7129, -6307, 389, 1555, 1597, 2673, 3446, 5315,
+                    5660]
+        result = self.sort(vals, **self.kwargs)
+        self.assertListEqual(result, expected)
+
+    def test_hundred_descending_ints_are_sorted(self):
+        result = self.sort(range(100, 0, -1), **self.kwargs)
+        self.assertListEqual(result, list(range(1, 101)))
+
+    def test_sort_is_stable(self):
+        vals = [0.0, 0, False] * 10
+        results = self.sort(vals, **self.kwargs)
+        for i, (val, result) in enumerate(zip(vals, results)):
+            with self.subTest(index=i):
+                self.assertIs(result, val)
+
+    def test_sort_is_stable_with_100_items(self):
+        vals = [OrderIndistinct(x) for x in range(100)]
+        result = self.sort(vals, **self.kwargs)
+        self.assertListEqual(result, vals)
+
+
+@parameterized_class(('name', 'sort'), [
+    (insertion_sort.__name__, staticmethod(insertion_sort)),
+    (binary_insertion_sort.__name__, staticmethod(binary_insertion_sort)),
+    (merge_sort.__name__, staticmethod(merge_sort)),
+    (merge_sort_bottom_up.__name__, staticmethod(merge_sort_bottom_up)),
+])
+class TestKeyedSort(unittest.TestCase):
+    """Tests for the key and reverse arguments of the stable sorts."""
+
+    _WORDS = ['foo', 'bar', 'baz', 'quux', 'foobar', 'ham', 'spam', 'eggs']
+
+    def test_key_sorts_by_key(self):
+        result = self.sort(self._WORDS, key=len)
+        expected = ['foo', 'bar', 'baz', 'ham', 'quux', 'spam', 'eggs',
+                    'foobar']
+        self.assertListEqual(result, expected)
+
+    def test_reverse_sorts_descending(self):
+        vals = [5660, -6307, 5315, 389, 3446, 2673, 1555, -7225, 1597, -7129]
+        expected = [5660, 5315, 3446, 2673, 1597, 1555, 389, -6307, -7129,
+                    -7225]
+        result = self.sort(vals, reverse=True)
+        self.assertListEqual(result, expected)
+
+    def test_key_with_reverse_is_stable(self):
+        result = self.sort(self._WORDS, key=len, reverse=True)
+        expected = ['foobar', 'quux', 'spam', 'eggs', 'foo', 'bar', 'baz',
+                    'ham']
+        self.assertListEqual(result, expected)
+
+    def test_reverse_is_stable_when_items_compare_equal(self):
+        vals = [0.0, 0, False]
+        results = self.sort(vals, reverse=True)
+        for i, (val, result) in enumerate(zip(vals, results)):
+            with self.subTest(index=i):
+                self.assertIs(result, val)
+
+    def test_values_are_not_compared_when_keys_are_equal(self):
+        vals = [OrderIndistinct(x) for x in range(100)]
+        result = self.sort(vals, key=lambda _: 0)
+        self.assertListEqual(result, vals)
+
+    def test_key_is_called_once_per_item(self):
+        calls = []
+
+        def key(value):
+            calls.append(value)
+            return -value
+
+        result = self.sort(range(50), key=key)
+        with self.subTest(check='result'):
+            self.assertListEqual(result, list(range(49, -1, -1)))
+        with self.subTest(check='calls'):
+            self.assertListEqual(calls, list(range(50)))
+
+
 if __name__ == '__main__':
     unittest.main()
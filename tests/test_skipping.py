@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for skipping.py."""
+
+import array
+import collections
+import io
+import unittest
+
+from parameterized import parameterized
+
+from palgoviz.gencomp1 import drop, pick, take
+from palgoviz.skipping import drop_fast, pick_fast, skip, take_fast
+
+
+class _Squares(collections.abc.Sequence):
+    """Sequence of the squares of 0 to size - 1, not backed by a list."""
+
+    def __init__(self, size):
+        self._size = size
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._size:
+            raise IndexError('index out of range')
+        return index**2
+
+    def __len__(self):
+        return self._size
+
+
+class _IndexCountingDeque(collections.deque):
+    """Deque that counts how many times it is indexed."""
+
+    def __init__(self, iterable):
+        super().__init__(iterable)
+        self.index_count = 0
+
+    def __getitem__(self, index):
+        self.index_count += 1
+        return super().__getitem__(index)
+
+
+def _make_source(name):
+    """Make a new iterable, of the kind named, with 10 elements."""
+    squares = [x**2 for x in range(10)]
+    return dict([
+        ('list', squares),
+        ('tuple', tuple(squares)),
+        ('range', range(0, 10)),
+        ('str', 'abcdefghij'),
+        ('nonascii_str', '\N{GREEK SMALL LETTER ALPHA}bcdefghij'),
+        ('bytes', bytes(range(10))),
+        ('bytearray', bytearray(range(10))),
+        ('array', array.array('q', squares)),
+        ('deque', collections.deque(squares)),
+        ('custom_sequence', _Squares(10)),
+        ('generator', (x**2 for x in range(10))),
+        ('dict', dict.fromkeys(range(10))),
+        ('text_file', io.StringIO(''.join(f'{x}\n' for x in range(10)))),
+    ])[name]
+
+
+_SOURCE_NAMES = [(name,) for name in (
+    'list', 'tuple', 'range', 'str', 'nonascii_str', 'bytes', 'bytearray',
+    'array', 'deque', 'custom_sequence', 'generator', 'dict', 'text_file',
+)]
+
+
+_COUNTS = [0, 1, 3, 9, 10, 11, 1000]
+
+
+class TestSkipping(unittest.TestCase):
+    """Tests for skip, take_fast, drop_fast, and pick_fast."""
+
+    @parameterized.expand(_SOURCE_NAMES)
+    def test_drop_fast_matches_drop(self, name):
+        for n in _COUNTS:
+            with self.subTest(n=n):
+                expected = list(drop(_make_source(name), n))
+                self.assertEqual(list(drop_fast(_make_source(name), n)),
+                                 expected)
+
+    @parameterized.expand(_SOURCE_NAMES)
+    def test_take_fast_matches_take(self, name):
+        for n in _COUNTS:
+            with self.subTest(n=n):
+                expected = list(take(_make_source(name), n))
+                self.assertEqual(list(take_fast(_make_source(name), n)),
+                                 expected)
+
+    @parameterized.expand(_SOURCE_NAMES)
+    def test_pick_fast_matches_pick(self, name):
+        for index in range(12):
+            with self.subTest(index=index):
+                try:
+                    expected = pick(_make_source(name), index)
+                except IndexError:
+                    with self.assertRaises(IndexError):
+                        pick_fast(_make_source(name), index)
+                else:
+                    self.assertEqual(pick_fast(_make_source(name), index),
+                                     expected)
+
+    def test_huge_range_is_fast(self):
+        huge = range(10**30)
+        self.assertEqual(next(skip(huge, 10**29)), 10**29)
+        self.assertEqual(pick_fast(huge, 10**29 + 5), 10**29 + 5)
+        self.assertEqual(list(take_fast(huge, 2)), [0, 1])
+
+    def test_skipped_list_iterator_is_live(self):
+        items = [1, 2, 3]
+        it = skip(items, 1)
+        items.append(4)
+        self.assertEqual(list(it), [2, 3, 4])
+
+    @parameterized.expand([
+        ('list', list),
+        ('bytearray', bytearray),
+        ('array', lambda values: array.array('q', values)),
+    ])
+    def test_skipping_past_end_exhausts(self, _name, make_sequence):
+        items = make_sequence([1, 2])
+        it = skip(items, 5)
+        items.extend([3, 4, 5, 6, 7])
+        self.assertEqual(list(it), [])
+
+    def test_deque_is_not_indexed(self):
+        items = _IndexCountingDeque(range(1000))
+        self.assertEqual(list(skip(items, 990)), list(range(990, 1000)))
+        self.assertEqual(items.index_count, 0)
+
+    def test_partly_consumed_iterator_continues(self):
+        it = iter([10, 20, 30, 40, 50])
+        next(it)
+        self.assertIs(skip(it, 2), it)
+        self.assertEqual(list(it), [40, 50])
+
+    def test_file_is_left_after_skipped_lines(self):
+        file = io.StringIO('a\nb\nc\nd\n')
+        skip(file, 2)
+        self.assertEqual(file.readline(), 'c\n')
+
+    @parameterized.expand([
+        ('negative', -1, ValueError),
+        ('float', 1.0, TypeError),
+    ])
+    def test_bad_counts_raise(self, _name, n, error):
+        for func in skip, take_fast, drop_fast:
+            with self.subTest(func=func):
+                with self.assertRaises(error):
+                    func([1, 2], n)
+
+    def test_negative_index_raises(self):
+        with self.assertRaises(IndexError):
+            pick_fast([1, 2], -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
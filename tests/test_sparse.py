@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for sparse.py."""
+
+import math
+import random
+import unittest
+
+from parameterized import parameterized
+
+from palgoviz.gencomp2 import dot_product
+from palgoviz.sparse import SparseVector, dot_matrix
+
+
+def _random_dicts(seed, count=20, size=30, universe=100):
+    """Make dicts representing random sparse vectors, with some zero values."""
+    rng = random.Random(seed)
+    return [{rng.randrange(universe): rng.choice([0, rng.uniform(-5, 5)])
+             for _ in range(rng.randrange(size))}
+            for _ in range(count)]
+
+
+_MIXED_DICTS = [
+    {1: 2.0, 3: -1.0, 7: 0.5},
+    {1: 1.5, 7.0: 4.0},  # 7 == 7.0, so their components multiply.
+    {'1': 3.0, 'x': 2.0},
+    {'x': -1.0, 'y': 1.0},
+    {(1, 2): 2.0, (3,): 1.0},
+    {},
+]
+
+
+class TestSparseVector(unittest.TestCase):
+    """Tests for the SparseVector class and dot_matrix function."""
+
+    @parameterized.expand([(seed,) for seed in range(3)])
+    def test_dict_round_trip_drops_only_zeros(self, seed):
+        for mapping in _random_dicts(seed):
+            with self.subTest(mapping=mapping):
+                expected = {key: value for key, value in mapping.items()
+                            if value != 0}
+                result = SparseVector.from_dict(mapping).to_dict()
+                self.assertEqual(result, expected)
+
+    def test_indices_are_sorted_and_read_only(self):
+        vector = SparseVector([5, 1, 3], [1.0, 2.0, 3.0])
+        self.assertEqual(vector.indices.tolist(), [1, 3, 5])
+        self.assertEqual(vector.values.tolist(), [2.0, 3.0, 1.0])
+        with self.assertRaises(ValueError):
+            vector.values[0] = 10.0
+
+    @parameterized.expand([
+        ('int_and_float', {1: 2.0, 2.5: 3.0, 3: 1.0}),
+        ('bool_and_int', {True: 1.0, 2: 3.0}),
+        ('big_int_and_float', {2**53 + 1: 1.0, 0.5: 2.0}),
+    ])
+    def test_mixed_index_types_are_kept(self, _name, mapping):
+        result = SparseVector.from_dict(mapping).to_dict()
+        self.assertEqual(result, mapping)
+        self.assertEqual([type(key) for key in sorted(result)],
+                         [type(key) for key in sorted(mapping)])
+
+    @parameterized.expand([
+        ('str_and_int', {'a': 1.0, 1: 2.0}),
+        ('equal_after_conversion', {'1': 1.0, 1: 2.0}),
+    ])
+    def test_incomparable_indices_raise(self, _name, mapping):
+        with self.assertRaises(TypeError):
+            SparseVector.from_dict(mapping)
+
+    def test_mismatched_lengths_raise(self):
+        with self.assertRaises(ValueError):
+            SparseVector([1, 2], [1.0])
+
+    @parameterized.expand([(seed,) for seed in range(3)])
+    def test_dot_agrees_with_dot_product(self, seed):
+        mappings = _random_dicts(seed)
+        vectors = [SparseVector.from_dict(mapping) for mapping in mappings]
+        for u, d in zip(vectors, mappings):
+            for v, e in zip(vectors, mappings):
+                with self.subTest(d=d, e=e):
+                    self.assertAlmostEqual(u.dot(v), dot_product(d, e))
+
+    def test_dot_with_mixed_index_types(self):
+        vectors = [SparseVector.from_dict(d) for d in _MIXED_DICTS]
+        for u, d in zip(vectors, _MIXED_DICTS):
+            for v, e in zip(vectors, _MIXED_DICTS):
+                with self.subTest(d=d, e=e):
+                    self.assertAlmostEqual(u.dot(v), dot_product(d, e))
+
+    def test_norm_is_cached(self):
+        vector = SparseVector.from_dict({0: 3.0, 10: 4.0})
+        self.assertEqual(vector.norm, 5.0)
+        self.assertIs(vector.norm, vector.norm)
+
+    def test_dot_many_agrees_with_dot(self):
+        mappings = _random_dicts(10) + _MIXED_DICTS
+        vectors = [SparseVector.from_dict(mapping) for mapping in mappings]
+        for u in vectors:
+            with self.subTest(u=u):
+                expected = [u.dot(v) for v in vectors]
+                self.assertEqual(len(u.dot_many(vectors)), len(expected))
+                for actual, wanted in zip(u.dot_many(vectors), expected):
+                    self.assertAlmostEqual(actual, wanted)
+
+    def test_dot_many_normalized_gives_cosine_similarities(self):
+        vectors = [SparseVector.from_dict(mapping)
+                   for mapping in _random_dicts(20) if mapping]
+        u = vectors[0]
+        for v, cosine in zip(vectors, u.dot_many(vectors, normalize=True)):
+            with self.subTest(v=v):
+                if u.norm and v.norm:
+                    self.assertAlmostEqual(cosine,
+                                           u.dot(v) / (u.norm * v.norm))
+                else:
+                    self.assertTrue(math.isnan(cosine))
+
+    def test_dot_matrix_agrees_with_dot(self):
+        mappings = _random_dicts(30, count=8) + _MIXED_DICTS
+        vectors = [SparseVector.from_dict(mapping) for mapping in mappings]
+        others = vectors[::-1]
+        matrix = dot_matrix(vectors, others)
+        self.assertEqual(matrix.shape, (len(vectors), len(others)))
+        for i, u in enumerate(vectors):
+            for j, v in enumerate(others):
+                with self.subTest(i=i, j=j):
+                    self.assertAlmostEqual(matrix[i, j], u.dot(v))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for textfiles.py."""
+
+import io
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from parameterized import parameterized
+
+from palgoviz import textfiles
+from palgoviz.gencomp1 import tail
+from palgoviz.skipping import pick_fast
+from palgoviz.textfiles import LineIndex, tail_lines
+
+_FIB5K_PATH = pathlib.Path(__file__).parent.parent / 'data' / 'fib5k.txt'
+
+_CONTENTS = [
+    ('empty', ''),
+    ('one_line', 'hello\n'),
+    ('no_final_newline', 'a\nbb\nccc'),
+    ('only_newlines', '\n\n\n'),
+    ('crlf', 'a\r\nb\r\n'),
+    ('lone_cr', 'a\rb\nc\r\n'),
+    ('non_ascii', 'caf\N{LATIN SMALL LETTER E WITH ACUTE}\n\N{SNOWMAN}\nz'),
+    ('long', ''.join(f'{i}\n' for i in range(1000))),
+]
+
+
+def _expected_lines(path):
+    """Read the lines of a file as LineIndex should give them."""
+    with open(path, encoding='utf-8', newline='\n') as file:
+        return list(file)
+
+
+def _count_lines(lines):
+    """Count lines. This is a module-level function so it can be pickled."""
+    return len(lines)
+
+
+class TestLineIndex(unittest.TestCase):
+    """Tests for LineIndex."""
+
+    def setUp(self):
+        """Make a temporary directory."""
+        self._temporary_directory = tempfile.TemporaryDirectory()
+        self._directory = pathlib.Path(self._temporary_directory.name)
+
+    def tearDown(self):
+        """Delete the temporary directory."""
+        self._temporary_directory.cleanup()
+
+    def _write(self, text, name='text.txt'):
+        """Write text to a file in the temporary directory."""
+        path = self._directory / name
+        path.write_bytes(text.encode('utf-8'))
+        return path
+
+    @parameterized.expand(_CONTENTS)
+    def test_lines_match_file(self, _name, text):
+        path = self._write(text)
+        expected = _expected_lines(path)
+        index_path = path.with_name(path.name + '.lineidx')
+        for block_size in 1, 3, 2**20:
+            with self.subTest(block_size=block_size):
+                index_path.unlink(missing_ok=True)
+                with mock.patch.object(textfiles, '_BLOCK_SIZE', block_size):
+                    with LineIndex(path) as lines:
+                        self.assertEqual(len(lines), len(expected))
+                        self.assertEqual([lines[i] for i in range(len(lines))],
+                                         expected)
+                        self.assertEqual(list(lines), expected)
+                        self.assertEqual(lines[:], expected)
+
+    @parameterized.expand(_CONTENTS)
+    def test_slices_and_tail(self, _name, text):
+        path = self._write(text)
+        expected = _expected_lines(path)
+        with LineIndex(path) as lines:
+            for key in (slice(1, -1), slice(None, None, 2), slice(5, 2),
+                        slice(-3, None), slice(None, None, -1)):
+                with self.subTest(key=key):
+                    self.assertEqual(lines[key], expected[key])
+            for n in 0, 1, 2, 100:
+                with self.subTest(n=n):
+                    self.assertEqual(lines.tail(n), expected[-n:] if n else [])
+
+    def test_index_errors(self):
+        with LineIndex(self._write('a\nb\n')) as lines:
+            self.assertEqual(lines[-2], 'a\n')
+            with self.assertRaises(IndexError):
+                lines[2]
+            with self.assertRaises(IndexError):
+                lines[-3]
+
+    def test_index_is_saved_and_reused(self):
+        path = self._write('a\nb\n')
+        index_path = self._directory / 'custom.idx'
+        with LineIndex(path, index_path=index_path):
+            pass
+        stamp = os.stat(index_path).st_mtime_ns
+        with LineIndex(path, index_path=index_path) as lines:
+            self.assertEqual(list(lines), ['a\n', 'b\n'])
+        self.assertEqual(os.stat(index_path).st_mtime_ns, stamp)
+
+    def test_stale_index_is_rebuilt(self):
+        path = self._write('a\nb\n')
+        with LineIndex(path):
+            pass
+        self._write('longer\nlines\nnow\n')
+        with LineIndex(path) as lines:
+            self.assertEqual(lines[2], 'now\n')
+
+    @parameterized.expand([('serial', None), ('parallel', 2)])
+    def test_scan(self, _name, processes):
+        path = self._write(''.join(f'{i}\n' for i in range(1000)))
+        with LineIndex(path) as lines:
+            counts = list(lines.scan(_count_lines, lines_per_range=300,
+                                     processes=processes))
+        self.assertEqual(counts, [300, 300, 300, 100])
+
+    @parameterized.expand([
+        ('zero_lines', {'lines_per_range': 0}, ValueError),
+        ('float_lines', {'lines_per_range': 10.0}, TypeError),
+        ('zero_processes', {'processes': 0}, ValueError),
+        ('float_processes', {'processes': 2.0}, TypeError),
+    ])
+    def test_scan_bad_arguments_raise(self, _name, kwargs, error):
+        path = self._write('a\nb\n')
+        with LineIndex(path) as lines:
+            with self.assertRaises(error):
+                next(lines.scan(_count_lines, **kwargs))
+
+    def test_pick_fast_uses_index(self):
+        index_path = self._directory / 'fib5k.lineidx'
+        expected = _expected_lines(_FIB5K_PATH)
+        with LineIndex(_FIB5K_PATH, index_path=index_path) as lines:
+            self.assertEqual(pick_fast(lines, 4321), expected[4321])
+            self.assertEqual(lines.tail(3), expected[-3:])
+
+
+class _Unseekable(io.RawIOBase):
+    """Binary stream over bytes that can't seek, like a pipe."""
+
+    def __init__(self, data):
+        self._stream = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self._stream.readinto(buffer)
+
+
+_TAIL_COUNTS = [0, 1, 2, 3, 10]
+
+
+class TestTailLines(unittest.TestCase):
+    """Tests for tail_lines."""
+
+    @parameterized.expand(_CONTENTS)
+    def test_binary_matches_tail(self, _name, text):
+        data = text.encode('utf-8')
+        for n in _TAIL_COUNTS:
+            for block_size in 1, 2, 7, 2**16:
+                with self.subTest(n=n, block_size=block_size):
+                    file = io.BytesIO(data)
+                    self.assertEqual(
+                        tail_lines(file, n, block_size=block_size),
+                        tail(io.BytesIO(data), n))
+                    self.assertEqual(file.read(), b'')
+
+    @parameterized.expand(_CONTENTS)
+    def test_text_matches_tail(self, _name, text):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory, 'text.txt')
+            path.write_bytes(text.encode('utf-8'))
+            for n in _TAIL_COUNTS:
+                with self.subTest(n=n):
+                    with open(path, encoding='utf-8') as file:
+                        expected = tail(file, n)
+                    with open(path, encoding='utf-8') as file:
+                        self.assertEqual(tail_lines(file, n, block_size=3),
+                                         expected)
+                        self.assertEqual(file.read(), '')
+
+    def test_binary_starts_at_current_position(self):
+        file = io.BytesIO(b'a\nb\nc\n')
+        file.readline()
+        file.readline()
+        self.assertEqual(tail_lines(file, 5, block_size=1), (b'c\n',))
+
+    def test_text_not_at_start_reads_through(self):
+        file = io.TextIOWrapper(io.BytesIO(b'a\nb\nc\n'), encoding='utf-8')
+        file.readline()
+        self.assertEqual(tail_lines(file, 5), ('b\n', 'c\n'))
+
+    def test_unsafe_encoding_reads_through(self):
+        data = 'a\nb\nc\n'.encode('utf-16')
+        file = io.TextIOWrapper(io.BytesIO(data), encoding='utf-16')
+        self.assertEqual(tail_lines(file, 2), ('b\n', 'c\n'))
+
+    def test_unseekable_reads_through(self):
+        file = io.BufferedReader(_Unseekable(b'a\nb\nc'))
+        self.assertEqual(tail_lines(file, 2), (b'b\n', b'c'))
+
+    def test_reads_only_the_end(self):
+        file = io.BytesIO(b'x' * 10**6 + b'\nlast\n')
+        with mock.patch.object(file, 'read', wraps=file.read) as read:
+            self.assertEqual(tail_lines(file, 1, block_size=16),
+                             (b'last\n',))
+        self.assertLessEqual(sum(call.args[0] for call in read.mock_calls),
+                             32)
+
+    @parameterized.expand([
+        ('negative', -1, ValueError),
+        ('float', 1.0, TypeError),
+    ])
+    def test_bad_counts_raise(self, _name, n, error):
+        with self.assertRaises(error):
+            tail_lines(io.BytesIO(b''), n)
+
+    @parameterized.expand([
+        ('zero', 0, ValueError),
+        ('float', 64.0, TypeError),
+    ])
+    def test_bad_block_size_raises(self, _name, block_size, error):
+        with self.assertRaises(error):
+            tail_lines(io.BytesIO(b''), 1, block_size=block_size)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2022 David Vassallo and Eliah Kagan
+#
+# Permission to use, copy, modify, and/or distribute this software for any
+# purpose with or without fee is hereby granted.
+#
+# THE SOFTWARE IS PROVIDED "AS IS" AND THE AUTHOR DISCLAIMS ALL WARRANTIES WITH
+# REGARD TO THIS SOFTWARE INCLUDING ALL IMPLIED WARRANTIES OF MERCHANTABILITY
+# AND FITNESS. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY SPECIAL, DIRECT,
+# INDIRECT, OR CONSEQUENTIAL DAMAGES OR ANY DAMAGES WHATSOEVER RESULTING FROM
+# LOSS OF USE, DATA OR PROFITS, WHETHER IN AN ACTION OF CONTRACT, NEGLIGENCE OR
+# OTHER TORTIOUS ACTION, ARISING OUT OF OR IN CONNECTION WITH THE USE OR
+# PERFORMANCE OF THIS SOFTWARE.
+
+"""Tests for windows.py."""
+
+import functools
+import operator
+import random
+import unittest
+
+import numpy as np
+from parameterized import parameterized
+
+from palgoviz.gencomp1 import windowed
+from palgoviz.windows import (
+    AggregatingQueue,
+    aggregate_array_windows,
+    array_windows,
+    windowed_maxes,
+    windowed_means,
+    windowed_mins,
+    windowed_reduce,
+    windowed_sums,
+    windowed_views,
+)
+
+_WIDTHS = [(1,), (2,), (3,), (7,), (30,), (31,)]
+
+
+def _random_ints(seed, count=30):
+    """Make a list of random small ints, which will have many ties."""
+    rng = random.Random(seed)
+    return [rng.randint(-5, 5) for _ in range(count)]
+
+
+def _matrix_product(a, b):
+    """Multiply 2-by-2 matrices given as tuples of tuples (not commutative)."""
+    return tuple(tuple(sum(a[i][k] * b[k][j] for k in range(2))
+                       for j in range(2))
+                 for i in range(2))
+
+
+class TestWindowedAggregates(unittest.TestCase):
+    """Tests for the iterator-based windowed aggregate functions."""
+
+    @parameterized.expand(_WIDTHS)
+    def test_sums_and_means(self, n):
+        values = _random_ints(n)
+        sums = [sum(window) for window in windowed(values, n)]
+        self.assertEqual(list(windowed_sums(values, n)), sums)
+        self.assertEqual(list(windowed_means(iter(values), n)),
+                         [total / n for total in sums])
+
+    @parameterized.expand(_WIDTHS)
+    def test_float_sums_stay_accurate(self, n):
+        rng = random.Random(n)
+        values = [rng.uniform(-1e6, 1e6) for _ in range(2000)]
+        for actual, window in zip(windowed_sums(values, n),
+                                  windowed(values, n)):
+            self.assertAlmostEqual(actual, sum(window), delta=1e-6)
+
+    @parameterized.expand(_WIDTHS)
+    def test_mins_and_maxes(self, n):
+        values = _random_ints(n + 100)
+        self.assertEqual(list(windowed_mins(values, n)),
+                         [min(window) for window in windowed(values, n)])
+        self.assertEqual(list(windowed_maxes(values, n)),
+                         [max(window) for window in windowed(values, n)])
+
+    @parameterized.expand(_WIDTHS)
+    def test_mins_and_maxes_choose_first_of_ties(self, n):
+        values = list(enumerate(_random_ints(n + 200)))
+
+        def key(pair):
+            return pair[1]
+
+        self.assertEqual(list(windowed_mins(values, n, key=key)),
+                         [min(w, key=key) for w in windowed(values, n)])
+        self.assertEqual(list(windowed_maxes(values, n, key=key)),
+                         [max(w, key=key) for w in windowed(values, n)])
+
+    @parameterized.expand(_WIDTHS)
+    def test_reduce_with_noncommutative_function(self, n):
+        rng = random.Random(n)
+        values = [((rng.randint(-2, 2), rng.randint(-2, 2)),
+                   (rng.randint(-2, 2), rng.randint(-2, 2)))
+                  for _ in range(40)]
+        expected = [functools.reduce(_matrix_product, window)
+                    for window in windowed(values, n)]
+        self.assertEqual(list(windowed_reduce(values, n, _matrix_product)),
+                         expected)
+
+    @parameterized.expand([
+        ('sums', windowed_sums),
+        ('means', windowed_means),
+        ('mins', windowed_mins),
+        ('maxes', windowed_maxes),
+    ])
+    def test_short_input_gives_nothing(self, _name, func):
+        self.assertEqual(list(func([1, 2], 3)), [])
+
+    @parameterized.expand([
+        ('zero', 0, ValueError),
+        ('negative', -1, ValueError),
+        ('float', 2.0, TypeError),
+    ])
+    def test_bad_widths_raise(self, _name, n, error):
+        with self.assertRaises(error):
+            list(windowed_sums([1, 2, 3], n))
+        with self.assertRaises(error):
+            list(windowed_reduce([1, 2, 3], n, operator.add))
+
+
+class TestAggregatingQueue(unittest.TestCase):
+    """Tests for AggregatingQueue."""
+
+    def test_interleaved_operations_match_reduce(self):
+        rng = random.Random(42)
+        queue = AggregatingQueue(operator.add)
+        model = []
+        for _ in range(500):
+            if model and rng.random() < 0.4:
+                self.assertEqual(queue.popleft(), model.pop(0))
+            else:
+                word = rng.choice('abcdef')
+                queue.append(word)
+                model.append(word)
+            self.assertEqual(len(queue), len(model))
+            if model:
+                self.assertEqual(queue.aggregate, ''.join(model))
+
+    def test_pop_from_empty_raises(self):
+        with self.assertRaises(IndexError):
+            AggregatingQueue(operator.add).popleft()
+
+
+class TestAggregateArrayWindows(unittest.TestCase):
+    """Tests for aggregate_array_windows."""
+
+    @parameterized.expand(_WIDTHS)
+    def test_named_aggregates(self, n):
+        values = _random_ints(n, count=50)
+        array = np.array(values)
+        windows = list(windowed(values, n))
+        self.assertEqual(aggregate_array_windows(array, n).tolist(),
+                         [sum(w) for w in windows])
+        self.assertEqual(aggregate_array_windows(array, n, 'min').tolist(),
+                         [min(w) for w in windows])
+        self.assertEqual(aggregate_array_windows(array, n, 'max').tolist(),
+                         [max(w) for w in windows])
+        np.testing.assert_allclose(
+            aggregate_array_windows(array, n, 'mean'),
+            [sum(w) / n for w in windows])
+
+    @parameterized.expand(_WIDTHS)
+    def test_ufunc(self, n):
+        array = np.array(_random_ints(n, count=50))
+        expected = [functools.reduce(operator.or_, w)
+                    for w in windowed(array.tolist(), n)]
+        result = aggregate_array_windows(array, n, np.bitwise_or)
+        self.assertEqual(result.tolist(), expected)
+
+    def test_floats(self):
+        rng = np.random.default_rng(7)
+        array = rng.normal(size=1000)
+        for n in 1, 10, 999, 1000:
+            with self.subTest(n=n):
+                view = np.lib.stride_tricks.sliding_window_view(array, n)
+                np.testing.assert_allclose(
+                    aggregate_array_windows(array, n), view.sum(axis=1),
+                    atol=1e-9)
+                np.testing.assert_array_equal(
+                    aggregate_array_windows(array, n, 'max'),
+                    view.max(axis=1))
+
+    def test_unknown_aggregate_raises(self):
+        with self.assertRaises(ValueError):
+            aggregate_array_windows(np.arange(5), 2, 'median')
+
+    def test_two_dimensional_array_raises(self):
+        with self.assertRaises(ValueError):
+            aggregate_array_windows(np.zeros((2, 2)), 1)
+
+
+class TestWindowViews(unittest.TestCase):
+    """Tests for windowed_views, WindowView, and array_windows."""
+
+    @parameterized.expand(_WIDTHS)
+    def test_views_match_windowed(self, n):
+        values = _random_ints(n, count=n + 20)
+        self.assertEqual([tuple(view) for view in windowed_views(values, n)],
+                         list(windowed(values, n)))
+
+    @parameterized.expand(_WIDTHS)
+    def test_indexing_and_slicing(self, n):
+        values = list(range(n + 5))
+        for view, window in zip(windowed_views(values, n),
+                                windowed(values, n)):
+            self.assertEqual(len(view), n)
+            self.assertEqual([view[i] for i in range(-n, n)],
+                             list(window) * 2)
+            self.assertEqual(view[1::2], window[1::2])
+            self.assertEqual(view[::-1], window[::-1])
+            with self.assertRaises(IndexError):
+                view[n]
+
+    def test_views_are_invalidated_when_window_moves(self):
+        it = windowed_views('abcd', 2)
+        first = next(it)
+        self.assertTrue(first.is_valid)
+        second = next(it)
+        self.assertFalse(first.is_valid)
+        self.assertTrue(second.is_valid)
+        for use in (lambda: first[0], lambda: list(first),
+                    lambda: first[:1], lambda: 'a' in first):
+            with self.subTest(use=use):
+                with self.assertRaises(RuntimeError):
+                    use()
+
+    def test_view_iterator_is_invalidated_when_window_moves(self):
+        it = windowed_views('abcd', 3)
+        elements = iter(next(it))
+        self.assertEqual(next(elements), 'a')
+        next(it)
+        with self.assertRaises(RuntimeError):
+            next(elements)
+
+    def test_views_are_invalidated_when_generator_ends(self):
+        views = list(windowed_views('abc', 2))
+        self.assertFalse(any(view.is_valid for view in views))
+
+    def test_views_share_one_buffer(self):
+        it = windowed_views(range(100), 10)
+        first = next(it)
+        second = next(it)
+        self.assertIs(first._ring, second._ring)
+
+    @parameterized.expand(_WIDTHS)
+    def test_array_windows_match_windowed(self, n):
+        values = _random_ints(n, count=n + 20)
+        array = np.array(values)
+        windows = array_windows(array, n)
+        self.assertTrue(np.shares_memory(windows, array))
+        self.assertFalse(windows.flags.writeable)
+        self.assertEqual(list(map(tuple, windows.tolist())),
+                         list(windowed(values, n)))
+
+    def test_array_windows_of_short_array_is_empty(self):
+        self.assertEqual(array_windows(np.arange(3.0), 5).shape, (0, 5))
+
+    def test_array_windows_of_two_dimensional_array_raises(self):
+        with self.assertRaises(ValueError):
+            array_windows(np.zeros((2, 2)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()